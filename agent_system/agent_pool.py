@@ -0,0 +1,159 @@
+"""
+Agent Pool - Süreç genelinde önceden kurulmuş agent setleri
+
+Agent'lar session'a özel durum taşımaz (session bağlamı yönlendirme görevine ConversationManager'dan
+verilir), bu yüzden her mesajda beş Agent'ı ve araçlarını yeniden kurmak yerine süreç başına en fazla
+AGENT_POOL_SIZE set kurulur ve turlar bu setleri ödünç alır. CrewAI kickoff sırasında agent'lara
+crew bağlar; bu yüzden bir set aynı anda yalnızca bir turda kullanılır.
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+_google_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_google_api() -> bool:
+    """genai.configure ve CrewAI depolama dizini - süreç başına bir kez. Dönüş: API anahtarı var mı"""
+    global _google_configured
+    api_key = os.getenv('GOOGLE_API_KEY')
+    with _configure_lock:
+        if _google_configured:
+            return bool(api_key)
+        if api_key:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            print(f"✅ Google API Key loaded: {api_key[:10]}...")
+        else:
+            print("❌ GOOGLE_API_KEY not found!")
+        # Yeni storage dizini - Google embeddings için
+        os.environ["CREWAI_STORAGE_DIR"] = "./crewai_storage_gemini"
+        _google_configured = True
+    return bool(api_key)
+
+
+class AgentSet:
+    """Bir turu çalıştırmaya yeten agent'lar (router + uzmanlar)"""
+
+    def __init__(self):
+        from agent_system.agents.router_agent import create_router_agent
+        from agent_system.agents.pdf_agent import create_pdf_agent
+        from agent_system.agents.product_search_agent import create_product_search_agent
+        from agent_system.agents.technical_support_agent import create_technical_support_agent
+        from agent_system.agents.quickstart_agent import create_quickstart_agent
+
+        self.router_agent = create_router_agent()
+        self.pdf_agent = create_pdf_agent()
+        self.product_search_agent = create_product_search_agent()
+        self.technical_support_agent = create_technical_support_agent()
+        self.quickstart_agent = create_quickstart_agent()
+
+    @property
+    def agents(self) -> List:
+        """Crew'a verilecek sırayla tüm agent'lar"""
+        return [
+            self.router_agent,
+            self.pdf_agent,
+            self.product_search_agent,
+            self.technical_support_agent,
+            self.quickstart_agent
+        ]
+
+
+class AgentPool:
+    """
+    Sınırlı agent seti havuzu: boş set varsa hemen verilir, yoksa sınıra kadar yenisi kurulur,
+    sınırdaysa bir setin geri gelmesi beklenir.
+    """
+
+    def __init__(self, size: Optional[int] = None, factory: Callable[[], AgentSet] = AgentSet):
+        self._size = size
+        self._factory = factory
+        self._idle: "queue.LifoQueue[AgentSet]" = queue.LifoQueue()  # Son kullanılan (sıcak) set önce
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {'checkouts': 0, 'builds': 0, 'waits': 0}
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            from agent_system.config import AGENT_POOL_SIZE
+            self._size = max(1, AGENT_POOL_SIZE)
+        return self._size
+
+    def _build(self) -> AgentSet:
+        configure_google_api()
+        agent_set = self._factory()
+        with self._lock:
+            self._stats['builds'] += 1
+        return agent_set
+
+    def _reserve(self) -> bool:
+        """Yeni set kurmak için yer ayır (sınıra ulaşıldıysa False)"""
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _release_reservation(self):
+        with self._lock:
+            self._created -= 1
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """Havuzu `count` (varsayılan AGENT_POOL_WARM) sete kadar önceden kur. Dönüş: kurulan set sayısı"""
+        if count is None:
+            from agent_system.config import AGENT_POOL_WARM
+            count = AGENT_POOL_WARM
+        built = 0
+        while self._idle.qsize() < count and self._reserve():
+            try:
+                self._idle.put(self._build())
+            except Exception:
+                self._release_reservation()
+                raise
+            built += 1
+        if built:
+            print(f"🔥 Agent havuzu ısıtıldı: {built} set hazır")
+        return built
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None):
+        """Bir tur boyunca agent setini ödünç al; blok bitince set havuza döner"""
+        if timeout is None:
+            from agent_system.config import AGENT_POOL_CHECKOUT_TIMEOUT
+            timeout = AGENT_POOL_CHECKOUT_TIMEOUT
+        try:
+            agent_set = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve():
+                try:
+                    agent_set = self._build()
+                except Exception:
+                    self._release_reservation()
+                    raise
+            else:
+                with self._lock:
+                    self._stats['waits'] += 1
+                try:
+                    agent_set = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"{timeout:g} sn içinde boş agent seti bulunamadı") from None
+        with self._lock:
+            self._stats['checkouts'] += 1
+        try:
+            yield agent_set
+        finally:
+            self._idle.put(agent_set)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'created': self._created, 'idle': self._idle.qsize(), 'size': self.size}
+
+
+# Global instance
+agent_pool = AgentPool()
@@ -5,6 +5,7 @@ PDF Analysis Agent - Kullanım kılavuzu uzmanı
 from crewai import Agent, LLM
 from agent_system.config import GOOGLE_API_KEY
 from agent_system.tools.pdf_tool import PDFAnalysisTool
+from agent_system.tools.spec_tool import ProductSpecTool
 
 # LLM instance
 llm = LLM(
@@ -32,7 +33,9 @@ def create_pdf_agent():
             "• If user asks 'installation/kurulum' → Select installation section\n"
             "• If user asks 'cleaning/temizlik' → Select maintenance/cleaning section\n"
             "• If user asks 'not working/çalışmıyor' → Select troubleshooting section\n"
-            "• If user asks 'features/özellikler' → Select technical specifications section\n\n"
+            "• If user asks 'features/özellikler' → Select technical specifications section\n"
+            "• For a specific spec (energy class, dimensions, weight, power, capacity...) call the spec tool "
+            "first; read the manual only if the spec is not recorded\n\n"
             
             "FOR DETAILED INFORMATION REQUESTS:\n"
             "• 'Detailed info', 'comprehensive info', 'general info', 'detaylı bilgi', 'kapsamlı bilgi'\n"
@@ -63,7 +66,7 @@ def create_pdf_agent():
             "• Start directly with your answer\n"
             "You are an intelligent filter and organizer - converting raw data into user-friendly information!"
         ),
-        tools=[PDFAnalysisTool()],
+        tools=[ProductSpecTool(), PDFAnalysisTool()],
         llm=llm,
         verbose=False,  # Clean output without internal reasoning
         allow_delegation=False,
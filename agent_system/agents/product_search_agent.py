@@ -4,7 +4,7 @@ Product Search Agent - Ürün arama ve öneri uzmanı
 
 from crewai import Agent, LLM
 from agent_system.config import GOOGLE_API_KEY
-from agent_system.tools import ImprovedProductSearchTool, VestelCategorySearchTool, VestelPriceStockTool
+from agent_system.tools import ImprovedProductSearchTool, VestelCategorySearchTool, VestelPriceStockTool, ProductSpecTool
 
 # LLM instance
 llm = LLM(
@@ -105,7 +105,7 @@ def create_product_search_agent():
             "• But ALWAYS use Turkish terms when calling tools for better database results\n"
             "ALWAYS DOUBLE CHECK THE LINK YOU OUTPUTTING TO USER IS CORRECT"
         ),
-        tools=[ImprovedProductSearchTool(), VestelCategorySearchTool(), VestelPriceStockTool()],
+        tools=[ImprovedProductSearchTool(), VestelCategorySearchTool(), VestelPriceStockTool(), ProductSpecTool()],
         llm=llm,
         verbose=False,  # Clean output without internal reasoning
         allow_delegation=False,
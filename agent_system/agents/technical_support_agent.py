@@ -4,7 +4,7 @@ Technical Support Agent - Teknik destek uzmanı
 
 from crewai import Agent, LLM
 from agent_system.config import GOOGLE_API_KEY
-from agent_system.tools import PDFAnalysisTool
+from agent_system.tools import PDFAnalysisTool, ErrorCodeLookupTool, TroubleshootingSearchTool
 
 # LLM instance
 llm = LLM(
@@ -28,6 +28,10 @@ def create_technical_support_agent():
             "• Politely correct unreasonable problems and suggest alternatives\n\n"
             
             "WORKING METHOD:\n"
+            "0. If the user reports an error code (E21, F03, ...), call the error code tool first; "
+            "use the PDF tool only if the code is not found\n"
+            "0b. If the user does not know the exact model, call the troubleshooting search tool with the "
+            "symptom and product category instead of guessing a model\n"
             "1. Analyze product type and problem description\n"
             "2. Check if the problem makes sense for that product type\n"
             "3. If reasonable, call PDF tool - get complete manual for the product\n"
@@ -93,7 +97,7 @@ def create_technical_support_agent():
             "• Be professional and user-focused\n"
             "• Start directly with your technical guidance\n"
         ),
-        tools=[PDFAnalysisTool()],  # PDF'den sorun giderme bilgisi almak için
+        tools=[ErrorCodeLookupTool(), TroubleshootingSearchTool(), PDFAnalysisTool()],  # Hata kodu, kategori geneli arama, PDF
         llm=llm,
         verbose=False,  # Clean output without internal reasoning
         allow_delegation=False,
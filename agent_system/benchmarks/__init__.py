@@ -0,0 +1 @@
+# Vestel Agent System - Benchmark scriptleri
@@ -0,0 +1,77 @@
+"""
+Agent Havuzu Benchmark'ı - Tur başına agent kurulum maliyetini havuzlu ve havuzsuz ölçer
+
+Kullanım:
+    python -m agent_system.benchmarks.agent_pool [--turns 20] [--threads 4]
+
+"Her turda kur": eski davranış, her mesajda beş Agent (araçları ve LLM nesneleriyle) yeniden kurulur.
+"Havuz": aynı turlar agent_pool'dan set ödünç alır; kurulum yalnızca havuz dolana kadar olur.
+Crew çalıştırılmaz (LLM çağrısı yok) - yalnızca turun kurulum kısmı ölçülür.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List
+
+from agent_system.agent_pool import AgentPool, AgentSet, configure_google_api
+
+
+def _measure(threads: int, turns: int, setup: Callable[[], None]) -> Dict:
+    """Her thread `turns` tur kurulumunu sırayla yapar. Dönüş: tur başına süre istatistikleri (ms)"""
+    durations: List[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def runner():
+        barrier.wait()
+        for _ in range(turns):
+            start = time.perf_counter()
+            setup()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                durations.append(elapsed)
+
+    workers = [threading.Thread(target=runner) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    durations.sort()
+    return {
+        'turns': len(durations),
+        'mean_ms': statistics.mean(durations),
+        'p95_ms': durations[int(len(durations) * 0.95) - 1] if len(durations) > 1 else durations[0],
+        'total_ms': sum(durations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent havuzu kurulum maliyeti benchmark'ı")
+    parser.add_argument("--turns", type=int, default=20, help="Thread başına tur")
+    parser.add_argument("--threads", type=int, default=4, help="Eşzamanlı tur sayısı (havuz boyutu da bu)")
+    args = parser.parse_args()
+
+    configure_google_api()
+    pool = AgentPool(size=args.threads)
+
+    def per_turn():
+        AgentSet()
+
+    def pooled():
+        with pool.checkout():
+            pass
+
+    rows = [
+        ("her turda kur", _measure(args.threads, args.turns, per_turn)),
+        ("havuz", _measure(args.threads, args.turns, pooled)),
+    ]
+    print(f"\n{'yöntem':<14} {'tur':>6} {'ortalama (ms)':>14} {'p95 (ms)':>10} {'toplam (ms)':>12}")
+    for name, r in rows:
+        print(f"{name:<14} {r['turns']:>6} {r['mean_ms']:>14.2f} {r['p95_ms']:>10.2f} {r['total_ms']:>12.1f}")
+    print(f"\nHavuz: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Intent Router Benchmark'ı - Yerel ön yönlendiricinin doğruluğu ve LLM router'dan kazandırdığı süre
+
+Kullanım:
+    python -m agent_system.benchmarks.intent_router [--router-seconds 2.5] [--min-confidence 0.75] [--verbose]
+
+Etiketli altın sorgu kümesi (eğitim örneklerinden ayrı) yerel yönlendiriciden geçirilir. 'general'
+etiketli sorgular belirsiz/sohbet sorgularıdır: doğru davranış onları LLM router'a bırakmaktır.
+Rapor: kapsama (doğrudan uzmana giden oran), doğrudan yönlendirilenlerde isabet, genel niyet doğruluğu,
+yerel yönlendirme gecikmesi ve kazanılan süre. LLM router adımının süresi burada çağrılmaz;
+--router-seconds ile verilen ölçülmüş ortalama kullanılır.
+"""
+
+import argparse
+import statistics
+from typing import Dict, List, Tuple
+
+from agent_system.intent_router import GENERAL, IntentRouter
+
+GOLD: List[Tuple[str, str]] = [
+    # Fiyat / stok
+    ("CMI 96301 fiyatı nedir", "price_stock"),
+    ("NFK54021 CG GI PRO kaç TL", "price_stock"),
+    ("SF 84011 DG stokta var mı", "price_stock"),
+    ("bu ürünün güncel fiyatı", "price_stock"),
+    ("CMI 98322 G WIFI indirimde mi", "price_stock"),
+    ("what's the price of CMI 99342 KX WIFI", "price_stock"),
+    ("is the BM 5011 in stock", "price_stock"),
+    ("kampanya var mı bu makinede", "price_stock"),
+    # Ürün arama
+    ("10 kg çamaşır makinesi öner", "product_search"),
+    ("no frost buzdolabı modelleri", "product_search"),
+    ("retro buzdolabı arıyorum", "product_search"),
+    ("hangi bulaşık makinesini tavsiye edersin", "product_search"),
+    ("CMI 96301 ile CMI 98322 G WIFI karşılaştır", "product_search"),
+    ("recommend a quiet dishwasher", "product_search"),
+    ("looking for a built-in hob", "product_search"),
+    ("NFK37011 özellikleri nelerdir", "product_search"),
+    # Teknik destek
+    ("CMI 96301 E21 hatası veriyor", "technical_support"),
+    ("bulaşık makinesi su boşaltmıyor", "technical_support"),
+    ("buzdolabım soğutmuyor ne yapmalıyım", "technical_support"),
+    ("ekranda F05 arıza kodu var", "technical_support"),
+    ("çamaşır makinesi kapağı açılmıyor", "technical_support"),
+    ("fırın çalışmıyor", "technical_support"),
+    ("my washer shows error E10", "technical_support"),
+    ("the fridge is leaking water", "technical_support"),
+    # Kılavuz
+    ("CMI 96301 kullanım kılavuzu", "pdf_manual"),
+    ("BM 5011 programlar nasıl seçilir", "pdf_manual"),
+    ("SF 84011 DG saat nasıl ayarlanır", "pdf_manual"),
+    ("NFK54021 CG GI PRO sıcaklık ayarı nasıl yapılır", "pdf_manual"),
+    ("how do i use the delay timer on CMI 98322 G WIFI", "pdf_manual"),
+    ("manual for NFK37011", "pdf_manual"),
+    # Hızlı başlangıç / bakım
+    ("CMI 96301 ilk kurulum", "quickstart"),
+    ("BM 5011 filtresi nasıl temizlenir", "quickstart"),
+    ("NFK54021 CG GI PRO garanti süresi", "quickstart"),
+    ("SO 6114 YB DG montajı", "quickstart"),
+    ("how to install CMI 99342 KX WIFI", "quickstart"),
+    ("cleaning the filter of BM 5011", "quickstart"),
+    # Belirsiz / sohbet: LLM router'a kalmalı
+    ("merhaba", GENERAL),
+    ("teşekkürler çok yardımcı oldun", GENERAL),
+    ("selam nasılsın", GENERAL),
+    ("hello there", GENERAL),
+    ("peki ya diğeri", GENERAL),
+    ("ne kadar su harcar", GENERAL),
+    ("bunu anlamadım", GENERAL),
+    ("thanks a lot", GENERAL),
+]
+
+
+def evaluate(router: IntentRouter, gold: List[Tuple[str, str]], min_confidence: float) -> Dict:
+    """Altın küme üzerinde yerel yönlendirme: kapsama, isabet ve gecikme"""
+    rows = []
+    for query, expected in gold:
+        route = router.route(query, min_confidence=min_confidence)
+        rows.append({'query': query, 'expected': expected, 'route': route, 'fast': route['fast_path']})
+
+    fast_rows = [r for r in rows if r['fast']]
+    latencies = sorted(r['route']['elapsed_ms'] for r in rows)
+    return {
+        'rows': rows,
+        'total': len(rows),
+        'fast': len(fast_rows),
+        'fast_correct': sum(1 for r in fast_rows if r['route']['intent'] == r['expected']),
+        'correct': sum(1 for r in rows if r['route']['intent'] == r['expected']),
+        # LLM'e kalması gerekirken yerelde çözülen ya da yanlış uzmana giden sorgular
+        'misroutes': [r for r in fast_rows if r['route']['intent'] != r['expected']],
+        'mean_ms': statistics.mean(latencies),
+        'p95_ms': latencies[int(0.95 * (len(latencies) - 1))],
+        'local_ms': sum(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel niyet yönlendirici benchmark'ı")
+    parser.add_argument("--router-seconds", type=float, default=2.5,
+                        help="LLM router adımının ortalama süresi (sn) - kazanılan süre tahmini için")
+    parser.add_argument("--min-confidence", type=float, default=None,
+                        help="Doğrudan yönlendirme eşiği (varsayılan INTENT_ROUTER_MIN_CONFIDENCE)")
+    parser.add_argument("--verbose", action="store_true", help="Her sorgunun sonucunu yazdır")
+    args = parser.parse_args()
+
+    if args.min_confidence is None:
+        from agent_system.config import INTENT_ROUTER_MIN_CONFIDENCE
+        args.min_confidence = INTENT_ROUTER_MIN_CONFIDENCE
+
+    router = IntentRouter()
+    router.route("ısınma")  # Katalog indeksini ölçüm dışında yükle
+    result = evaluate(router, GOLD, args.min_confidence)
+
+    if args.verbose:
+        for row in result['rows']:
+            route = row['route']
+            mark = "→" if row['fast'] else "·"
+            status = "✅" if route['intent'] == row['expected'] else "❌"
+            print(f"{status} {mark} {route['intent']:<17} {route['confidence']:.2f} "
+                  f"(beklenen {row['expected']:<17}) {row['query']}")
+        print()
+
+    total, fast = result['total'], result['fast']
+    saved = fast * args.router_seconds - result['local_ms'] / 1000
+    print(f"📊 Altın küme: {total} sorgu, eşik {args.min_confidence:.2f}")
+    print(f"   Doğrudan uzmana: {fast}/{total} (%{100 * fast / total:.0f})")
+    if fast:
+        print(f"   Doğrudan yönlendirmede isabet: {result['fast_correct']}/{fast} "
+              f"(%{100 * result['fast_correct'] / fast:.0f})")
+    print(f"   Genel niyet doğruluğu: {result['correct']}/{total} (%{100 * result['correct'] / total:.0f})")
+    print(f"   Yerel yönlendirme: ort {result['mean_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms")
+    print(f"   Kazanılan süre: ~{saved:.1f} sn ({args.router_seconds:g} sn/LLM router adımı, "
+          f"sorgu başına ort {saved / total:.2f} sn)")
+    for row in result['misroutes']:
+        print(f"   ⚠️ Yanlış yönlendirme: '{row['query']}' → {row['route']['intent']} "
+              f"(beklenen {row['expected']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+PDF Backend Benchmark - Kurulu tüm backend'leri yerel kılavuz korpusunda karşılaştırır
+
+Kullanım:
+    python -m agent_system.benchmarks.pdf_backends [--manuals-dir DIR] [--limit N] [--backends pypdf2,pdfplumber]
+
+Her backend ayrı bir süreçte çalışır, böylece tepe RSS değerleri birbirini etkilemez.
+Rapor: sayfa/sn, tepe RSS, çıkarılan karakter, OCR'a düşecek sayfa oranı ve
+dil filtresiyle (MANUAL_LANGUAGES) atlanacak sayfa oranı.
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+def _peak_rss_mb() -> float:
+    """Bu sürecin tepe RSS değeri (MB) - Linux KB, macOS byte döndürür"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _run_backend(backend_name: str, pdf_paths: List[str], queue) -> None:
+    """Alt süreçte tek bir backend'i tüm korpus üzerinde çalıştırır"""
+    from agent_system.tools.pdf_backends import get_backend
+    from agent_system.tools.lang_id import is_supported_text
+    from agent_system.tools.pdf_tool import clean_text, configured_manual_languages, needs_ocr
+
+    backend = get_backend(backend_name)
+    languages = configured_manual_languages()
+    stats = {
+        "backend": backend_name,
+        "files": 0,
+        "failed_files": 0,
+        "pages": 0,
+        "chars": 0,
+        "ocr_pages": 0,
+        "lang_skipped_pages": 0,
+        "seconds": 0.0,
+    }
+
+    start = time.perf_counter()
+    for path in pdf_paths:
+        try:
+            with backend.open(Path(path)) as doc:
+                for i in range(doc.page_count):
+                    text = clean_text(doc.page_text(i))
+                    stats["pages"] += 1
+                    stats["chars"] += len(text)
+                    if not is_supported_text(text, languages):
+                        stats["lang_skipped_pages"] += 1
+                    elif needs_ocr(text):
+                        stats["ocr_pages"] += 1
+            stats["files"] += 1
+        except Exception as e:
+            stats["failed_files"] += 1
+            print(f"⚠️ [{backend_name}] {Path(path).name} okunamadı: {e}")
+    stats["seconds"] = time.perf_counter() - start
+    stats["peak_rss_mb"] = _peak_rss_mb()
+    queue.put(stats)
+
+
+def benchmark(manuals_dir: Path, backends: List[str], limit: int = 0) -> List[Dict]:
+    """Her backend için korpus istatistiklerini döndürür"""
+    pdf_paths = sorted(str(p) for p in Path(manuals_dir).glob("*.pdf"))
+    if limit:
+        pdf_paths = pdf_paths[:limit]
+    if not pdf_paths:
+        raise SystemExit(f"❌ {manuals_dir} altında PDF bulunamadı")
+
+    print(f"📚 {len(pdf_paths)} kılavuz, backend'ler: {', '.join(backends)}")
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in backends:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_backend, args=(name, pdf_paths, queue))
+        proc.start()
+        proc.join()
+        if queue.empty():
+            print(f"❌ [{name}] benchmark süreci sonuç döndürmeden kapandı (exit={proc.exitcode})")
+            continue
+        stats = queue.get()
+
+        stats["pages_per_sec"] = stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0
+        stats["ocr_fraction"] = stats["ocr_pages"] / stats["pages"] if stats["pages"] else 0.0
+        stats["lang_skipped_fraction"] = stats["lang_skipped_pages"] / stats["pages"] if stats["pages"] else 0.0
+        results.append(stats)
+    return results
+
+
+def print_report(results: List[Dict]) -> None:
+    header = f"{'backend':<12}{'sayfa':>8}{'sayfa/sn':>11}{'tepe RSS MB':>13}{'karakter':>12}{'OCR oranı':>11}{'dil atlama':>12}{'hata':>6}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in sorted(results, key=lambda r: r["pages_per_sec"], reverse=True):
+        print(
+            f"{r['backend']:<12}{r['pages']:>8}{r['pages_per_sec']:>11.1f}"
+            f"{r['peak_rss_mb']:>13.1f}{r['chars']:>12}{r['ocr_fraction']:>10.1%}{r['lang_skipped_fraction']:>11.1%}{r['failed_files']:>6}"
+        )
+
+
+def main():
+    from agent_system.config import MANUALS_DIR
+    from agent_system.tools.pdf_backends import available_backends
+
+    parser = argparse.ArgumentParser(description="PDF metin backend'lerini kılavuz korpusunda karşılaştır")
+    parser.add_argument("--manuals-dir", default=str(MANUALS_DIR), help="PDF kılavuz klasörü")
+    parser.add_argument("--backends", default="", help="Virgülle ayrılmış backend listesi (varsayılan: kurulu olanlar)")
+    parser.add_argument("--limit", type=int, default=0, help="En fazla bu kadar kılavuz işle (0 = hepsi)")
+    parser.add_argument("--json", dest="json_path", default="", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    installed = available_backends()
+    requested = [b.strip().lower() for b in args.backends.split(",") if b.strip()] or installed
+    missing = [b for b in requested if b not in installed]
+    if missing:
+        print(f"⚠️ Kurulu olmayan backend'ler atlandı: {', '.join(missing)}")
+    backends = [b for b in requested if b in installed]
+    if not backends:
+        raise SystemExit("❌ Çalıştırılacak backend yok")
+
+    results = benchmark(Path(args.manuals_dir), backends, args.limit)
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Sonuçlar kaydedildi: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Session DB Bağlantı Benchmark'ı - Çağrı başına sqlite3.connect ile iş parçacığı başına kalıcı bağlantıyı karşılaştırır
+
+Kullanım:
+    python -m agent_system.benchmarks.session_db_pool [--threads 1,4,16] [--ops 500]
+
+Her iş parçacığı kendi session'ında bir sohbet turunun tipik DB erişimlerini tekrarlar:
+mesaj ekleme, sürüm kontrolü, özet okuma ve son mesajları okuma. Ölçüm geçici bir DB üzerinde
+yapılır (yapılandırılmış session DB'sine dokunulmaz). Rapor: işlem/sn ve hızlanma oranı.
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from agent_system.session_db import SessionDB
+
+OPS_PER_ROUND = 4
+
+
+class ConnectPerCallDB(SessionDB):
+    """Eski davranış: her metot çağrısında yeni bağlantı açılır ve kapatılır"""
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _workload(db: SessionDB, rounds: int):
+    session_id = f"bench-{uuid.uuid4()}"
+    db.create_session(session_id)
+    for i in range(rounds):
+        db.append_message(session_id, {'sender': 'user', 'content': f"mesaj {i}",
+                                       'timestamp': datetime.now().isoformat()})
+        db.session_version(session_id)
+        db.get_summary(session_id)
+        db.get_messages_after(session_id, 0, limit=10)
+
+
+def _measure(db: SessionDB, threads: int, ops: int) -> Dict:
+    rounds = max(1, ops // OPS_PER_ROUND)
+    barrier = threading.Barrier(threads)
+    errors: List[BaseException] = []
+
+    def runner():
+        barrier.wait()
+        try:
+            _workload(db, rounds)
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=runner) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    total = threads * rounds * OPS_PER_ROUND
+    return {'ops': total, 'elapsed': elapsed, 'ops_per_sec': total / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session DB bağlantı havuzu benchmark'ı")
+    parser.add_argument("--threads", default="1,4,16", help="Virgülle ayrılmış iş parçacığı sayıları")
+    parser.add_argument("--ops", type=int, default=500, help="İş parçacığı başına DB işlemi")
+    args = parser.parse_args()
+
+    thread_counts = [int(n) for n in args.threads.split(",") if n.strip()]
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\n{'thread':>6} {'çağrı başına (işlem/sn)':>24} {'kalıcı (işlem/sn)':>18} {'hızlanma':>9}")
+        for threads in thread_counts:
+            baseline = _measure(ConnectPerCallDB(Path(tmp) / f"per_call_{threads}.db"), threads, args.ops)
+            pooled = _measure(SessionDB(Path(tmp) / f"pooled_{threads}.db"), threads, args.ops)
+            print(f"{threads:>6} {baseline['ops_per_sec']:>24.0f} {pooled['ops_per_sec']:>18.0f} "
+                  f"{pooled['ops_per_sec'] / baseline['ops_per_sec']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
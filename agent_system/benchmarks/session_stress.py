@@ -0,0 +1,194 @@
+"""
+Session Stres Testi - Tek bir session'a eşzamanlı mesaj/ürün yazıp hiçbir şeyin kaybolmadığını doğrular
+
+Kullanım:
+    python -m agent_system.benchmarks.session_stress [--threads 16] [--messages 50] [--cache-size 2] [--keep]
+
+Senaryolar (hepsi yapılandırılmış session DB'sinde, "stress-" önekli geçici session'larla):
+  1. writes  : N thread aynı session'a M'er mesaj ekler; küçük önbellek + başka session'lara yapılan
+               erişimler yöneticinin önbellekten çıkarılıp yeniden oluşturulmasına yol açar
+  2. products: N thread aynı session'a eşzamanlı ürün bağlamı ekler (oku-değiştir-yaz)
+  3. duplicates: N thread aynı anda aynı mesajı gönderir; duplike kontrolü tek kayıt bırakmalı
+  4. turns   : N thread manager.turn() ile kullanıcı/asistan mesaj çiftleri yazar; çiftler bitişik olmalı
+Herhangi bir kontrol başarısızsa çıkış kodu 1'dir.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List
+
+
+def _run_threads(count: int, target: Callable[[int], None]) -> float:
+    """`count` thread'i aynı anda başlatıp bitmelerini bekler. Dönüş: geçen süre (sn)"""
+    barrier = threading.Barrier(count)
+    errors: List[BaseException] = []
+
+    def runner(i: int):
+        barrier.wait()
+        try:
+            target(i)
+        except BaseException as e:  # Kontrol raporunda görünmesi için topla
+            errors.append(e)
+
+    threads = [threading.Thread(target=runner, args=(i,)) for i in range(count)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    return time.perf_counter() - start
+
+
+def stress_writes(threads: int, messages: int) -> Dict:
+    from agent_system.session_db import session_db
+    from agent_system.state_manager import get_conversation_manager
+
+    session_id = f"stress-{uuid.uuid4()}"
+    noise_ids = [f"stress-{uuid.uuid4()}" for _ in range(4)]
+
+    def writer(i: int):
+        for j in range(messages):
+            get_conversation_manager(session_id).add_message(session_id, 'user', f"t{i}-m{j}")
+            # Başka session'lara erişim: küçük önbellekte hedef session'ı çıkarır
+            get_conversation_manager(noise_ids[(i + j) % len(noise_ids)])
+
+    elapsed = _run_threads(threads, writer)
+
+    stored = session_db.get_messages(session_id)
+    contents = [m['content'] for m in stored]
+    expected = {f"t{i}-m{j}" for i in range(threads) for j in range(messages)}
+    info = session_db.get_session_info(session_id)
+    cached = get_conversation_manager(session_id).conversation_history
+    checks = {
+        "tüm mesajlar kayıtlı": set(contents) == expected,
+        "tekrar yok": len(contents) == len(set(contents)),
+        "message_count tutarlı": info['message_count'] == len(contents),
+        "önbellek DB ile aynı": [m['content'] for m in cached] == contents,
+        # Her thread'in kendi mesajları sırasını korumalı
+        "thread içi sıra": all(
+            [c for c in contents if c.startswith(f"t{i}-")] == [f"t{i}-m{j}" for j in range(messages)]
+            for i in range(threads)
+        ),
+    }
+    return {"name": "writes", "session_ids": [session_id, *noise_ids], "elapsed": elapsed,
+            "ops": threads * messages, "stored": len(contents), "checks": checks}
+
+
+def stress_products(threads: int, messages: int) -> Dict:
+    from agent_system.session_db import session_db
+    from agent_system.state_manager import get_conversation_manager
+
+    session_id = f"stress-{uuid.uuid4()}"
+    manager = get_conversation_manager(session_id)
+
+    def writer(i: int):
+        for j in range(messages):
+            manager.add_products([{'name': f"p{i}-{j}"}])
+
+    elapsed = _run_threads(threads, writer)
+
+    names = [p['name'] for p in session_db.get_products(session_id)]
+    checks = {
+        "tüm ürünler kayıtlı": set(names) == {f"p{i}-{j}" for i in range(threads) for j in range(messages)},
+        "product_count tutarlı": session_db.get_session_info(session_id)['product_count'] == len(names),
+        "önbellek DB ile aynı": [p['name'] for p in manager.current_products] == names,
+    }
+    return {"name": "products", "session_ids": [session_id], "elapsed": elapsed,
+            "ops": threads * messages, "stored": len(names), "checks": checks}
+
+
+def stress_duplicates(threads: int, messages: int) -> Dict:
+    from agent_system.session_db import session_db
+    from agent_system.state_manager import get_conversation_manager
+
+    session_id = f"stress-{uuid.uuid4()}"
+    rounds = max(1, messages // 10)
+    manager = get_conversation_manager(session_id)
+
+    def sender(i: int):
+        for j in range(rounds):
+            manager.add_message(session_id, 'user', f"tekrar-{j}")
+            manager.add_message(session_id, 'assistant', f"ara-{i}-{j}")
+
+    elapsed = _run_threads(threads, sender)
+
+    contents = [m['content'] for m in session_db.get_messages(session_id)]
+    # Bitişik aynı mesaj (5 sn içinde) duplike sayılır ve eklenmemeli
+    adjacent = sum(1 for a, b in zip(contents, contents[1:]) if a == b)
+    checks = {
+        "bitişik duplike yok": adjacent == 0,
+        "önbellek DB ile aynı": [m['content'] for m in manager.conversation_history] == contents,
+    }
+    return {"name": "duplicates", "session_ids": [session_id], "elapsed": elapsed,
+            "ops": threads * rounds * 2, "stored": len(contents), "checks": checks}
+
+
+def stress_turns(threads: int, messages: int) -> Dict:
+    from agent_system.session_db import session_db
+    from agent_system.state_manager import get_conversation_manager
+
+    session_id = f"stress-{uuid.uuid4()}"
+    turns = max(1, messages // 10)
+
+    def client(i: int):
+        for j in range(turns):
+            with get_conversation_manager(session_id).turn(f"q{i}-{j}") as turn:
+                time.sleep(0.001)  # Ajan işlemi yerine
+                turn.reply(f"a{i}-{j}")
+
+    elapsed = _run_threads(threads, client)
+
+    contents = [m['content'] for m in session_db.get_messages(session_id)]
+    pairs = list(zip(contents[0::2], contents[1::2]))
+    checks = {
+        "tüm turlar kayıtlı": len(contents) == threads * turns * 2,
+        "soru/cevap bitişik": all(q[0] == 'q' and a == 'a' + q[1:] for q, a in pairs),
+    }
+    return {"name": "turns", "session_ids": [session_id], "elapsed": elapsed,
+            "ops": threads * turns, "stored": len(contents), "checks": checks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session eşzamanlılık stres testi")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--messages", type=int, default=50, help="Thread başına mesaj")
+    parser.add_argument("--cache-size", type=int, default=2,
+                        help="SESSION_CACHE_SIZE (küçük değer önbellekten çıkarmayı zorlar)")
+    parser.add_argument("--keep", action="store_true", help="Test session'larını silme")
+    args = parser.parse_args()
+
+    # Yapılandırma import edilmeden önce ayarlanmalı
+    os.environ["SESSION_CACHE_SIZE"] = str(args.cache_size)
+    from agent_system.session_db import session_db
+    from agent_system.state_manager import forget_conversation_manager, get_session_cache_stats
+
+    results = [scenario(args.threads, args.messages)
+               for scenario in (stress_writes, stress_products, stress_duplicates, stress_turns)]
+
+    failed = False
+    print(f"\n{'senaryo':<10} {'işlem':>7} {'kayıt':>7} {'süre (sn)':>10} {'işlem/sn':>10}")
+    for r in results:
+        print(f"{r['name']:<10} {r['ops']:>7} {r['stored']:>7} {r['elapsed']:>10.2f} "
+              f"{r['ops'] / r['elapsed']:>10.0f}")
+        for check, ok in r['checks'].items():
+            print(f"    {'✅' if ok else '❌'} {check}")
+            failed |= not ok
+    print(f"\nSession cache: {get_session_cache_stats()}")
+
+    if not args.keep:
+        for r in results:
+            for session_id in r['session_ids']:
+                session_db.delete_session(session_id)
+                forget_conversation_manager(session_id)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
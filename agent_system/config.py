@@ -22,10 +22,55 @@ print(f"✅ Google API Key loaded: {GOOGLE_API_KEY[:12] if GOOGLE_API_KEY else '
 
 # --- Dosya Yolları ---
 DATABASE_PATH = PROJECT_ROOT / "vestel_sessions.db"  # Session veritabanı
+SESSION_ARCHIVE_PATH = PROJECT_ROOT / "vestel_sessions_archive.db"  # Boşta kalan session'ların sıkıştırılmış arşivi
 PRODUCTS_DATABASE_PATH = PROJECT_ROOT / "vestel_products.db"  # Ana ürün veritabanı
+MANUALS_DATABASE_PATH = PROJECT_ROOT / "vestel_manuals.db"  # Kılavuz metin önbelleği
+MANUALS_ARCHIVE_PATH = PROJECT_ROOT / "vestel_manuals.archive"  # Sıkıştırılmış sayfa metinleri (mmap)
 MANUALS_DIR = PROJECT_ROOT / "manuals"
+# DB'deki manual_path değerleri başka makinenin mutlak yollarını tutabilir; dosyalar bu kökte adıyla aranır
+MANUALS_ROOT = Path(os.getenv("VESTEL_MANUALS_ROOT", str(MANUALS_DIR)))
 print("📂 Paths configured")
 
+# --- PDF Ayarları ---
+# Metin katmanı backend'i: "pypdf2", "pdfplumber" veya "pypdfium2" (kurulu değilse kurulu olana düşer)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdf2")
+# Kılavuzlarda tutulacak sayfa dilleri - diğer dillerdeki sayfalar OCR'dan önce atlanır
+MANUAL_LANGUAGES = tuple(
+    lang.strip() for lang in os.getenv("MANUAL_LANGUAGES", "tr,en").split(",") if lang.strip()
+)
+# Önbellekte olmayan kılavuzda ilk yanıt için beklenecek süre (sn) - kalan sayfalar arka planda çıkarılır
+MANUAL_FIRST_ANSWER_SECONDS = float(os.getenv("MANUAL_FIRST_ANSWER_SECONDS", "8"))
+MANUAL_EXTRACTION_WORKERS = int(os.getenv("MANUAL_EXTRACTION_WORKERS", "2"))
+
+# --- Session Ayarları ---
+# Bellekte tutulacak ConversationManager sayısı (LRU - en uzun süredir kullanılmayan çıkarılır)
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "100"))
+# Yönlendirme bağlamı: özet + özetlenmemiş son mesajlar (sınırlı boyut)
+SESSION_SUMMARIZER = os.getenv("SESSION_SUMMARIZER", "llm")  # "llm" veya "local" (LLM'siz, testler için)
+SESSION_SUMMARY_EVERY_MESSAGES = int(os.getenv("SESSION_SUMMARY_EVERY_MESSAGES", "4"))  # Kaç yeni mesajda bir güncellenir
+SESSION_CONTEXT_RECENT_MESSAGES = int(os.getenv("SESSION_CONTEXT_RECENT_MESSAGES", "6"))  # Özetlenmeden aynen verilen son mesajlar
+SESSION_SUMMARY_MAX_CHARS = int(os.getenv("SESSION_SUMMARY_MAX_CHARS", "1200"))
+# Saklama: bu kadar gün boşta kalan session arşive taşınır, arşivde bu süreyi aşan silinir
+SESSION_ARCHIVE_AFTER_DAYS = float(os.getenv("SESSION_ARCHIVE_AFTER_DAYS", "30"))
+SESSION_DELETE_AFTER_DAYS = float(os.getenv("SESSION_DELETE_AFTER_DAYS", "365"))
+SESSION_RETENTION_INTERVAL_HOURS = float(os.getenv("SESSION_RETENTION_INTERVAL_HOURS", "6"))
+
+# --- Agent Havuzu ---
+# Süreç başına önceden kurulmuş agent seti sayısı (aynı anda işlenebilecek tur sayısı) ve açılışta ısıtılanlar
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "4"))
+AGENT_POOL_WARM = int(os.getenv("AGENT_POOL_WARM", "1"))
+AGENT_POOL_CHECKOUT_TIMEOUT = float(os.getenv("AGENT_POOL_CHECKOUT_TIMEOUT", "60"))  # Boş set beklenecek en uzun süre (sn)
+
+# --- Yerel Niyet Yönlendirici ---
+# Belirgin sorgular (fiyat, hata kodu, kılavuz...) LLM router'a gitmeden doğrudan uzmana verilir
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+INTENT_ROUTER_MIN_CONFIDENCE = float(os.getenv("INTENT_ROUTER_MIN_CONFIDENCE", "0.75"))  # Bunun altı LLM router'a gider
+
+# --- Yerel Güvenlik Ön Filtresi ---
+# Açıkça uygunsuz / konu dışı mesajlar LLM'e gitmeden reddedilir; belirsizler LLM router'a kalır
+SAFETY_FILTER_ENABLED = os.getenv("SAFETY_FILTER_ENABLED", "true").lower() == "true"
+SAFETY_OFFTOPIC_CONFIDENCE = float(os.getenv("SAFETY_OFFTOPIC_CONFIDENCE", "0.9"))  # Yalnız sınıflandırıcıyla ret eşiği
+
 # --- LLM Ayarları ---
 GEMINI_MODEL = "gemini/gemini-2.5-flash"
 
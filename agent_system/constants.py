@@ -8,3 +8,7 @@ GREETING_MESSAGE = (
     "Product Search Expert, PDF Manual Expert, Technical Support Expert, Quickstart Expert. "
     "You may specify your language preference as Turkish or English."
 )
+
+# Güvenlik / konu dışı mesajlara standart ret (router agent'ın kuralıyla aynı metin)
+REFUSAL_MESSAGE_TR = "Vestel ürünleri hakkında yardımcı olabilirim."
+REFUSAL_MESSAGE_EN = "I can help with Vestel products."
@@ -0,0 +1,158 @@
+"""
+Conversation Summary - Session başına kayan (rolling) konuşma özeti
+
+Yönlendirme görevine tüm geçmiş yerine sabit boyutlu bir bağlam verilir: özet + özetlenmemiş son
+mesajlar. Özet her SESSION_SUMMARY_EVERY_MESSAGES yeni mesajda arka planda, yalnızca yeni mesajlar
+eklenerek güncellenir; kullanıcıya cevap yolu özetleyiciyi beklemez.
+
+Özetleyici değiştirilebilir: (önceki_özet, yeni_mesajlar, max_chars) -> yeni_özet imzalı her çağrılabilir
+nesne kullanılabilir. SESSION_SUMMARIZER=local LLM'siz, deterministik özetleyiciyi seçer (testler için).
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from agent_system.session_db import session_db
+
+Summarizer = Callable[[str, List[Dict], int], str]
+
+LOCAL_LINE_CHARS = 160  # Yerel özetleyicide mesaj başına satır uzunluğu
+
+
+def _first_sentence(text: str, max_chars: int) -> str:
+    text = " ".join((text or "").split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3] + "..."
+
+
+def local_summarizer(previous: str, messages: List[Dict], max_chars: int) -> str:
+    """
+    LLM'siz özetleyici: her yeni mesajın ilk cümlesini satır olarak ekler, sınır aşılırsa en eski
+    satırları atar. Deterministik olduğu için testlerde ve LLM erişimi olmayan ortamlarda kullanılır.
+    """
+    lines = [line for line in (previous or "").splitlines() if line.strip()]
+    for msg in messages:
+        role = "👤" if msg['sender'] == 'user' else "🤖"
+        lines.append(f"{role} {_first_sentence(msg['content'], LOCAL_LINE_CHARS)}")
+    while lines and len("\n".join(lines)) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def llm_summarizer(previous: str, messages: List[Dict], max_chars: int) -> str:
+    """Önceki özeti yeni mesajlarla LLM üzerinden günceller (hata olursa yerel özetleyiciye düşer)"""
+    from agent_system.config import langchain_llm
+
+    transcript = "\n".join(
+        f"{'Kullanıcı' if m['sender'] == 'user' else 'Asistan'}: {m['content'][:1000]}" for m in messages
+    )
+    prompt = (
+        "Bir Vestel müşteri hizmetleri konuşmasının kayan özetini güncelliyorsun.\n"
+        f"En fazla {max_chars} karakterlik, madde işaretli bir özet yaz. Kullanıcının ürünlerini/model "
+        "numaralarını, sorunlarını, tercihlerini ve verilen önemli cevapları koru; selamlaşmaları at.\n\n"
+        f"Önceki özet:\n{previous or '(yok)'}\n\nYeni mesajlar:\n{transcript}\n\nGüncel özet:"
+    )
+    try:
+        summary = str(langchain_llm.invoke(prompt).content).strip()
+    except Exception as e:
+        print(f"⚠️ LLM özetleme başarısız, yerel özetleyici kullanılıyor: {e}")
+        return local_summarizer(previous, messages, max_chars)
+    return summary[:max_chars]
+
+
+SUMMARIZERS: Dict[str, Summarizer] = {
+    "llm": llm_summarizer,
+    "local": local_summarizer,
+}
+
+
+class ConversationSummarizer:
+    """Kayan özetleri arka planda (tek işçiyle) güncelleyen servis"""
+
+    def __init__(self, summarizer: Optional[Summarizer] = None):
+        self._summarizer = summarizer
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-summary")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}  # Son planlamadan beri eklenen mesaj sayısı
+        self._scheduled = set()              # Kuyrukta/çalışan session'lar
+
+    @property
+    def summarizer(self) -> Summarizer:
+        if self._summarizer is None:
+            from agent_system.config import SESSION_SUMMARIZER
+            self._summarizer = SUMMARIZERS.get(SESSION_SUMMARIZER, llm_summarizer)
+        return self._summarizer
+
+    def set_summarizer(self, summarizer: Summarizer):
+        """Özetleyiciyi değiştir (ör. testlerde local_summarizer)"""
+        self._summarizer = summarizer
+
+    def note_message(self, session_id: str, count: int = 1):
+        """Mesaj eklendiğinde çağrılır; her N mesajda bir arka plan güncellemesi planlar (G/Ç yapmaz)"""
+        from agent_system.config import SESSION_SUMMARY_EVERY_MESSAGES
+
+        with self._lock:
+            count = self._pending.get(session_id, 0) + count
+            if count < SESSION_SUMMARY_EVERY_MESSAGES or session_id in self._scheduled:
+                self._pending[session_id] = count
+                return
+            self._pending[session_id] = 0
+            self._scheduled.add(session_id)
+        self._executor.submit(self._run, session_id)
+
+    def forget(self, session_id: str):
+        """Temizlenen/silinen session'ın sayaçlarını bırak"""
+        with self._lock:
+            self._pending.pop(session_id, None)
+
+    def _run(self, session_id: str):
+        try:
+            self.update(session_id)
+        except Exception as e:
+            print(f"⚠️ Session özeti güncellenemedi ({session_id}): {e}")
+        finally:
+            with self._lock:
+                self._scheduled.discard(session_id)
+
+    def update(self, session_id: str) -> bool:
+        """
+        Son SESSION_CONTEXT_RECENT_MESSAGES mesaj dışında kalan, henüz özetlenmemiş mesajları özete ekler.
+        Dönüş: özet değişti mi
+        """
+        from agent_system.config import SESSION_CONTEXT_RECENT_MESSAGES, SESSION_SUMMARY_MAX_CHARS
+
+        current = session_db.get_summary(session_id)
+        recent = session_db.get_messages_after(session_id, current['covered_message_id'],
+                                               limit=SESSION_CONTEXT_RECENT_MESSAGES)
+        if not recent:
+            return False
+        # Son mesajlar bağlamda aynen yer aldığı için özete yalnızca pencereden çıkanlar girer
+        new_messages = session_db.get_messages_after(session_id, current['covered_message_id'],
+                                                     before_message_id=recent[0]['message_id'])
+        if not new_messages:
+            return False
+        summary = self.summarizer(current['summary'], new_messages, SESSION_SUMMARY_MAX_CHARS)
+        return session_db.save_summary(session_id, summary, new_messages[-1]['message_id'])
+
+
+def build_bounded_context(session_id: str) -> Dict:
+    """
+    Yönlendirme için sabit boyutlu bağlam: özet + özetin kapsamadığı son mesajlar.
+    Özetleyici geride kalsa bile mesaj sayısı SESSION_CONTEXT_RECENT_MESSAGES + SESSION_SUMMARY_EVERY_MESSAGES
+    ile sınırlıdır. Dönüş: summary, messages
+    """
+    from agent_system.config import SESSION_CONTEXT_RECENT_MESSAGES, SESSION_SUMMARY_EVERY_MESSAGES
+
+    current = session_db.get_summary(session_id)
+    messages = session_db.get_messages_after(
+        session_id, current['covered_message_id'],
+        limit=SESSION_CONTEXT_RECENT_MESSAGES + SESSION_SUMMARY_EVERY_MESSAGES,
+    )
+    return {'summary': current['summary'], 'messages': messages}
+
+
+# Global instance
+conversation_summarizer = ConversationSummarizer()
@@ -0,0 +1,284 @@
+"""
+Intent Router - Belirgin sorguları LLM yönlendiricisine gitmeden uzmana yönlendiren yerel ön yönlendirici
+
+Her tur normalde Gemini router agent'ından geçer; "KCMI 98142 fiyatı ne kadar" veya "E21 hatası"
+gibi sorgularda bu tam bir LLM gidiş-dönüşüdür. Bu modül sorguyu yerel olarak sınıflandırır:
+
+- Model numarası tespiti: product_mentions.catalog_matcher (katalogdaki modeller)
+- Hata kodu tespiti: error_code_tool.CODE_PATTERN (yalnızca arıza ifadesi de geçiyorsa)
+- Anahtar kelime kuralları: niyet başına normalize edilmiş ifadeler
+- Küçük sınıflandırıcı: gömülü örnek sorgulardan açılışta eğitilen naive Bayes (kelime + ikili)
+
+Sonuç: intent, language, product, error_code, confidence. Güven INTENT_ROUTER_MIN_CONFIDENCE
+üstündeyse main.VestelAgentSystem doğrudan uzmanı (veya aracı) çalıştırır; değilse LLM yönlendirici.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from agent_system.text_utils import tokenize
+
+GENERAL = "general"  # Selamlaşma / belirsiz - her zaman LLM yönlendiriciye gider
+INTENTS = ("price_stock", "product_search", "technical_support", "pdf_manual", "quickstart", GENERAL)
+
+# Niyet -> uzman agent (AgentSet özniteliği)
+SPECIALIST_AGENTS = {
+    "price_stock": "product_search_agent",
+    "product_search": "product_search_agent",
+    "technical_support": "technical_support_agent",
+    "pdf_manual": "pdf_agent",
+    "quickstart": "quickstart_agent",
+}
+# Görevi ürün adı isteyen uzmanlar: ürün bilinmiyorsa LLM yönlendirici ürünü sorsun
+PRODUCT_REQUIRED = {"pdf_manual", "quickstart"}
+
+RULE_WEIGHT = 0.6        # Eşleşen her anahtar ifade için olasılığa eklenen ağırlık
+ERROR_CODE_CONFIDENCE = 0.95  # Arıza bağlamında hata kodu neredeyse kesin teknik destek
+NB_ALPHA = 0.5           # Naive Bayes düzeltmesi
+
+# Normalize edilmiş (aksansız, küçük harf) ifadeler; kelime başında eşleşir, Türkçe ekler serbest
+KEYWORD_RULES: Dict[str, Tuple[str, ...]] = {
+    "price_stock": (
+        "fiyat", "kac para", "kac tl", "ucret", "stok", "indirim", "kampanya", "taksit",
+        "price", "how much", "cost", "in stock", "discount",
+    ),
+    "technical_support": (
+        "calismiyor", "ariza", "hata", "bozuk", "bozuldu", "sorun", "ses yapiyor", "sogutmuyor",
+        "isitmiyor", "acilmiyor", "kapanmiyor", "bosaltmiyor", "sikmiyor", "yikamiyor", "kurutmuyor",
+        "donmuyor", "sizdir", "su akit", "yanip son", "durdu",
+        "not working", "broken", "error", "fault", "leak", "noise", "doesn t", "won t", "stopped",
+    ),
+    "pdf_manual": (
+        "kilavuz", "nasil kullan", "nasil ayarla", "nasil yapilir", "nasil secil", "talimat",
+        "manual", "how to use", "how do i", "instructions", "user guide",
+    ),
+    "quickstart": (
+        "ilk kurulum", "kurulum", "montaj", "temizle", "temizlik", "bakim", "garanti", "yetkili servis",
+        "aksesuar", "yedek parca", "setup", "install", "clean", "maintenance", "warranty", "accessor",
+        "spare part",
+    ),
+    "product_search": (
+        "oner", "tavsiye", "ariyorum", "hangi model", "modelleri", "karsilastir", "ozellikleri",
+        "enerji sinifi", "kapasite", "recommend", "looking for", "compare", "which model", "features",
+        "specs", "models",
+    ),
+}
+
+# Sınıflandırıcının eğitim örnekleri (çevrimdışı, açılışta bir kez eğitilir)
+TRAINING_SAMPLES: Dict[str, Tuple[str, ...]] = {
+    "price_stock": (
+        "bu buzdolabının fiyatı nedir", "çamaşır makinesi kaç para", "televizyonun fiyatı ne kadar",
+        "stokta var mı", "indirimli fiyatı var mı", "kampanyalı fiyat nedir", "kaç TL",
+        "taksit seçenekleri var mı", "fiyat bilgisi alabilir miyim", "stok durumu nedir",
+        "what is the price", "how much does it cost", "is it in stock", "price of this tv",
+        "is there a discount", "current price please",
+    ),
+    "product_search": (
+        "bana bir buzdolabı önerir misin", "55 inç televizyon arıyorum", "hangi çamaşır makinesi iyi",
+        "9 kg kurutmalı makine modelleri", "inverter motorlu bulaşık makinesi var mı",
+        "enerji sınıfı yüksek buzdolabı", "iki modeli karşılaştır", "ankastre fırın modelleri",
+        "geniş hacimli derin dondurucu", "özellikleri nelerdir", "kaç devir sıkıyor",
+        "recommend a washing machine", "looking for a 4k tv", "which fridge is best",
+        "compare these two models", "show me dishwashers", "what are the features",
+    ),
+    "technical_support": (
+        "makine çalışmıyor", "buzdolabı soğutmuyor", "ekranda hata kodu çıkıyor", "kapak açılmıyor",
+        "su sızdırıyor", "çok ses yapıyor", "televizyon açılmıyor", "fırın ısıtmıyor",
+        "sıkma yapmıyor", "ışıklar yanıp sönüyor", "program yarıda durdu", "arıza var",
+        "bulaşıkları temiz yıkamıyor", "kumanda çalışmıyor",
+        "the machine is not working", "fridge is not cooling", "it shows an error code",
+        "water is leaking", "makes a loud noise", "tv won't turn on", "the door won't open",
+    ),
+    "pdf_manual": (
+        "kullanım kılavuzunu göster", "nasıl kullanılır", "program nasıl seçilir", "saat nasıl ayarlanır",
+        "çocuk kilidi nasıl açılır", "kılavuzda ne yazıyor", "deterjan nereye konur",
+        "sıcaklık nasıl ayarlanır", "kanal ayarı nasıl yapılır", "talimatları anlat",
+        "show me the manual", "how do i use the timer", "how to set the temperature",
+        "instructions for the child lock", "user guide please", "how to tune channels",
+    ),
+    "quickstart": (
+        "ilk kurulum nasıl yapılır", "montaj nasıl yapılır", "nasıl temizlerim", "filtre temizliği",
+        "garanti süresi ne kadar", "yetkili servis nerede", "aksesuarları neler", "yedek parça bulabilir miyim",
+        "bakım önerileri", "kutudan çıkardım ne yapmalıyım", "taşıma vidaları nasıl sökülür",
+        "initial setup steps", "how to install it", "how do i clean it", "warranty period",
+        "where is the service center", "which accessories are included",
+    ),
+    GENERAL: (
+        "merhaba", "selam", "teşekkürler", "teşekkür ederim", "günaydın", "iyi günler", "nasılsın",
+        "kimsin", "yardım eder misin", "tamam", "anladım", "sağ ol",
+        "hello", "hi", "thanks", "thank you", "who are you", "can you help me", "ok", "good morning",
+    ),
+}
+
+# Dil tespiti: kısa sorgularda trigram modeli (lang_id) yetersiz; karakter ve işlev kelimelerine bakılır
+_TURKISH_CHARS = set("çğışöüÇĞİŞÖÜ")
+_EN_WORDS = {
+    "the", "is", "it", "my", "what", "how", "can", "you", "please", "does", "do", "not", "of", "for",
+    "this", "which", "where", "when", "and", "to", "a", "an", "i", "price", "help", "show", "won", "on",
+    "in", "with", "error", "there", "thanks", "hello", "manual", "shows",
+}
+_TR_WORDS = {
+    "bu", "ne", "nasil", "mi", "mu", "var", "yok", "ve", "icin", "bir", "kac", "neden", "nerede",
+    "hangi", "ile", "de", "da", "fiyati", "calismiyor", "merhaba",
+}
+
+
+# Sorguda arıza bağlamı: "E21 hatası", "F05 arıza", "error E10" (kılavuz tablo başlıklarından gevşek)
+FAULT_HINT_PATTERN = re.compile(r"(hata|ar[ıi]za|error|fault|kod|code)", re.IGNORECASE)
+
+
+def _rule_pattern(phrase: str) -> re.Pattern:
+    # product_mentions kategori kalıplarıyla aynı kural: kelime başında eşleşme, ekler serbest
+    tail = r"(?![a-z0-9])" if len(phrase) < 4 else ""
+    return re.compile(r"(?<![a-z0-9])" + re.escape(phrase) + tail)
+
+
+RULE_PATTERNS = {intent: [_rule_pattern(p) for p in phrases] for intent, phrases in KEYWORD_RULES.items()}
+
+
+def _features(text: str) -> List[str]:
+    """Sınıflandırıcı özellikleri: rakamsız kelimeler ve ardışık ikilileri (model numaraları niyet taşımaz)"""
+    words = [w for w in tokenize(text) if not any(ch.isdigit() for ch in w)]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class IntentClassifier:
+    """Çok terimli naive Bayes; eşit öncelikler (eğitim dağılımı gerçek trafiği yansıtmaz)"""
+
+    def __init__(self, samples: Dict[str, Tuple[str, ...]] = TRAINING_SAMPLES, alpha: float = NB_ALPHA):
+        counts = {intent: Counter() for intent in samples}
+        for intent, texts in samples.items():
+            for text in texts:
+                counts[intent].update(_features(text))
+        self.vocab = set().union(*counts.values())
+        self.log_probs: Dict[str, Dict[str, float]] = {}
+        self.floors: Dict[str, float] = {}
+        for intent, counter in counts.items():
+            denom = sum(counter.values()) + alpha * len(self.vocab)
+            self.log_probs[intent] = {f: math.log((c + alpha) / denom) for f, c in counter.items()}
+            self.floors[intent] = math.log(alpha / denom)
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """Niyet olasılıkları; bilinen özellik yoksa eşit dağılım"""
+        features = [f for f in _features(text) if f in self.vocab]
+        scores = {
+            intent: sum(self.log_probs[intent].get(f, self.floors[intent]) for f in features)
+            for intent in self.log_probs
+        }
+        top = max(scores.values())
+        exp = {intent: math.exp(score - top) for intent, score in scores.items()}
+        total = sum(exp.values())
+        return {intent: value / total for intent, value in exp.items()}
+
+
+def detect_query_language(text: str) -> str:
+    """Kısa sorgunun dili: 'tr' veya 'en' (belirsizse 'tr')"""
+    if any(ch in _TURKISH_CHARS for ch in text or ""):
+        return "tr"
+    words = tokenize(text)
+    english = sum(1 for w in words if w in _EN_WORDS)
+    turkish = sum(1 for w in words if w in _TR_WORDS)
+    return "en" if english > turkish else "tr"
+
+
+def find_error_code(text: str) -> Optional[str]:
+    """Arıza bağlamında geçen hata kodu ("e21 hatası" -> "E21"); yoksa None"""
+    from agent_system.tools.error_code_tool import CODE_PATTERN, KNOWN_PREFIXES, normalize_code
+
+    if not text or not FAULT_HINT_PATTERN.search(text):
+        return None
+    # lookup_codes ile aynı büyük harf normalizasyonu ("er 05" -> "Er 05")
+    upper = text.upper().replace("ERR", "Err").replace("ER", "Er")
+    for match in CODE_PATTERN.finditer(upper):
+        if match.group(1) in KNOWN_PREFIXES:
+            return normalize_code(*match.groups())
+    return None
+
+
+class IntentRouter:
+    """Kurallar + sınıflandırıcı ile yerel niyet tahmini"""
+
+    def __init__(self, classifier: Optional[IntentClassifier] = None, matcher=None):
+        self._classifier = classifier or IntentClassifier()
+        self._matcher = matcher
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            from agent_system.product_mentions import catalog_matcher
+            self._matcher = catalog_matcher
+        return self._matcher
+
+    def rule_hits(self, text: str) -> Dict[str, int]:
+        normalized = " ".join(tokenize(text))
+        hits = {}
+        for intent, patterns in RULE_PATTERNS.items():
+            count = sum(1 for pattern in patterns if pattern.search(normalized))
+            if count:
+                hits[intent] = count
+        return hits
+
+    def route(self, text: str, context_product: Optional[str] = None,
+              min_confidence: Optional[float] = None) -> Dict:
+        """
+        Sorgunun niyeti. context_product: sorguda model yoksa session'da son bahsedilen ürün - sorgu başka
+        bir kategori adıyorsa ("televizyon fiyatı", bağlam çamaşır makinesi) kullanılmaz ve hızlı yol
+        kapanır (hangi ürünün sorulduğuna LLM router karar verir).
+        min_confidence: doğrudan yönlendirme eşiği (varsayılan INTENT_ROUTER_MIN_CONFIDENCE).
+        Dönüş: intent, language, product (model_number, name, url veya None), error_code, confidence,
+        fast_path (doğrudan uzmana gidilebilir mi), rules, elapsed_ms
+        """
+        if min_confidence is None:
+            from agent_system.config import INTENT_ROUTER_MIN_CONFIDENCE
+            min_confidence = INTENT_ROUTER_MIN_CONFIDENCE
+
+        start = time.perf_counter()
+        proba = self._classifier.predict_proba(text)
+        hits = self.rule_hits(text)
+        for intent, count in hits.items():
+            proba[intent] += RULE_WEIGHT * count
+        error_code = find_error_code(text)
+        total = sum(proba.values())
+        intent, score = max(((i, p / total) for i, p in proba.items()), key=lambda x: x[1])
+        if error_code:
+            # Arıza bağlamında hata kodu: sınıflandırıcı ne derse desin teknik destek
+            intent, score = "technical_support", max(score if intent == "technical_support" else 0.0,
+                                                     ERROR_CODE_CONFIDENCE)
+
+        models = self.matcher.find_models(text)
+        if not models and context_product:
+            from agent_system.product_mentions import find_categories
+
+            categories = find_categories(text)
+            context_models = self.matcher.find_models(context_product)
+            models = [p for p in context_models if not categories or p['category'] in categories]
+            context_mismatch = bool(context_models) and not models
+        else:
+            context_mismatch = False
+        product = None
+        if models:
+            product = {k: models[0].get(k) for k in ("model_number", "name", "url")}
+
+        fast_path = (
+            intent != GENERAL
+            and score >= min_confidence
+            and (product is not None or intent not in PRODUCT_REQUIRED)
+            and not context_mismatch
+        )
+        return {
+            'intent': intent,
+            'language': detect_query_language(text),
+            'product': product,
+            'error_code': error_code,
+            'confidence': round(score, 3),
+            'fast_path': fast_path,
+            'rules': hits,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+        }
+
+
+# Global instance
+intent_router = IntentRouter()
@@ -3,27 +3,19 @@ Vestel Agent System - Ana sistem
 """
 print("🚀 Starting Vestel Agent System...")
 
-import os
 from crewai import Crew, Process
-import google.generativeai as genai
-print("📦 genai imported")
 
 # Config'i import et ki .env yüklensin
 from agent_system import config
 print("📦 config imported")
-from agent_system.agents.router_agent import create_router_agent
-print("📦 router_agent imported")
-from agent_system.agents.pdf_agent import create_pdf_agent
-print("📦 pdf_agent imported")
-from agent_system.agents.product_search_agent import create_product_search_agent
-print("📦 product_search_agent imported")
-from agent_system.agents.technical_support_agent import create_technical_support_agent
-print("📦 technical_support_agent imported")
-
-from agent_system.agents.quickstart_agent import create_quickstart_agent
-print("📦 quickstart_agent imported")
-from agent_system.tasks import create_routing_task
+from agent_system.agent_pool import agent_pool, configure_google_api
+print("📦 agent_pool imported")
+from agent_system.tasks import create_routing_task, create_specialist_task
 print("📦 tasks imported")
+from agent_system.intent_router import intent_router, SPECIALIST_AGENTS
+print("📦 intent_router imported")
+from agent_system.safety_filter import safety_filter, refusal_message, BLOCKED, UNCERTAIN
+print("📦 safety_filter imported")
 from agent_system.state_manager import get_conversation_manager, ConversationManager
 print("📦 state_manager imported")
 print("✅ All imports completed")
@@ -32,76 +24,133 @@ class VestelAgentSystem:
     """Vestel müşteri hizmetleri agent sistemi"""
     
     def __init__(self, session_id: str = None):
+        # Hafif: agent'lar süreç genelindeki havuzdan tur başına ödünç alınır (agent_pool)
         self.conversation_manager = get_conversation_manager(session_id)
         
-        # Google API konfigürasyonu
-        if os.getenv('GOOGLE_API_KEY'):
-            genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        # Google API konfigürasyonu (süreç başına bir kez yapılır)
+        if configure_google_api():
             self.conversation_manager.enable_google_embedding = True
-            print(f"✅ Google API Key loaded: {os.getenv('GOOGLE_API_KEY')[:10]}...")
-        else:
-            print("❌ GOOGLE_API_KEY not found!")
-            
-        # Yeni storage dizini - Google embeddings için
-        os.environ["CREWAI_STORAGE_DIR"] = "./crewai_storage_gemini"
-        
-        # Agent'ları oluştur
-        self.router_agent = create_router_agent()
-        self.pdf_agent = create_pdf_agent()
-        self.product_search_agent = create_product_search_agent()
-        self.technical_support_agent = create_technical_support_agent()
-        self.quickstart_agent = create_quickstart_agent()
-    
-    def process_query(self, user_query: str, session_id: str = None) -> str:
-        """Kullanıcı sorgusu işle"""
+    
+    def process_query(self, user_query: str, session_id: str = None, turn=None) -> str:
+        """
+        Kullanıcı sorgusu işle.
+        turn verilirse (web arayüzü) kayıt çağıranın turuna bırakılır; verilmezse sorgu ve cevap
+        kendi turunda tek işlemde kaydedilir.
+        """
         
         # Session ID değişmişse conversation manager'ı güncelle
         if session_id and session_id != self.conversation_manager.session_id:
             self.conversation_manager = get_conversation_manager(session_id)
         
+        if turn is None:
+            with self.conversation_manager.turn(user_query) as own_turn:
+                response = self._run_crew(user_query)
+                own_turn.reply(response)
+            return response
+        return self._run_crew(user_query)
+    
+    def _run_crew(self, user_query: str) -> str:
+        """Routing görevini crew ile çalıştır - cevap veya kullanıcıya gösterilecek hata mesajı döner"""
         print(f"💬 Kullanıcı: {user_query}")
         print(f"📱 Session: {self.conversation_manager.session_id}")
         
-        # Mesajı kaydet (düzeltilmiş format)
-        self.conversation_manager.add_message(self.conversation_manager.session_id, 'user', user_query)
+        screen = None
+        if config.SAFETY_FILTER_ENABLED:
+            try:
+                screen = safety_filter.check(user_query)
+            except Exception as e:
+                print(f"⚠️ Güvenlik ön filtresi hatası, kontrol LLM router'a bırakıldı: {e}")
+            if screen and screen['verdict'] == BLOCKED:
+                # Uygunsuz / konu dışı: Gemini'ye hiç gitmeden standart ret
+                print(f"🛡️ Yerelde reddedildi: {screen['category']} ({screen['elapsed_ms']:.2f} ms)")
+                return refusal_message(screen['language'])
         
-        # Routing task oluştur
-        routing_task = create_routing_task(user_query, self.router_agent, self.conversation_manager.session_id)
-        
-        # Crew oluştur ve çalıştır - TIMEOUT VE ERROR HANDLING EKLENDİ
-        crew = Crew(
-            agents=[
-                self.router_agent, 
-                self.pdf_agent, 
-                self.product_search_agent,
-                self.technical_support_agent,
-                self.quickstart_agent
-            ],
-            tasks=[routing_task],
-            process=Process.sequential,
-            memory=False,  # Memory'yi kapat - session bazında kendi memory'miz var
-            verbose=True  # Delegation'ı görmek için verbose aç
-        )
+        route = None
+        # Belirsiz mesajlarda güvenlik kararı LLM router'ın: yerel hızlı yol kullanılmaz
+        if config.INTENT_ROUTER_ENABLED and not (screen and screen['verdict'] == UNCERTAIN):
+            try:
+                route = intent_router.route(user_query, self.conversation_manager.get_last_mentioned_product())
+                print(f"🧭 Yerel yönlendirme: {route['intent']} ({route['confidence']:.2f}, "
+                      f"{route['elapsed_ms']:.1f} ms){' → doğrudan uzman' if route['fast_path'] else ''}")
+                if route['fast_path']:
+                    # Araç cevabı yeterliyse agent seti hiç ödünç alınmaz
+                    answer = self._answer_with_tool(route)
+                    if answer:
+                        return answer
+            except Exception as e:
+                # Yerel yönlendirme yalnızca hızlandırıcı: hata olursa LLM router'a kal
+                print(f"⚠️ Yerel yönlendirme hatası, LLM router kullanılıyor: {e}")
+                route = None
         
         try:
-            print("🚀 Crew başlatılıyor...")
-            result = crew.kickoff()
-            print("✅ Crew işlemi tamamlandı")
-            
-            # Sonucu kaydet (düzeltilmiş format)
-            self.conversation_manager.add_message(self.conversation_manager.session_id, 'assistant', str(result))
-            
-            return str(result)
+            # Tur boyunca havuzdan bir agent seti ödünç al (başka session'lar diğer setleri kullanır)
+            with agent_pool.checkout() as agents:
+                if route and route['fast_path']:
+                    return self._run_specialist(route, user_query, agents)
+                
+                # Routing task oluştur (sorgu görev açıklamasında; bağlam önceki turlardan)
+                routing_task = create_routing_task(user_query, agents.router_agent, self.conversation_manager.session_id)
+                
+                # Crew oluştur ve çalıştır - TIMEOUT VE ERROR HANDLING EKLENDİ
+                crew = Crew(
+                    agents=agents.agents,
+                    tasks=[routing_task],
+                    process=Process.sequential,
+                    memory=False,  # Memory'yi kapat - session bazında kendi memory'miz var
+                    verbose=True  # Delegation'ı görmek için verbose aç
+                )
+                
+                print("🚀 Crew başlatılıyor...")
+                result = crew.kickoff()
+                print("✅ Crew işlemi tamamlandı")
+                return str(result)
             
         except Exception as crew_error:
             error_msg = f"🤖 Agent sistemi şu anda yanıt veremiyor. Lütfen birkaç saniye sonra tekrar deneyin.\n\nHata detayı: {str(crew_error)[:200]}..."
             print(f"❌ Crew işlem hatası: {str(crew_error)}")
-            
-            # Hata mesajını da kaydet
-            self.conversation_manager.add_message(self.conversation_manager.session_id, 'assistant', error_msg)
-            
             return error_msg
     
+    def _answer_with_tool(self, route: dict) -> str:
+        """
+        Tek araç çağrısıyla cevaplanabilen niyetler: fiyat/stok (ürün URL'i) ve hata kodu (model + kod).
+        Araç çıktıları Türkçe olduğundan yalnızca Türkçe sorgularda; cevap yoksa None (uzmana gidilir).
+        """
+        product = route['product']
+        if route['language'] != 'tr' or not product:
+            return None
+        
+        if route['intent'] == 'price_stock' and product['url']:
+            from agent_system.tools import VestelPriceStockTool
+            result = VestelPriceStockTool()._run(product['url'])
+            if not result.startswith("❌"):
+                return f"🏷️ **{product['name']}**\n{result}"
+        
+        if route['intent'] == 'technical_support' and route['error_code']:
+            from agent_system.tools.error_code_tool import ErrorCodeLookupTool
+            result = ErrorCodeLookupTool()._run(product['model_number'], route['error_code'])
+            if result.startswith("🔧"):
+                return result
+        return None
+    
+    def _run_specialist(self, route: dict, user_query: str, agents) -> str:
+        """Yerel yönlendiricinin seçtiği uzmanı router agent'ı olmadan çalıştır"""
+        agent = getattr(agents, SPECIALIST_AGENTS[route['intent']])
+        product_name = route['product']['name'] if route['product'] else None
+        task = create_specialist_task(route['intent'], user_query, agent, product_name,
+                                      self.conversation_manager.session_id, route['language'])
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            memory=False,
+            verbose=True
+        )
+        
+        print(f"🚀 Uzman crew başlatılıyor ({route['intent']})...")
+        result = crew.kickoff()
+        print("✅ Uzman crew işlemi tamamlandı")
+        return str(result)
+    
     @property
     def session_id(self) -> str:
         """Mevcut session ID"""
@@ -0,0 +1,123 @@
+"""
+Manual Archive - Kılavuz sayfa metinleri için sıkıştırılmış, yalnızca-ekleme arşiv dosyası
+
+Her sayfa bağımsız bir parça (chunk) olarak sıkıştırılıp dosyanın sonuna eklenir; konum/uzunluk
+bilgisi manual_store'daki manual_pages tablosunda tutulur. Okuma mmap üzerinden yapılır:
+tek bir sayfa, kılavuzun geri kalanına dokunmadan dosyadan dilimlenir. Sıkıştırmanın kazanç
+sağlamadığı parçalar ham saklanır ve kopyalanmadan (memoryview) okunur.
+
+Dosya yerinde hiç kesilmez; boşaltma (reset) ve sıkıştırma (compact) yeni dosyayı os.replace ile
+koyar. Başka bir süreç dosyayı değiştirdiğinde eski eşleme inode karşılaştırmasıyla fark edilir ve
+yeniden eşlenir. Yeniden çıkarılan sayfaların eski parçaları ölü kalır; compact ile geri kazanılır
+(python -m agent_system.manual_store compact).
+"""
+
+import mmap
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+COMPRESSION_LEVEL = 6
+
+
+class ManualArchive:
+    """Tek dosyalık, yalnızca-ekleme sayfa arşivi (okumalar mmap ile)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.touch(exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._map_lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+        self._mapped_file: Optional[Tuple[int, int]] = None  # (st_dev, st_ino)
+
+    def append(self, text: str) -> Tuple[int, int, int]:
+        """Metni yeni bir parça olarak ekle. Dönüş: (offset, length, codec)"""
+        raw = (text or "").encode("utf-8")
+        packed = zlib.compress(raw, COMPRESSION_LEVEL)
+        codec, data = (CODEC_ZLIB, packed) if len(packed) < len(raw) else (CODEC_RAW, raw)
+
+        with self._write_lock:
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+                # İndeks satırı yazılmadan önce parça diskte olmalı (çökmede yarım parça sadece çöp kalır)
+                os.fsync(f.fileno())
+        return offset, len(data), codec
+
+    def _view(self, end: int) -> memoryview:
+        """
+        Dosyanın en az `end` byte'ını kapsayan eşlemenin görünümü.
+        Dosya başka bir süreçte değiştirildiyse (reset/compact -> os.replace) eski inode'un eşlemesi bırakılır.
+        """
+        with self._map_lock:
+            st = self.path.stat()
+            if self._mm is None or end > self._mapped_size or (st.st_dev, st.st_ino) != self._mapped_file:
+                if end > st.st_size:
+                    raise ValueError(f"Arşiv parçası dosya sınırı dışında ({end} > {st.st_size})")
+                with open(self.path, "rb") as f:
+                    # Eski eşleme, üzerindeki görünümler bırakılınca kendiliğinden kapanır
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    st = os.fstat(f.fileno())
+                self._mapped_size = st.st_size
+                self._mapped_file = (st.st_dev, st.st_ino)
+            return memoryview(self._mm)
+
+    def read_bytes(self, offset: int, length: int, codec: int):
+        """Tek parçanın UTF-8 byte'ları - ham parçalarda kopyasız memoryview"""
+        if length == 0:
+            return b""
+        chunk = self._view(offset + length)[offset:offset + length]
+        if codec == CODEC_RAW:
+            return chunk
+        return zlib.decompress(chunk)
+
+    def read_text(self, offset: int, length: int, codec: int) -> str:
+        return str(self.read_bytes(offset, length, codec), "utf-8")
+
+    def _swap_in(self, tmp: Path):
+        with self._map_lock:
+            os.replace(tmp, self.path)
+            self._mm = None
+            self._mapped_size = 0
+            self._mapped_file = None
+
+    def reset(self):
+        """Arşivi boşalt. Dosya yerinde kesilmez (açık eşlemelerde SIGBUS olur); boş dosyayla değiştirilir"""
+        with self._write_lock:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_bytes(b"")
+            self._swap_in(tmp)
+
+    def compact(self, chunks: List[Tuple[int, int]], on_moved: Callable[[List[int]], None]) -> int:
+        """
+        Yalnızca canlı (offset, length) parçalarını sırayla yeni dosyaya kopyalayıp arşivi onunla değiştir.
+        on_moved(yeni_offsetler) indeks satırlarını güncellemek için dosya değişmeden hemen önce çağrılır;
+        hata verirse eski dosya yerinde kalır. Dönüş: geri kazanılan byte
+        """
+        with self._write_lock:
+            before = self.size()
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            offsets = []
+            with open(tmp, "wb") as f:
+                for offset, length in chunks:
+                    offsets.append(f.tell())
+                    f.write(self._view(offset + length)[offset:offset + length] if length else b"")
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                on_moved(offsets)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            self._swap_in(tmp)
+            return before - self.size()
+
+    def size(self) -> int:
+        return self.path.stat().st_size
@@ -0,0 +1,595 @@
+"""
+Manual Store - Kılavuz metin önbelleği ve ortak (boilerplate) blok deposu
+
+Kılavuzlar içerik özetiyle (sha256) tanımlanır: renk/kapasite varyantları aynı PDF'i farklı
+dosya adlarıyla paylaştığında çıkarım, OCR ve türetilen tüm veriler belge başına bir kez
+hesaplanır ve `manuals` tablosundaki tek kayda bağlanır.
+
+Sayfa metinleri SQLite'ta değil, manual_archive'daki sıkıştırılmış arşiv dosyasında durur;
+manual_pages yalnızca parça konumlarını tutar ve metin sayfa sayfa, gerektiğinde okunur.
+Saklanan metin ham sayfa metnidir (ortak bloklar referansla değiştirilmez; bkz. boilerplate).
+
+Yeniden çıkarılan sayfaların arşivdeki eski parçaları ölü kalır; geri kazanmak için:
+    python -m agent_system.manual_store compact
+    python -m agent_system.manual_store stats
+"""
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agent_system.config import MANUALS_ARCHIVE_PATH, MANUALS_DATABASE_PATH
+from agent_system.manual_archive import ManualArchive
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# Sayfa metni biçimi (PRAGMA user_version). 1: ham metin - önceki sürüm ortak metni referansla saklıyordu
+PAGE_TEXT_VERSION = 1
+
+
+def content_hash(pdf_path: Path) -> str:
+    """Dosya içeriğinin sha256 özeti"""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ManualStore:
+    """Kılavuzlardan çıkarılan sayfa metinlerinin veritabanı yöneticisi"""
+
+    def __init__(self):
+        self.db_path = MANUALS_DATABASE_PATH
+        self.archive = ManualArchive(MANUALS_ARCHIVE_PATH)
+        self._boilerplate_index = None
+        self._boilerplate_version = None
+        self._lock = threading.Lock()
+        self.init_db()
+        self._migrate_page_text()
+
+    def init_db(self):
+        """Kılavuz tablolarını oluştur"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS manuals (
+                    manual_id TEXT PRIMARY KEY,
+                    file_name TEXT NOT NULL,
+                    file_path TEXT DEFAULT '',
+                    file_size INTEGER DEFAULT 0,
+                    total_pages INTEGER,
+                    used_ocr INTEGER DEFAULT 0,
+                    complete INTEGER DEFAULT 0,
+                    created_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS manual_files (
+                    file_path TEXT PRIMARY KEY,
+                    file_size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    manual_id TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS boilerplate_blocks (
+                    block_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text TEXT NOT NULL,
+                    manual_count INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS product_manuals (
+                    product_id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    model_number TEXT DEFAULT '',
+                    manual_path TEXT NOT NULL,
+                    resolved_path TEXT DEFAULT '',
+                    manual_id TEXT DEFAULT '',
+                    category TEXT DEFAULT ''
+                );
+                CREATE TABLE IF NOT EXISTS manual_tokens (
+                    token TEXT NOT NULL,
+                    product_id INTEGER NOT NULL,
+                    weight INTEGER NOT NULL,
+                    PRIMARY KEY (token, product_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS error_codes (
+                    manual_id TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    meaning TEXT NOT NULL DEFAULT '',
+                    remedy TEXT NOT NULL DEFAULT '',
+                    page INTEGER NOT NULL,
+                    PRIMARY KEY (manual_id, code, page)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS manual_specs (
+                    manual_id TEXT NOT NULL,
+                    spec_key TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    PRIMARY KEY (manual_id, spec_key)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS product_specs (
+                    product_id INTEGER NOT NULL,
+                    spec_key TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (product_id, spec_key)
+                ) WITHOUT ROWID;
+                CREATE VIRTUAL TABLE IF NOT EXISTS troubleshooting_fts USING fts5(
+                    search,
+                    text UNINDEXED,
+                    manual_id UNINDEXED,
+                    page UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+                CREATE TABLE IF NOT EXISTS manual_index_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            # Eski (ad:boyut:mtime anahtarlı) şemadan geçiş
+            page_columns = {row[1] for row in conn.execute("PRAGMA table_info(manual_pages)")}
+            if "manual_key" in page_columns:
+                conn.execute("ALTER TABLE manual_pages RENAME COLUMN manual_key TO manual_id")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS manual_pages (
+                    manual_id TEXT NOT NULL,
+                    page_no INTEGER NOT NULL,
+                    text TEXT NOT NULL DEFAULT '',
+                    ocr_used INTEGER DEFAULT 0,
+                    skipped INTEGER DEFAULT 0,
+                    archive_offset INTEGER,
+                    archive_length INTEGER DEFAULT 0,
+                    archive_codec INTEGER DEFAULT 0,
+                    PRIMARY KEY (manual_id, page_no)
+                )
+            """)
+            page_columns = {row[1] for row in conn.execute("PRAGMA table_info(manual_pages)")}
+            for column, ddl in (("archive_offset", "INTEGER"),
+                                ("archive_length", "INTEGER DEFAULT 0"),
+                                ("archive_codec", "INTEGER DEFAULT 0")):
+                if column not in page_columns:
+                    conn.execute(f"ALTER TABLE manual_pages ADD COLUMN {column} {ddl}")
+            index_columns = {row[1] for row in conn.execute("PRAGMA table_info(product_manuals)")}
+            if "manual_id" not in index_columns:
+                conn.execute("ALTER TABLE product_manuals ADD COLUMN manual_id TEXT DEFAULT ''")
+            if "category" not in index_columns:
+                conn.execute("ALTER TABLE product_manuals ADD COLUMN category TEXT DEFAULT ''")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_product_manuals_manual ON product_manuals(manual_id)")
+            self._migrate_legacy_cache(conn)
+            conn.commit()
+
+    def _migrate_legacy_cache(self, conn: sqlite3.Connection):
+        """manual_cache kayıtlarını içerik özetli `manuals` kayıtlarına taşı (OCR sonuçları korunur)"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'manual_cache'"
+        ).fetchone()
+        if not exists:
+            return
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("SELECT * FROM manual_cache").fetchall()
+        conn.row_factory = None
+        for row in rows:
+            path = Path(row["file_path"] or "")
+            try:
+                migratable = bool(row["file_path"]) and path.exists() and \
+                    f"{path.name}:{path.stat().st_size}:{int(path.stat().st_mtime)}" == row["manual_key"]
+            except OSError:
+                migratable = False
+            manual_id = self._register_file(conn, path) if migratable else None
+            already = manual_id and conn.execute(
+                "SELECT 1 FROM manuals WHERE manual_id = ? AND total_pages IS NOT NULL", (manual_id,)
+            ).fetchone()
+            if manual_id and not already:
+                conn.execute("""
+                    UPDATE manuals SET total_pages = ?, used_ocr = ?, complete = ? WHERE manual_id = ?
+                """, (row["total_pages"], row["used_ocr"], row["complete"], manual_id))
+                conn.execute("UPDATE manual_pages SET manual_id = ? WHERE manual_id = ?",
+                             (manual_id, row["manual_key"]))
+            else:
+                conn.execute("DELETE FROM manual_pages WHERE manual_id = ?", (row["manual_key"],))
+        conn.execute("DELETE FROM manual_pages WHERE manual_id NOT IN (SELECT manual_id FROM manuals)")
+        conn.execute("DROP TABLE manual_cache")
+        print(f"🔁 Kılavuz önbelleği içerik özetine taşındı ({len(rows)} kayıt)")
+
+    def _migrate_page_text(self):
+        """
+        Ortak metni referansla değiştirilmiş (eski biçim) sayfaları ve bu metinden türetilen indeksleri
+        (hata kodu, özellik, sorun giderme) sil - kılavuzlar ham metinle yeniden çıkarılıp indekslenir
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= PAGE_TEXT_VERSION:
+                return
+            stale = conn.execute("""
+                SELECT EXISTS(SELECT 1 FROM boilerplate_blocks) AND EXISTS(SELECT 1 FROM manual_pages)
+            """).fetchone()[0]
+        if stale:
+            self.clear_page_cache()
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DELETE FROM error_codes")
+                conn.execute("DELETE FROM manual_specs")
+                conn.execute("DELETE FROM troubleshooting_fts")
+                conn.commit()
+            print("🔁 Ortak metin referanslı kılavuz sayfaları silindi; ilk sorguda ham metinle yeniden çıkarılacak")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f"PRAGMA user_version = {PAGE_TEXT_VERSION}")
+            conn.commit()
+
+    # ============== Belge kimliği ==============
+
+    def _register_file(self, conn: sqlite3.Connection, pdf_path: Path) -> str:
+        """Dosyanın içerik özetini (boyut+mtime değişmediyse önbellekten) bul ve `manuals`'a kaydet"""
+        pdf_path = Path(pdf_path)
+        st = pdf_path.stat()
+        row = conn.execute(
+            "SELECT file_size, mtime, manual_id FROM manual_files WHERE file_path = ?", (str(pdf_path),)
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == int(st.st_mtime):
+            return row[2]
+
+        manual_id = content_hash(pdf_path)
+        conn.execute("""
+            INSERT OR REPLACE INTO manual_files (file_path, file_size, mtime, manual_id)
+            VALUES (?, ?, ?, ?)
+        """, (str(pdf_path), st.st_size, int(st.st_mtime), manual_id))
+        conn.execute("""
+            INSERT OR IGNORE INTO manuals (manual_id, file_name, file_path, file_size, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (manual_id, pdf_path.name, str(pdf_path), st.st_size, datetime.now().isoformat()))
+        return manual_id
+
+    def manual_id_for(self, pdf_path: Path) -> str:
+        """Dosyanın belge kimliği (içerik özeti) - aynı içerikli dosyalar aynı kimliği alır"""
+        with sqlite3.connect(self.db_path) as conn:
+            manual_id = self._register_file(conn, Path(pdf_path))
+            conn.commit()
+            return manual_id
+
+    def known_manual_ids(self, paths: List[str]) -> Dict[str, str]:
+        """Boyut+mtime'ı değişmemiş dosyaların önbellekteki belge kimlikleri (özet hesaplanmaz)"""
+        known = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for path in paths:
+                row = conn.execute(
+                    "SELECT file_size, mtime, manual_id FROM manual_files WHERE file_path = ?", (path,)
+                ).fetchone()
+                if not row:
+                    continue
+                try:
+                    st = Path(path).stat()
+                except OSError:
+                    continue
+                if row[0] == st.st_size and row[1] == int(st.st_mtime):
+                    known[path] = row[2]
+        return known
+
+    def pending_manual_paths(self) -> List[str]:
+        """İndekste belge kimliği henüz hesaplanmamış kılavuz dosyaları"""
+        with sqlite3.connect(self.db_path) as conn:
+            return [row[0] for row in conn.execute("""
+                SELECT DISTINCT resolved_path FROM product_manuals
+                WHERE manual_id = '' AND resolved_path != ''
+            """)]
+
+    def set_product_manual_id(self, resolved_path: str, manual_id: str):
+        """Dosyanın hesaplanan belge kimliğini onu kullanan tüm ürünlere yaz"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE product_manuals SET manual_id = ? WHERE resolved_path = ?",
+                         (manual_id, resolved_path))
+            conn.commit()
+
+    # ============== Sayfa önbelleği ==============
+
+    def get_manual(self, manual_id: str) -> Optional[Dict]:
+        """
+        Kılavuzun meta bilgisi ve o ana kadar çıkarılmış sayfaları (tamamlanmamış olabilir); çıkarım başlamadıysa None.
+        Sayfa kayıtları metni içermez - metin için page_text(page)
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            meta = conn.execute(
+                "SELECT * FROM manuals WHERE manual_id = ? AND total_pages IS NOT NULL", (manual_id,)
+            ).fetchone()
+            if not meta:
+                return None
+            # Arşivden önceki kayıtlarda metin hâlâ tabloda (archive_offset NULL)
+            pages = conn.execute("""
+                SELECT page_no, ocr_used, skipped, archive_offset, archive_length, archive_codec,
+                       CASE WHEN archive_offset IS NULL THEN text END AS legacy_text
+                FROM manual_pages
+                WHERE manual_id = ? ORDER BY page_no
+            """, (manual_id,)).fetchall()
+            return {**dict(meta), 'pages': [dict(p) for p in pages]}
+
+    def begin_manual(self, manual_id: str, total_pages: int):
+        """Çıkarımı başlayan kılavuzun sayfa sayısını kaydet (başlamışsa dokunma - devam eden çıkarım)"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE manuals SET total_pages = ?
+                WHERE manual_id = ? AND total_pages IS NULL
+            """, (total_pages, manual_id))
+            conn.commit()
+
+    def page_text(self, page: Dict) -> str:
+        """
+        get_manual() sayfa kaydının ham metni (ortak bloklar dahil) - arşivden yalnızca bu sayfanın
+        parçası okunur. Türetilmiş indeksler bunu kullanır; LLM çıktısı ayrıca kısaltılır (render_page).
+        """
+        if page.get('archive_offset') is None:
+            return page.get('legacy_text') or page.get('text') or ''
+        return self.archive.read_text(page['archive_offset'], page['archive_length'], page['archive_codec'])
+
+    def save_page(self, manual_id: str, page: Dict):
+        """Tek sayfayı hemen kalıcı yaz - çökme sonrası çıkarım buradan devam eder"""
+        offset, length, codec = self.archive.append(page.get('text', ''))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO manual_pages
+                (manual_id, page_no, text, ocr_used, skipped, archive_offset, archive_length, archive_codec)
+                VALUES (?, ?, '', ?, ?, ?, ?, ?)
+            """, (manual_id, page['page_no'], int(page.get('ocr_used', False)),
+                  int(page.get('skipped', False)), offset, length, codec))
+            if page.get('ocr_used'):
+                conn.execute("UPDATE manuals SET used_ocr = 1 WHERE manual_id = ?", (manual_id,))
+            conn.commit()
+
+    def mark_complete(self, manual_id: str):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE manuals SET complete = 1 WHERE manual_id = ?", (manual_id,))
+            conn.commit()
+
+    def list_complete(self) -> List[Dict]:
+        """Çıkarımı bitmiş kılavuzlar (türetilmiş indeksleri toplu yeniden oluşturmak için)"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT manual_id, file_name, file_path FROM manuals WHERE complete = 1"
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def list_incomplete(self) -> List[Dict]:
+        """Yarım kalmış (ör. süreç çöktüğü için) çıkarımlar"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT manual_id, file_name, file_path FROM manuals
+                WHERE complete = 0 AND total_pages IS NOT NULL
+            """).fetchall()
+            return [dict(r) for r in rows]
+
+    def compact_archive(self) -> int:
+        """
+        Arşivi yalnızca manual_pages'in gösterdiği parçalarla yeniden yaz (ölü parçaları at).
+        Satırlar dosya değişimiyle aynı işlemde güncellenir; çıkarım sürerken çalıştırılmamalı
+        (başka süreçte o an eklenen parça yeni dosyada olmaz). Dönüş: geri kazanılan byte
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")  # Bu süreçte ve diğerlerinde save_page satır yazamaz
+            rows = conn.execute("""
+                SELECT manual_id, page_no, archive_offset, archive_length FROM manual_pages
+                WHERE archive_offset IS NOT NULL ORDER BY archive_offset
+            """).fetchall()
+
+            def on_moved(offsets: List[int]):
+                conn.executemany(
+                    "UPDATE manual_pages SET archive_offset = ? WHERE manual_id = ? AND page_no = ?",
+                    [(new, manual_id, page_no) for new, (manual_id, page_no, _, _) in zip(offsets, rows)]
+                )
+
+            reclaimed = self.archive.compact([(offset, length) for _, _, offset, length in rows], on_moved)
+            conn.commit()
+        return reclaimed
+
+    def archive_stats(self) -> Dict:
+        """Arşiv dosyası boyutu ve canlı parçaların kapladığı byte"""
+        with sqlite3.connect(self.db_path) as conn:
+            pages, live = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(archive_length), 0) FROM manual_pages
+                WHERE archive_offset IS NOT NULL
+            """).fetchone()
+        size = self.archive.size()
+        return {'pages': pages, 'live_bytes': live, 'file_bytes': size, 'dead_bytes': max(0, size - live)}
+
+    def clear_page_cache(self):
+        """Tüm sayfa önbelleğini sil (ör. sayfa metni biçimi değiştiğinde) - belge kimlikleri korunur"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM manual_pages")
+            conn.execute("UPDATE manuals SET total_pages = NULL, used_ocr = 0, complete = 0")
+            conn.commit()
+        self.archive.reset()
+
+    # ============== Ortak bloklar ==============
+
+    def replace_boilerplate_blocks(self, blocks: List[Tuple[str, int]]):
+        """Ortak blok kümesini yenisiyle değiştir (sayfalar ham saklandığından önbellek geçerli kalır)"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM boilerplate_blocks")
+            conn.executemany(
+                "INSERT INTO boilerplate_blocks (text, manual_count) VALUES (?, ?)", blocks
+            )
+            conn.commit()
+        with self._lock:
+            self._boilerplate_index = None
+
+    def boilerplate_index(self):
+        """
+        Ortak blok indeksini belleğe yükle. Küme başka bir süreçte (boilerplate build) değiştiyse
+        yeniden yüklenir: AUTOINCREMENT kimlikler her değişimde büyür.
+        """
+        from agent_system.tools.boilerplate import BoilerplateIndex
+
+        with sqlite3.connect(self.db_path) as conn:
+            version = conn.execute("SELECT COUNT(*), MAX(block_id) FROM boilerplate_blocks").fetchone()
+            with self._lock:
+                if self._boilerplate_index is None or version != self._boilerplate_version:
+                    rows = conn.execute(
+                        "SELECT block_id, text, manual_count FROM boilerplate_blocks"
+                    ).fetchall()
+                    self._boilerplate_index = BoilerplateIndex(rows)
+                    self._boilerplate_version = version
+                return self._boilerplate_index
+
+    # ============== Hata kodları ==============
+
+    def replace_error_codes(self, manual_id: str, rows: List[Tuple[str, str, str, int]]):
+        """Kılavuzun hata kodu satırlarını (code, meaning, remedy, page) yenisiyle değiştir"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM error_codes WHERE manual_id = ?", (manual_id,))
+            conn.executemany("""
+                INSERT OR REPLACE INTO error_codes (manual_id, code, meaning, remedy, page)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(manual_id, *row) for row in rows])
+            conn.commit()
+
+    def lookup_error_codes(self, manual_id: str, codes: List[str]) -> List[Dict]:
+        if not codes:
+            return []
+        placeholders = ",".join("?" * len(codes))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"""
+                SELECT code, meaning, remedy, page FROM error_codes
+                WHERE manual_id = ? AND code IN ({placeholders})
+                ORDER BY page
+            """, (manual_id, *codes)).fetchall()
+            return [dict(r) for r in rows]
+
+    def manual_error_codes(self, manual_id: str) -> List[str]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT code FROM error_codes WHERE manual_id = ? ORDER BY code", (manual_id,)
+            ).fetchall()
+            return [r[0] for r in rows]
+
+    # ============== Teknik özellikler ==============
+
+    def replace_manual_specs(self, manual_id: str, rows: List[Tuple[str, str, str, int]]):
+        """Kılavuzun özellik tablosu satırlarını (spec_key, label, value, page) yenisiyle değiştir"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM manual_specs WHERE manual_id = ?", (manual_id,))
+            conn.executemany("""
+                INSERT OR IGNORE INTO manual_specs (manual_id, spec_key, label, value, page)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(manual_id, *row) for row in rows])
+            conn.commit()
+
+    def product_specs(self, product_id: int) -> List[Dict]:
+        """
+        Ürünün birleşik özellikleri: katalog (manual_keywords) satırları + kılavuz tablosu satırları.
+        Aynı anahtarda katalog değeri önce gelir (source='katalog' / 'kılavuz').
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT spec_key, label, value, 'katalog' AS source, NULL AS page, 0 AS priority
+                FROM product_specs WHERE product_id = ?
+                UNION ALL
+                SELECT s.spec_key, s.label, s.value, 'kılavuz' AS source, s.page, 1 AS priority
+                FROM manual_specs s JOIN product_manuals p ON p.manual_id = s.manual_id
+                WHERE p.product_id = ? AND p.manual_id != ''
+                ORDER BY priority
+            """, (product_id, product_id)).fetchall()
+            return [dict(r) for r in rows]
+
+    # ============== Sorun giderme arama indeksi ==============
+
+    def replace_troubleshooting(self, manual_id: str, passages: List[Tuple[int, str, str]]):
+        """Kılavuzun sorun giderme pasajlarını (page, text, search) yenisiyle değiştir"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM troubleshooting_fts WHERE manual_id = ?", (manual_id,))
+            conn.executemany("""
+                INSERT INTO troubleshooting_fts (search, text, manual_id, page) VALUES (?, ?, ?, ?)
+            """, [(search, text, manual_id, page) for page, text, search in passages])
+            conn.commit()
+
+    def search_troubleshooting(self, match: str, category: str = "", limit: int = 5) -> List[Dict]:
+        """
+        Tüm kılavuzların sorun giderme pasajlarında FTS5 araması (bm25 sıralı).
+        category verilirse yalnızca o kategorideki ürünlerin kılavuzları (normalize edilmiş alt dize).
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT f.text, f.page, f.manual_id, bm25(troubleshooting_fts) AS rank,
+                       (SELECT group_concat(model_number, ', ') FROM product_manuals p
+                        WHERE p.manual_id = f.manual_id) AS models,
+                       (SELECT category FROM product_manuals p
+                        WHERE p.manual_id = f.manual_id LIMIT 1) AS category
+                FROM troubleshooting_fts f
+                WHERE troubleshooting_fts MATCH ?
+                  AND (? = '' OR f.manual_id IN (
+                        SELECT manual_id FROM product_manuals WHERE category LIKE '%' || ? || '%'))
+                ORDER BY rank
+                LIMIT ?
+            """, (match, category, category, limit)).fetchall()
+            return [dict(r) for r in rows]
+
+    def list_categories(self) -> List[str]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("""
+                SELECT category FROM product_manuals WHERE category != ''
+                GROUP BY category ORDER BY COUNT(*) DESC
+            """).fetchall()
+            return [r[0] for r in rows]
+
+    # ============== Ürün → kılavuz çözümleme indeksi ==============
+
+    def replace_manual_index(self, products: List[Dict], tokens: List[Tuple[str, int, int]],
+                             meta: Dict[str, str], specs: List[Tuple[int, str, str, str]] = ()):
+        """Çözümleme indeksini (ve katalog özelliklerini) tek işlemde yenisiyle değiştir"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM product_manuals")
+            conn.execute("DELETE FROM product_specs")
+            conn.executemany("""
+                INSERT OR IGNORE INTO product_specs (product_id, spec_key, label, value) VALUES (?, ?, ?, ?)
+            """, specs)
+            conn.execute("DELETE FROM manual_tokens")
+            conn.execute("DELETE FROM manual_index_meta")
+            conn.executemany("""
+                INSERT INTO product_manuals
+                (product_id, name, model_number, manual_path, resolved_path, manual_id, category)
+                VALUES (:product_id, :name, :model_number, :manual_path, :resolved_path, :manual_id, :category)
+            """, products)
+            conn.executemany(
+                "INSERT INTO manual_tokens (token, product_id, weight) VALUES (?, ?, ?)", tokens
+            )
+            conn.executemany(
+                "INSERT INTO manual_index_meta (key, value) VALUES (?, ?)", list(meta.items())
+            )
+            conn.commit()
+
+    def manual_index_meta(self) -> Dict[str, str]:
+        with sqlite3.connect(self.db_path) as conn:
+            return dict(conn.execute("SELECT key, value FROM manual_index_meta").fetchall())
+
+    def resolve_manual_tokens(self, tokens: List[str]) -> Optional[Dict]:
+        """Token'larla en yüksek ağırlık toplamına sahip ürünün kılavuz kaydı (tek indeksli sorgu)"""
+        if not tokens:
+            return None
+        placeholders = ",".join("?" * len(tokens))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(f"""
+                SELECT p.*, SUM(t.weight) AS score
+                FROM manual_tokens t JOIN product_manuals p ON p.product_id = t.product_id
+                WHERE t.token IN ({placeholders})
+                GROUP BY t.product_id
+                ORDER BY score DESC, LENGTH(p.model_number), p.product_id
+                LIMIT 1
+            """, tokens).fetchone()
+            return dict(row) if row else None
+
+# Global instance
+manual_store = ManualStore()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kılavuz sayfa arşivi bakımı")
+    parser.add_argument("command", choices=["compact", "stats"])
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        reclaimed = manual_store.compact_archive()
+        print(f"🗜️ Kılavuz arşivi sıkıştırıldı: {reclaimed / 1024:.1f} KB geri kazanıldı")
+    stats = manual_store.archive_stats()
+    print(f"📦 {stats['pages']} sayfa, dosya {stats['file_bytes'] / 1024:.1f} KB, "
+          f"ölü parça {stats['dead_bytes'] / 1024:.1f} KB")
@@ -0,0 +1,137 @@
+"""
+Product Mentions - Mesajlardaki ürün kategorisi ve model numarası bahislerini katalogla eşler
+
+Her kullanıcı mesajı eklenirken yalnızca o mesaj taranır; bulunan varlıklar session_entities
+tablosuna (session başına, son görülme sırasıyla) yazılır. Böylece bağlam oluşturmak tüm geçmişi
+yeniden taramadan, session'ın küçük varlık listesinden yapılır.
+"""
+
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from agent_system.text_utils import product_category, query_tokens, tokenize
+
+# Normalize edilmiş ifade -> gösterilecek kategori (uzun ifadeler önce denenir)
+CATEGORY_KEYWORDS = {
+    "camasir makinesi": "Çamaşır Makinesi",
+    "washing machine": "Çamaşır Makinesi",
+    "kurutma makinesi": "Kurutma Makinesi",
+    "dryer": "Kurutma Makinesi",
+    "bulasik makinesi": "Bulaşık Makinesi",
+    "dishwasher": "Bulaşık Makinesi",
+    "derin dondurucu": "Derin Dondurucu",
+    "buzdolabi": "Buzdolabı",
+    "refrigerator": "Buzdolabı",
+    "fridge": "Buzdolabı",
+    "televizyon": "Televizyon",
+    "tv": "Televizyon",
+    "mikrodalga": "Mikrodalga",
+    "microwave": "Mikrodalga",
+    "firin": "Fırın",
+    "oven": "Fırın",
+}
+MIN_MODEL_KEY_CHARS = 5  # "km97302", "32fa9740" - daha kısa birleşimler yanlış eşleşir
+
+
+def _category_pattern(phrase: str) -> re.Pattern:
+    # Türkçe ekler için uzun ifadelerde önek eşleşmesi ("buzdolabimi"); kısa olanlar ("tv") tam kelime
+    tail = r"(?![a-z0-9])" if len(phrase) < 4 else ""
+    return re.compile(r"(?<![a-z0-9])" + re.escape(phrase) + tail)
+
+
+CATEGORY_PATTERNS = [
+    (_category_pattern(phrase), name)
+    for phrase, name in sorted(CATEGORY_KEYWORDS.items(), key=lambda kv: -len(kv[0]))
+]
+
+
+def find_categories(text: str) -> List[str]:
+    """Metindeki kategori ifadeleri (gösterim adlarıyla, ilk geçiş sırasıyla)"""
+    normalized = " ".join(tokenize(text))
+    found = []
+    for pattern, name in CATEGORY_PATTERNS:
+        match = pattern.search(normalized)
+        if match and name not in [n for _, n in found]:
+            found.append((match.start(), name))
+    return [name for _, name in sorted(found)]
+
+
+def _model_keys(model_number: str) -> List[str]:
+    """Model numarasının eşleşme anahtarları: ardışık parça birleşimleri ("km", "97302", "wifi" -> km97302, km97302wifi...)"""
+    parts = tokenize(model_number)
+    keys = []
+    for start in range(len(parts)):
+        for end in range(start + 1, len(parts) + 1):
+            key = "".join(parts[start:end])
+            if len(key) >= MIN_MODEL_KEY_CHARS and re.search(r"\d", key) and re.search(r"[a-z]", key):
+                keys.append(key)
+    return keys
+
+
+class CatalogMatcher:
+    """Ürün kataloğundan model anahtarı indeksi (süreç başına bir kez, ilk kullanımda yüklenir)"""
+
+    def __init__(self, products_db=None):
+        self._products_db = products_db
+        self._lock = threading.Lock()
+        self._models: Optional[Dict[str, List[Dict]]] = None
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        if self._models is not None:
+            return self._models
+        with self._lock:
+            if self._models is None:
+                from agent_system.config import PRODUCTS_DATABASE_PATH
+
+                models: Dict[str, List[Dict]] = {}
+                with sqlite3.connect(self._products_db or PRODUCTS_DATABASE_PATH) as conn:
+                    rows = conn.execute("""
+                        SELECT name, model_number, manual_keywords, url FROM products
+                        WHERE model_number IS NOT NULL AND model_number != ''
+                    """).fetchall()
+                for name, model_number, keywords, url in rows:
+                    categories = find_categories(product_category(keywords))
+                    product = {
+                        'model_number': model_number,
+                        'name': name or model_number,
+                        'category': categories[0] if categories else "",
+                        'full_key': "".join(tokenize(model_number)),
+                        'url': url,
+                    }
+                    for key in _model_keys(model_number):
+                        models.setdefault(key, []).append(product)
+                self._models = models
+        return self._models
+
+    def find_models(self, text: str) -> List[Dict]:
+        """Metinde geçen katalog modelleri. Aynı anahtarı paylaşanlarda tam model eşleşmesi, yoksa en kısa model seçilir"""
+        models = self._load()
+        found: Dict[str, Dict] = {}
+        # Uzun birleşimler önce: "km 97302 wifi" -> km97302wifi, km97302 ayrıca sayılmasın
+        for token in sorted(query_tokens(text), key=len, reverse=True):
+            candidates = models.get(token)
+            if not candidates or any(token in key for key in found):
+                continue
+            exact = [p for p in candidates if p['full_key'] == token]
+            found[token] = (exact or sorted(candidates, key=lambda p: len(p['full_key'])))[0]
+        unique = {p['model_number']: p for p in found.values()}
+        return list(unique.values())
+
+    def extract(self, text: str) -> List[Tuple[str, str, str]]:
+        """Mesajdaki varlıklar: (kind, value, detail) - kind 'model' veya 'category'"""
+        if not text:
+            return []
+        entities = []
+        categories = find_categories(text)
+        for product in self.find_models(text):
+            entities.append(('model', product['model_number'], product['name']))
+            if product['category'] and product['category'] not in categories:
+                categories.append(product['category'])
+        entities.extend(('category', name, '') for name in categories)
+        return entities
+
+
+# Global instance
+catalog_matcher = CatalogMatcher()
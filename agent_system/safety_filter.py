@@ -0,0 +1,245 @@
+"""
+Safety Filter - Router agent'ından önce yerel güvenlik ve konu dışı ön filtresi
+
+Router agent'ın ilk işi güvenlik kontrolüdür (küfür, siyaset, rakip markalar, Vestel dışı konular)
+ve bunun için tam bir LLM gidiş-dönüşü harcar. Bu modül mesajı yerel olarak üç sonuca ayırır:
+
+- blocked: açıkça uygunsuz (küfür, cinsellik, şiddet/uyuşturucu, hack), spam ya da sınıflandırıcıya
+  göre yüksek güvenle ve Vestel bağlamı olmadan konu dışı - standart ret cevabı döner, mesaj
+  Gemini'ye hiç gitmez
+- uncertain: yumuşak kara liste ifadesi (siyaset, rakip marka, konu dışı kelime - "LG kumandası ile
+  çalışır mı", "gizlilik politikanız") ya da düşük güvenli konu dışı tahmin - karar LLM router'a kalır,
+  yerel hızlı yol (intent_router) kullanılmaz
+- safe: hiçbir işaret yok
+
+Kara listeler normalize edilmiş metne uygulanır: aksansız küçük harf, leetspeak ("s1kt1r"),
+uzatılmış harfler ("fuuuck") ve harf harf yazım ("f u c k") tek biçime indirilir. Küfür listesi
+ı/i ayrımını koruyan biçime uygulanır: "sık sık", "sıkıştı" küfür köküyle karışmaz.
+"""
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from agent_system.intent_router import IntentClassifier, TRAINING_SAMPLES, detect_query_language
+from agent_system.text_utils import normalize_token_text
+
+BLOCKED = "blocked"
+UNCERTAIN = "uncertain"
+SAFE = "safe"
+
+# Bağlamdan bağımsız reddedilen kategoriler
+HARD_BLOCKLISTS: Dict[str, Tuple[str, ...]] = {
+    # ı/i ayrımı korunmuş metne uygulanır; "sık"/"sıkış" ile karışan yalın kökler listede yok
+    "profanity": (
+        "amk", "aq", "siktir", "sikerim", "sikeyim", "sikik", "amina", "amına", "orospu", "yarrak",
+        "pezevenk", "kahpe", "gavat", "yavsak", "serefsiz", "pic kurusu",
+        "fuck", "shit", "bitch", "asshole", "cunt", "motherf", "bastard", "dickhead",
+    ),
+    "sexual": ("porno", "porn", "seks", "sex", "sexy", "nude", "erotik", "erotic", "escort"),
+    "violence": (
+        "silah", "tabanca", "firearm", "pistol", "rifle", "bomba yapimi", "make a bomb", "oldurmek",
+        "oldurecegim", "uyusturucu", "esrar", "kokain", "cocaine", "eroin", "heroin", "marijuana",
+    ),
+    "hacking": (
+        "hack", "hacker", "virus yaz", "write a virus", "malware", "exploit", "ddos", "sql injection",
+        "keylogger", "phishing", "sifre kir", "crack password",
+    ),
+}
+# Kelime başı önek eşleşmesinde masum devamlar: "seksen" (80), "esrarengiz" (gizemli), "hacklendi"
+# (kullanıcının cihazı saldırıya uğramış - destek sorusu). Eşleşme bu devamlarla sürüyorsa sayılmaz.
+PREFIX_EXCEPTIONS: Dict[str, Tuple[str, ...]] = {
+    "seks": ("en",),
+    "esrar": ("engiz", "li"),
+    "heroin": ("e",),
+    "hack": ("lendi", "lenmis", "lenir", "ed"),
+}
+# Hiçbir zaman yerelde reddedilmez, LLM router'a bırakılır (Vestel sorularında da geçebilir)
+SOFT_BLOCKLISTS: Dict[str, Tuple[str, ...]] = {
+    "politics": (
+        "erdogan", "kilicdaroglu", "imamoglu", "chp", "akp", "mhp", "hdp", "cumhurbaskani", "milletvekili",
+        "siyaset", "politika", "politics", "election", "president", "secimler", "secim sonuc", "islam",
+        "hristiyan", "ateist", "religion", "irkci", "racist",
+    ),
+    "competitor": (
+        "arcelik", "beko", "bosch", "siemens", "samsung", "lg", "profilo", "grundig", "altus", "regal",
+        "whirlpool", "electrolux", "sony", "philips", "tcl", "xiaomi", "iphone",
+    ),
+    "off_topic": (
+        "hava durumu", "weather", "futbol", "football", "galatasaray", "fenerbahce", "besiktas",
+        "iddaa", "bahis", "casino", "betting", "bitcoin", "kripto", "crypto", "borsa", "stock market",
+        "odevim", "homework", "siir yaz", "write a poem", "kod yaz", "write code", "python",
+        "javascript", "diyet", "recete", "avukat", "lawyer",
+    ),
+}
+
+# Sınıflandırıcı: Vestel konulu örnekler (intent_router'ın eğitim kümesi) karşısında konu dışı örnekler
+OFF_TOPIC_SAMPLES: Tuple[str, ...] = (
+    "bugün hava nasıl", "yarın yağmur yağacak mı", "maç kaç kaç bitti", "bana bir şiir yaz",
+    "bir fıkra anlat", "ödevimi yapar mısın", "dolar kuru ne kadar", "altın alınır mı",
+    "en iyi film önerisi", "tatil için otel öner", "kilo vermek için diyet listesi",
+    "başım ağrıyor hangi ilacı içeyim", "bu cümleyi ingilizceye çevir", "türkiyenin başkenti neresi",
+    "sevgilime ne hediye alayım", "araba sigortası ne kadar", "uçak bileti bul",
+    "what is the weather today", "who won the game last night", "write me a poem", "tell me a joke",
+    "do my homework", "best movie to watch tonight", "book a flight to london", "give me stock tips",
+    "translate this sentence", "what is the capital of france", "how to lose weight fast",
+    "recommend a good restaurant", "who is the president", "solve this math problem",
+)
+CLASSIFIER_SAMPLES = {
+    "on_topic": tuple(text for texts in TRAINING_SAMPLES.values() for text in texts),
+    "off_topic": OFF_TOPIC_SAMPLES,
+}
+
+SPAM_MAX_FOREIGN_LINKS = 1   # vestel.com.tr dışı bağlantı sayısı bunu aşarsa spam
+SPAM_CHAR_RUN = 15           # Aynı karakterin art arda tekrarı
+SPAM_MIN_TOKENS = 12         # Bu uzunluktan itibaren tekrar oranına bakılır
+SPAM_MIN_UNIQUE_RATIO = 0.25
+
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+VESTEL_URL_PATTERN = re.compile(r"^(?:https?://)?(?:www\.)?vestel\.com\.tr(?:/|$)", re.IGNORECASE)
+CHAR_RUN_PATTERN = re.compile(r"(\S)\1{%d,}" % (SPAM_CHAR_RUN - 1))
+_LEET = str.maketrans("013457", "oieast")
+_LEET_SYMBOLS = {"@": "a", "$": "s", "!": "i"}
+LEET_SYMBOL_PATTERN = re.compile(r"[@$!](?=[a-z0-9])")  # "merhaba!" dokunulmaz, "$h!t" -> "shit"
+
+
+def _blocklist_part(phrase: str) -> str:
+    part = re.escape(phrase) + (r"(?![a-zı0-9])" if len(phrase) < 4 else "")
+    if phrase in PREFIX_EXCEPTIONS:
+        part += "(?!" + "|".join(PREFIX_EXCEPTIONS[phrase]) + ")"
+    return part
+
+
+def _blocklist_pattern(phrases: Tuple[str, ...]) -> re.Pattern:
+    # intent_router kurallarıyla aynı: kelime başında eşleşme; kısa ifadeler ("aq", "lg") tam kelime,
+    # belirsiz kökler (PREFIX_EXCEPTIONS) masum devamlarında eşleşmez
+    parts = [_blocklist_part(p) for p in sorted(phrases, key=len, reverse=True)]
+    return re.compile(r"(?<![a-zı0-9])(?:" + "|".join(parts) + ")")
+
+
+HARD_PATTERNS = {category: _blocklist_pattern(p) for category, p in HARD_BLOCKLISTS.items()}
+SOFT_PATTERNS = {category: _blocklist_pattern(p) for category, p in SOFT_BLOCKLISTS.items()}
+
+
+def normalize_for_filter(text: str, keep_dotless_i: bool = False) -> str:
+    """
+    Kara liste eşleşmesi için tek biçim: "F.u.u.u.c.k", "s1kt1r", "$h!t" -> "fuck", "siktir", "shit".
+    keep_dotless_i: ı, i'ye katlanmaz (küfür listesi için: "sık" ile "sik" ayrı kalır)
+    """
+    if keep_dotless_i:
+        text = "ı".join(normalize_token_text(part) for part in (text or "").split("ı"))
+    else:
+        text = normalize_token_text(text)
+    text = LEET_SYMBOL_PATTERN.sub(lambda m: _LEET_SYMBOLS[m.group(0)], text)
+    tokens = []
+    for token in re.findall(r"[a-zı0-9]+", text):
+        if not token.isdigit() and not token.isalpha():
+            token = token.translate(_LEET)  # Harf ve rakam karışık: leetspeak
+        tokens.append(token)
+
+    # Harf harf yazılmış kelimeler: ardışık 3+ tek harfli token birleştirilir
+    merged: List[str] = []
+    run: List[str] = []
+    for token in tokens + [""]:
+        if len(token) == 1 and token.isalpha():
+            run.append(token)
+            continue
+        merged.extend(["".join(run)] if len(run) >= 3 else run)
+        run = []
+        if token:
+            merged.append(token)
+    return re.sub(r"([a-zı])\1{2,}", r"\1", " ".join(merged))  # 3+ tekrar eden harf -> tek
+
+
+def _spam_reason(text: str, normalized: str) -> Optional[str]:
+    foreign_links = [url for url in URL_PATTERN.findall(text) if not VESTEL_URL_PATTERN.match(url)]
+    if len(foreign_links) > SPAM_MAX_FOREIGN_LINKS:
+        return f"{len(foreign_links)} harici bağlantı"
+    if CHAR_RUN_PATTERN.search(text):
+        return "karakter tekrarı"
+    tokens = normalized.split()
+    if len(tokens) >= SPAM_MIN_TOKENS and len(set(tokens)) / len(tokens) < SPAM_MIN_UNIQUE_RATIO:
+        return "kelime tekrarı"
+    return None
+
+
+class SafetyFilter:
+    """Kara listeler + konu sınıflandırıcısı ile yerel ön filtre"""
+
+    def __init__(self, classifier: Optional[IntentClassifier] = None, router=None):
+        self._classifier = classifier or IntentClassifier(CLASSIFIER_SAMPLES)
+        self._router = router
+
+    @property
+    def router(self):
+        if self._router is None:
+            from agent_system.intent_router import intent_router
+            self._router = intent_router
+        return self._router
+
+    def vestel_context(self, text: str, normalized: str) -> bool:
+        """Mesajda Vestel bağlamı var mı: marka, ürün kategorisi, katalog modeli ya da destek ifadesi"""
+        from agent_system.product_mentions import find_categories
+
+        if re.search(r"(?<![a-z0-9])vestel", normalized):
+            return True
+        if find_categories(text) or self.router.rule_hits(text):
+            return True
+        return bool(self.router.matcher.find_models(text))
+
+    def check(self, text: str, off_topic_confidence: Optional[float] = None) -> Dict:
+        """
+        Mesajın ön filtre sonucu.
+        Dönüş: verdict (blocked/uncertain/safe), category, matched, off_topic (sınıflandırıcı olasılığı),
+        language (ret cevabının dili), elapsed_ms
+        """
+        if off_topic_confidence is None:
+            from agent_system.config import SAFETY_OFFTOPIC_CONFIDENCE
+            off_topic_confidence = SAFETY_OFFTOPIC_CONFIDENCE
+
+        start = time.perf_counter()
+        normalized = normalize_for_filter(text)
+        dotted = normalize_for_filter(text, keep_dotless_i=True)
+        verdict, category, matched = SAFE, None, None
+
+        for name, pattern in HARD_PATTERNS.items():
+            match = pattern.search(dotted if name == "profanity" else normalized)
+            if match:
+                verdict, category, matched = BLOCKED, name, match.group(0)
+                break
+
+        if verdict == SAFE:
+            spam = _spam_reason(text or "", normalized)
+            if spam:
+                verdict, category, matched = BLOCKED, "spam", spam
+
+        off_topic = None
+        if verdict == SAFE:
+            off_topic = self._classifier.predict_proba(normalized)["off_topic"]
+            soft = next(((name, m.group(0)) for name, pattern in SOFT_PATTERNS.items()
+                         for m in [pattern.search(normalized)] if m), None)
+            if soft:
+                # "samsung buzdolabıyla karşılaştır", "LG kumandası ile çalışır mı": LLM karar versin
+                verdict, (category, matched) = UNCERTAIN, soft
+            elif off_topic >= 0.5 and not self.vestel_context(text, normalized):
+                category = "off_topic"
+                verdict = BLOCKED if off_topic >= off_topic_confidence else UNCERTAIN
+
+        return {
+            'verdict': verdict,
+            'category': category,
+            'matched': matched,
+            'off_topic': None if off_topic is None else round(off_topic, 3),
+            'language': detect_query_language(text),
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+        }
+
+
+def refusal_message(language: str) -> str:
+    """Standart ret cevabı (router agent'ın Vestel dışı konu kuralıyla aynı metin)"""
+    from agent_system.constants import REFUSAL_MESSAGE_EN, REFUSAL_MESSAGE_TR
+    return REFUSAL_MESSAGE_EN if language == "en" else REFUSAL_MESSAGE_TR
+
+
+# Global instance
+safety_filter = SafetyFilter()
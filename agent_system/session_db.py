@@ -1,24 +1,128 @@
 """
 Session Database Management
+
+Session'ların tek kalıcı deposu: sessions, messages ve session_products tabloları (WAL modunda).
+Eski sessions/<id>.json dosyaları migrate_json_sessions ile bir kez içe aktarılır.
+
+Bağlantılar iş parçacığı başına bir kez açılıp tekrar kullanılır (hazırlanmış ifade önbelleği korunur);
+yazmalar transaction() ile BEGIN IMMEDIATE ... COMMIT olarak çalışır.
 """
-import sqlite3
+import base64
+import html
 import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from agent_system.config import DATABASE_PATH
 
+BUSY_TIMEOUT_SECONDS = 10.0   # Yazma kilidi beklenirken "database is locked" yerine bu kadar beklenir
+CACHED_STATEMENTS = 256       # Bağlantı başına hazırlanmış ifade önbelleği (varsayılan 128)
+SEARCH_MAX_TERMS = 8          # Arama sorgusunda dikkate alınan en fazla kelime
+SEARCH_SNIPPET_TOKENS = 16    # Snippet uzunluğu (token)
+
+
+def encode_cursor(last_activity: str, session_id: str) -> str:
+    """Sayfalama cursor'u: son satırın (last_activity, session_id) anahtarı, URL-güvenli base64"""
+    return base64.urlsafe_b64encode(json.dumps([last_activity, session_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """encode_cursor'un tersi; geçersiz cursor için ValueError"""
+    try:
+        last_activity, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Geçersiz cursor: {cursor}") from e
+    return str(last_activity), str(session_id)
+
+
+def fts_query(text: str) -> str:
+    """
+    Serbest metni güvenli FTS5 sorgusuna çevir: her kelime tırnaklı önek terimi olur, terimler VE ile
+    bağlanır (FTS5 operatörleri/sözdizimi kullanıcıdan alınmaz). Boş metin için "".
+    """
+    words = re.findall(r"\w+", (text or "").replace("İ", "i").lower().replace("ı", "i"))
+    return " ".join(f'"{word}"*' for word in words[:SEARCH_MAX_TERMS])
+
+
+def snippet_html(snippet: str) -> str:
+    """Snippet'i HTML-güvenli yap; eşleşme işaretleri (char(2) ... char(3)) <mark> olur"""
+    return html.escape(snippet or "").replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
 class SessionDB:
     """Session metadata veritabanı yöneticisi"""
     
-    def __init__(self):
-        self.db_path = DATABASE_PATH
+    def __init__(self, db_path: Path = None):
+        self.db_path = db_path or DATABASE_PATH
         self.init_db()
+        self._local = threading.local()
+        # PRAGMA data_version için kalıcı bağlantı: başka bir bağlantı commit ettiğinde değer değişir
+        self._watch_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._watch_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """İş parçacığının bağlantısı (ilk kullanımda açılır, sonra tekrar kullanılır)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: Python örtük BEGIN açmaz, işlemleri transaction() yönetir
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS,
+                                   cached_statements=CACHED_STATEMENTS, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT_SECONDS * 1000)}")
+            # WAL'de FULL: her commit WAL dosyasının tek fsync'iyle kalıcı olur
+            conn.execute("PRAGMA synchronous = FULL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Okumalar için iş parçacığının bağlantısı (kapatılmaz; her ifade kendi anlık görüntüsünde çalışır)"""
+        yield self._connect()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Yazma işlemi: BEGIN IMMEDIATE ... COMMIT, hata olursa ROLLBACK. Yazma kilidi baştan alınır
+        (okumadan yazmaya geçerken kilitlenme olmaz). İç içe çağrılar dıştaki işleme katılır.
+        """
+        conn = self._connect()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._local.depth = 0
+
+    def close(self):
+        """Bu iş parçacığının bağlantısını kapat (iş parçacığı bitince bağlantı zaten serbest kalır)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
     
     def init_db(self):
-        """Session tablosunu oluştur"""
+        """Session, mesaj ve ürün tablolarını oluştur"""
         with sqlite3.connect(self.db_path) as conn:
+            # WAL: okuyucular yazarı beklemez, her mesaj ekleme tek kısa işlem (kalıcı DB ayarı)
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS sessions (
                     session_id TEXT PRIMARY KEY,
@@ -28,60 +132,173 @@ class SessionDB:
                     message_count INTEGER DEFAULT 0,
                     product_count INTEGER DEFAULT 0,
                     metadata TEXT DEFAULT '{}',
-                    is_active INTEGER DEFAULT 1
+                    is_active INTEGER DEFAULT 1,
+                    version INTEGER DEFAULT 0,
+                    entity_message_id INTEGER DEFAULT 0
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if 'version' not in columns:
+                # Her yazmada artan satır sürümü - önbellekteki yöneticinin bayat olup olmadığını gösterir
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER DEFAULT 0")
+            if 'entity_message_id' not in columns:
+                # Ürün bahisleri için taranmış son mesaj (içe aktarılan geçmiş sonradan bir kez taranır)
+                conn.execute("ALTER TABLE sessions ADD COLUMN entity_message_id INTEGER DEFAULT 0")
+            # Yalnızca-ekleme konuşma günlüğü: mesaj eklemek tek INSERT (geçmiş yeniden yazılmaz)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    sender TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, message_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_products (
+                    product_row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL DEFAULT '',
+                    data TEXT NOT NULL DEFAULT '{}'
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_products_session ON session_products(session_id, product_row_id)")
+            # Listeleme (last_activity, session_id) anahtarıyla sayfalanır; eski tek sütunlu indeksin yerini alır
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_listing ON sessions(last_activity, session_id)")
+            conn.execute("DROP INDEX IF EXISTS idx_sessions_activity")
+            # Kayan konuşma özeti: covered_message_id'ye kadar olan mesajları özetler
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_summaries (
+                    session_id TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL DEFAULT '',
+                    covered_message_id INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            # Session'da bahsedilen ürün varlıkları (kategori / katalog modeli), son görülmeye göre
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_entities (
+                    session_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    detail TEXT NOT NULL DEFAULT '',
+                    mentions INTEGER NOT NULL DEFAULT 1,
+                    last_message_id INTEGER NOT NULL,
+                    PRIMARY KEY (session_id, kind, value)
+                ) WITHOUT ROWID
+            """)
+            # JSON göçü manifesti: işlenen dosyanın boyutu/mtime'ı (değişmeyen dosya tekrar okunmaz)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS json_migrations (
+                    file_name TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    processed_at TEXT NOT NULL
                 )
             """)
+            self._init_message_search(conn)
             conn.commit()
+
+    @staticmethod
+    def _init_message_search(conn):
+        """
+        Mesaj içeriği üzerinde FTS5 indeksi (içerik messages tablosundan okunur, kopyalanmaz).
+        Tetikleyiciler her ekleme/silmede indeksi günceller; tablo ilk kez oluşturuluyorsa mevcut
+        geçmiş bir kez indekslenir. 'ı' indekste 'i' olarak tutulur (unicode61 onu aksan saymaz;
+        "buzdolabi" araması "buzdolabı"nı bulsun).
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone()
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                content, content='messages', content_rowid='message_id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                INSERT INTO messages_fts(rowid, content) VALUES (new.message_id, replace(new.content, 'ı', 'i'));
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                INSERT INTO messages_fts(messages_fts, rowid, content)
+                VALUES ('delete', old.message_id, replace(old.content, 'ı', 'i'));
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+                INSERT INTO messages_fts(messages_fts, rowid, content)
+                VALUES ('delete', old.message_id, replace(old.content, 'ı', 'i'));
+                INSERT INTO messages_fts(rowid, content) VALUES (new.message_id, replace(new.content, 'ı', 'i'));
+            END
+        """)
+        if not exists:
+            SessionDB._fill_message_search(conn)
+
+    @staticmethod
+    def _fill_message_search(conn):
+        # FTS5'in kendi 'rebuild'/'integrity-check' komutları içeriği 'ı' dönüşümü olmadan okur;
+        # indeks yalnızca bu yolla (ve tetikleyicilerle) doldurulmalı
+        conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('delete-all')")
+        conn.execute("""
+            INSERT INTO messages_fts(rowid, content)
+            SELECT message_id, replace(content, 'ı', 'i') FROM messages
+        """)
+
+    def rebuild_message_search(self):
+        """Arama indeksini messages tablosundan baştan oluştur (bozulma şüphesinde)"""
+        with self.transaction() as conn:
+            self._fill_message_search(conn)
     
     def create_session(self, session_id: str, session_name: str = None) -> str:
         """Yeni session oluştur"""
         if not session_name:
             session_name = f"Chat {datetime.now().strftime('%d.%m.%Y %H:%M')}"
         
-        with sqlite3.connect(self.db_path) as conn:
+        # Var olan kaydı ezme - sayaçlar (message_count) mesaj eklendikçe artıyor
+        with self.transaction() as conn:
             conn.execute("""
-                INSERT OR REPLACE INTO sessions 
+                INSERT OR IGNORE INTO sessions 
                 (session_id, session_name, created_at, last_activity)
                 VALUES (?, ?, ?, ?)
             """, (session_id, session_name, datetime.now().isoformat(), datetime.now().isoformat()))
-            conn.commit()
         
         return session_id
     
     def update_session_activity(self, session_id: str, message_count: int = None, product_count: int = None, last_activity: str = None):
-        """Session aktivitesini güncelle"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Session aktivitesini (ve verilen sayaçları) güncelle"""
+        with self.transaction() as conn:
             activity_time = last_activity or datetime.now().isoformat()
-            
-            if message_count is not None and product_count is not None:
-                conn.execute("""
-                    UPDATE sessions 
-                    SET last_activity = ?, message_count = ?, product_count = ?
-                    WHERE session_id = ?
-                """, (activity_time, message_count, product_count, session_id))
-            else:
-                conn.execute("""
-                    UPDATE sessions 
-                    SET last_activity = ?
-                    WHERE session_id = ?
-                """, (activity_time, session_id))
-            conn.commit()
+            assignments, params = ["last_activity = ?"], [activity_time]
+            if message_count is not None:
+                assignments.append("message_count = ?")
+                params.append(message_count)
+            if product_count is not None:
+                assignments.append("product_count = ?")
+                params.append(product_count)
+            conn.execute(f"""
+                UPDATE sessions 
+                SET {', '.join(assignments)}, version = version + 1
+                WHERE session_id = ?
+            """, (*params, session_id))
     
     def rename_session(self, session_id: str, new_name: str) -> bool:
         """Session adını değiştir"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             cursor = conn.execute("""
                 UPDATE sessions 
-                SET session_name = ?
+                SET session_name = ?, version = version + 1
                 WHERE session_id = ?
             """, (new_name, session_id))
-            conn.commit()
             return cursor.rowcount > 0
     
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Session bilgilerini al"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.execute("""
                 SELECT * FROM sessions WHERE session_id = ?
             """, (session_id,))
@@ -93,33 +310,542 @@ class SessionDB:
     
     def list_all_sessions(self) -> List[Dict]:
         """Tüm session'ları listele"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.execute("""
                 SELECT * FROM sessions 
                 ORDER BY last_activity DESC
             """)
             return [dict(row) for row in cursor.fetchall()]
+
+    def list_sessions_page(self, limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Session'ları en yeni aktiviteden başlayarak sayfa sayfa listele (keyset: OFFSET yok, her sayfa
+        indeksten `limit` satır okur). Dönüş: (session'lar, sonraki sayfanın cursor'u veya None)
+        """
+        with self.connection() as conn:
+            if cursor:
+                last_activity, session_id = decode_cursor(cursor)
+                rows = conn.execute("""
+                    SELECT * FROM sessions
+                    WHERE (last_activity, session_id) < (?, ?)
+                    ORDER BY last_activity DESC, session_id DESC LIMIT ?
+                """, (last_activity, session_id, limit + 1)).fetchall()
+            else:
+                rows = conn.execute("""
+                    SELECT * FROM sessions
+                    ORDER BY last_activity DESC, session_id DESC LIMIT ?
+                """, (limit + 1,)).fetchall()
+        sessions = [dict(row) for row in rows[:limit]]
+        has_more = len(rows) > limit
+        next_cursor = encode_cursor(sessions[-1]['last_activity'], sessions[-1]['session_id']) if has_more else None
+        return sessions, next_cursor
+
+    def session_totals(self, active_since: str) -> Dict:
+        """Yönetim paneli sayaçları: sessions, active (last_activity >= active_since), messages, products"""
+        with self.connection() as conn:
+            total, messages, products = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(message_count), 0), COALESCE(SUM(product_count), 0) FROM sessions
+            """).fetchone()
+            active = conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_activity >= ?", (active_since,)
+            ).fetchone()[0]
+        return {'sessions': total, 'active': active, 'messages': messages, 'products': products}
+
+    def session_version(self, session_id: str) -> Optional[int]:
+        """Session satırının sürümü (yoksa None)"""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            return row[0] if row else None
+
+    def data_version(self) -> int:
+        """
+        Veritabanının değişim sayacı. Değer aynıysa son okumadan beri hiçbir bağlantı commit etmemiştir;
+        WAL'de bu kontrol paylaşımlı bellekten (-shm) yapılır, diske gidilmez.
+        """
+        with self._watch_lock:
+            return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
     
     def delete_session(self, session_id: str) -> bool:
-        """Session'ı sil"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Session'ı (mesaj ve ürünleriyle birlikte) sil"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_products WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_summaries WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_entities WHERE session_id = ?", (session_id,))
             cursor = conn.execute("""
                 DELETE FROM sessions WHERE session_id = ?
             """, (session_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
     def archive_session(self, session_id: str) -> bool:
         """Session'ı arşivle"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             cursor = conn.execute("""
                 UPDATE sessions 
-                SET is_active = 0
+                SET is_active = 0, version = version + 1
                 WHERE session_id = ?
             """, (session_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
+    # ============== Mesajlar ==============
+
+    def append_message(self, session_id: str, message: Dict,
+                       entities: Optional[List[Tuple[str, str, str]]] = None) -> Optional[int]:
+        """
+        Mesajı günlüğe ekle; session sayaçlarını ve mesajdaki ürün varlıklarını (kind, value, detail)
+        aynı işlemde güncelle. Maliyet geçmiş uzunluğundan bağımsız; commit sonrası mesaj kalıcıdır.
+        Dönüş: session'ın yeni sürümü
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO messages (session_id, sender, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            """, (session_id, message['sender'], message['content'], message['timestamp']))
+            message_id = cursor.lastrowid
+            self._upsert_entities(conn, session_id, entities or [], message_id)
+            row = conn.execute("""
+                UPDATE sessions
+                SET last_activity = ?, message_count = message_count + 1, version = version + 1,
+                    entity_message_id = ?
+                WHERE session_id = ?
+                RETURNING version
+            """, (message['timestamp'], message_id, session_id)).fetchone()
+            return row[0] if row else None
+
+    def commit_turn(self, session_id: str, messages: List[Tuple[Dict, List[Tuple[str, str, str]]]],
+                    products: Optional[List[Dict]] = None) -> Optional[int]:
+        """
+        Bir sohbet turunun tüm yazmalarını (mesajlar + varlıkları, ürün listesi, sayaçlar) tek işlemde kaydet.
+        Tek commit = WAL dosyasının tek fsync'i (synchronous=FULL). Dönüş: yeni sürüm
+        """
+        with self.transaction() as conn:
+            last_message_id, last_activity = None, datetime.now().isoformat()
+            for message, entities in messages:
+                cursor = conn.execute("""
+                    INSERT INTO messages (session_id, sender, content, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, (session_id, message['sender'], message['content'], message['timestamp']))
+                last_message_id, last_activity = cursor.lastrowid, message['timestamp']
+                self._upsert_entities(conn, session_id, entities or [], last_message_id)
+
+            assignments = ["last_activity = ?", "message_count = message_count + ?", "version = version + 1"]
+            params = [last_activity, len(messages)]
+            if last_message_id is not None:
+                assignments.append("entity_message_id = ?")
+                params.append(last_message_id)
+            if products is not None:
+                conn.execute("DELETE FROM session_products WHERE session_id = ?", (session_id,))
+                conn.executemany("""
+                    INSERT INTO session_products (session_id, name, data) VALUES (?, ?, ?)
+                """, [(session_id, p.get('name', '') if isinstance(p, dict) else str(p),
+                       json.dumps(p, ensure_ascii=False)) for p in products])
+                assignments.append("product_count = ?")
+                params.append(len(products))
+            row = conn.execute(f"""
+                UPDATE sessions SET {', '.join(assignments)}
+                WHERE session_id = ? RETURNING version
+            """, (*params, session_id)).fetchone()
+            return row[0] if row else None
+
+    def append_messages(self, session_id: str, messages: List[Dict]):
+        """Toplu ekleme (eski JSON geçmişini içe aktarmak için)"""
+        with self.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO messages (session_id, sender, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            """, [(session_id, m.get('sender', ''), m.get('content', ''),
+                   m.get('timestamp') or datetime.now().isoformat()) for m in messages])
+
+    def get_messages(self, session_id: str) -> List[Dict]:
+        """Session'ın tüm mesajları (ekleme sırasıyla)"""
+        with self.connection() as conn:
+            cursor = conn.execute("""
+                SELECT timestamp, sender, content FROM messages
+                WHERE session_id = ? ORDER BY message_id
+            """, (session_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_last_message(self, session_id: str) -> Optional[Dict]:
+        with self.connection() as conn:
+            row = conn.execute("""
+                SELECT timestamp, sender, content FROM messages
+                WHERE session_id = ? ORDER BY message_id DESC LIMIT 1
+            """, (session_id,)).fetchone()
+            return dict(row) if row else None
+
+    def count_messages(self, session_id: str) -> int:
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+    def clear_messages(self, session_id: str) -> Optional[int]:
+        """Session'ın mesajlarını sil. Dönüş: session'ın yeni sürümü"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_summaries WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_entities WHERE session_id = ?", (session_id,))
+            row = conn.execute("""
+                UPDATE sessions SET message_count = 0, version = version + 1
+                WHERE session_id = ? RETURNING version
+            """, (session_id,)).fetchone()
+            return row[0] if row else None
+
+    def get_messages_after(self, session_id: str, after_message_id: int = 0,
+                           limit: Optional[int] = None, before_message_id: Optional[int] = None) -> List[Dict]:
+        """
+        message_id'si (after, before) aralığındaki mesajlar, eskiden yeniye (message_id dahil).
+        limit verilirse aralığın en yeni `limit` mesajı döner.
+        """
+        with self.connection() as conn:
+            rows = conn.execute("""
+                SELECT message_id, timestamp, sender, content FROM messages
+                WHERE session_id = ? AND message_id > ? AND message_id < ?
+                ORDER BY message_id DESC LIMIT ?
+            """, (session_id, after_message_id,
+                  before_message_id if before_message_id is not None else 2 ** 63 - 1,
+                  limit if limit is not None else -1)).fetchall()
+            return [dict(row) for row in reversed(rows)]
+
+    # ============== Ürün varlıkları ==============
+
+    @staticmethod
+    def _upsert_entities(conn, session_id: str, entities: List[Tuple[str, str, str]], message_id: int):
+        conn.executemany("""
+            INSERT INTO session_entities (session_id, kind, value, detail, last_message_id)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(session_id, kind, value) DO UPDATE SET
+                mentions = mentions + 1,
+                detail = excluded.detail,
+                last_message_id = excluded.last_message_id
+        """, [(session_id, kind, value, detail, message_id) for kind, value, detail in entities])
+
+    def get_entities(self, session_id: str) -> List[Dict]:
+        """Session'ın ürün varlıkları, en son bahsedilen en sonda"""
+        with self.connection() as conn:
+            rows = conn.execute("""
+                SELECT kind, value, detail, mentions, last_message_id FROM session_entities
+                WHERE session_id = ? ORDER BY last_message_id, kind DESC
+            """, (session_id,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def index_entities(self, session_id: str, indexed: List[Tuple[int, List[Tuple[str, str, str]]]],
+                       upto_message_id: int) -> Optional[int]:
+        """
+        Daha önce taranmamış mesajların varlıklarını [(message_id, entities)] toplu yaz ve
+        entity_message_id'yi ilerlet (içe aktarılan geçmiş için). Dönüş: yeni sürüm
+        """
+        with self.transaction() as conn:
+            for message_id, entities in indexed:
+                self._upsert_entities(conn, session_id, entities, message_id)
+            row = conn.execute("""
+                UPDATE sessions SET entity_message_id = ?, version = version + 1
+                WHERE session_id = ? AND entity_message_id < ? RETURNING version
+            """, (upto_message_id, session_id, upto_message_id)).fetchone()
+            return row[0] if row else None
+
+    # ============== Özet ==============
+
+    def get_summary(self, session_id: str) -> Dict:
+        """Session'ın kayan özeti: summary, covered_message_id (yoksa boş özet, 0)"""
+        with self.connection() as conn:
+            row = conn.execute("""
+                SELECT summary, covered_message_id FROM session_summaries WHERE session_id = ?
+            """, (session_id,)).fetchone()
+            return {'summary': row[0], 'covered_message_id': row[1]} if row else \
+                {'summary': '', 'covered_message_id': 0}
+
+    def save_summary(self, session_id: str, summary: str, covered_message_id: int) -> bool:
+        """
+        Özeti yalnızca daha ileri bir mesaja kadar kapsıyorsa ve o mesaj hâlâ duruyorsa yaz
+        (geç biten eski bir güncelleme yenisini ezmesin; temizlenen session'a özet geri gelmesin)
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO session_summaries (session_id, summary, covered_message_id, updated_at)
+                SELECT ?, ?, ?, ?
+                WHERE EXISTS (SELECT 1 FROM messages WHERE message_id = ? AND session_id = ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    covered_message_id = excluded.covered_message_id,
+                    updated_at = excluded.updated_at
+                WHERE excluded.covered_message_id > session_summaries.covered_message_id
+            """, (session_id, summary, covered_message_id, datetime.now().isoformat(),
+                  covered_message_id, session_id))
+            return cursor.rowcount > 0
+
+    # ============== Arama ==============
+
+    def search_messages(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict], bool]:
+        """
+        Mesaj geçmişinde tam metin arama; sonuçlar session başına gruplanır ve session'ın en iyi
+        eşleşmesinin bm25 skoruna göre sıralanır. Snippet yalnızca dönen sayfa için üretilir.
+        Yalnızca aktif depo; arşivlenmiş session'larla birlikte arama için session_retention.search_history.
+        Dönüş: ([session_id, session_name, last_activity, hits, message_id, sender, timestamp, snippet,
+                 score, archived], has_more)
+        """
+        match = fts_query(query)
+        if not match:
+            return [], False
+        with self.connection() as conn:
+            rows = conn.execute("""
+                SELECT m.session_id, MIN(f.rank) AS score, f.rowid AS message_id, COUNT(*) AS hits
+                FROM messages_fts f JOIN messages m ON m.message_id = f.rowid
+                WHERE messages_fts MATCH ?
+                GROUP BY m.session_id
+                ORDER BY score, m.session_id
+                LIMIT ? OFFSET ?
+            """, (match, limit + 1, offset)).fetchall()
+            page = rows[:limit]
+            if not page:
+                return [], False
+            best_ids = [row['message_id'] for row in page]
+            placeholders = ",".join("?" * len(best_ids))
+            details = {row['message_id']: row for row in conn.execute(f"""
+                SELECT f.rowid AS message_id, m.sender, m.timestamp,
+                       snippet(messages_fts, 0, char(2), char(3), '…', {SEARCH_SNIPPET_TOKENS}) AS snippet,
+                       s.session_name, s.last_activity
+                FROM messages_fts f
+                JOIN messages m ON m.message_id = f.rowid
+                LEFT JOIN sessions s ON s.session_id = m.session_id
+                WHERE messages_fts MATCH ? AND f.rowid IN ({placeholders})
+            """, (match, *best_ids))}
+        results = []
+        for row in page:
+            detail = details[row['message_id']]
+            results.append({
+                'session_id': row['session_id'],
+                'session_name': detail['session_name'],
+                'last_activity': detail['last_activity'],
+                'hits': row['hits'],
+                'message_id': row['message_id'],
+                'sender': detail['sender'],
+                'timestamp': detail['timestamp'],
+                'snippet': snippet_html(detail['snippet']),
+                'score': row['score'],
+                'archived': False,
+            })
+        return results, len(rows) > limit
+
+    # ============== Ürünler ==============
+
+    def get_products(self, session_id: str) -> List[Dict]:
+        """Session'da bahsedilen ürünler (ekleme sırasıyla)"""
+        with self.connection() as conn:
+            rows = conn.execute("""
+                SELECT data FROM session_products
+                WHERE session_id = ? ORDER BY product_row_id
+            """, (session_id,)).fetchall()
+            return [json.loads(row[0]) for row in rows]
+
+    def replace_products(self, session_id: str, products: List[Dict]) -> Optional[int]:
+        """Session'ın ürün listesini ve product_count'u tek işlemde değiştir. Dönüş: yeni sürüm"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM session_products WHERE session_id = ?", (session_id,))
+            conn.executemany("""
+                INSERT INTO session_products (session_id, name, data) VALUES (?, ?, ?)
+            """, [(session_id, p.get('name', '') if isinstance(p, dict) else str(p),
+                   json.dumps(p, ensure_ascii=False)) for p in products])
+            row = conn.execute("""
+                UPDATE sessions SET product_count = ?, last_activity = ?, version = version + 1
+                WHERE session_id = ? RETURNING version
+            """, (len(products), datetime.now().isoformat(), session_id)).fetchone()
+            return row[0] if row else None
+
+    # ============== Saklama / arşiv ==============
+
+    def idle_session_ids(self, before: str, limit: int = 500) -> List[str]:
+        """last_activity'si `before`dan eski session'lar (idx_sessions_listing üzerinden)"""
+        with self.connection() as conn:
+            rows = conn.execute("""
+                SELECT session_id FROM sessions WHERE last_activity < ?
+                ORDER BY last_activity LIMIT ?
+            """, (before, limit)).fetchall()
+            return [row[0] for row in rows]
+
+    def export_session(self, session_id: str) -> Optional[Dict]:
+        """Session'ın tüm verisi (satır, mesajlar, ürünler, özet, varlıklar) - arşivleme için"""
+        with self.connection() as conn:
+            row = conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if not row:
+                return None
+            rows = lambda sql: [dict(r) for r in conn.execute(sql, (session_id,)).fetchall()]
+            return {
+                'session': dict(row),
+                'messages': rows("""SELECT sender, content, timestamp FROM messages
+                                    WHERE session_id = ? ORDER BY message_id"""),
+                'products': [json.loads(r['data']) for r in rows("""SELECT data FROM session_products
+                                    WHERE session_id = ? ORDER BY product_row_id""")],
+                # Mesaj kimlikleri geri yüklemede değişir - özet kapsamı ve varlıklar mesaj sırasıyla saklanır
+                'summary': rows("""SELECT summary, (SELECT COUNT(*) FROM messages m WHERE m.session_id = s.session_id
+                                                    AND m.message_id <= s.covered_message_id) AS covered
+                                   FROM session_summaries s WHERE session_id = ?"""),
+                'entities': rows("""SELECT kind, value, detail, mentions,
+                                           (SELECT COUNT(*) FROM messages m WHERE m.session_id = e.session_id
+                                            AND m.message_id <= e.last_message_id) AS position
+                                    FROM session_entities e WHERE session_id = ? ORDER BY last_message_id"""),
+            }
+
+    def import_session(self, data: Dict):
+        """export_session çıktısını tek işlemde geri yükle (arşivden dönen session)"""
+        session = data['session']
+        session_id = session['session_id']
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO sessions
+                (session_id, session_name, created_at, last_activity, message_count, product_count, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (session_id, session['session_name'], session['created_at'], session['last_activity'],
+                  len(data['messages']), len(data['products']), session.get('metadata') or '{}'))
+            message_ids = [conn.execute("""
+                INSERT INTO messages (session_id, sender, content, timestamp) VALUES (?, ?, ?, ?)
+            """, (session_id, m['sender'], m['content'], m['timestamp'])).lastrowid for m in data['messages']]
+            id_at = lambda position: message_ids[position - 1] if 0 < position <= len(message_ids) else 0
+            conn.executemany("""
+                INSERT INTO session_products (session_id, name, data) VALUES (?, ?, ?)
+            """, [(session_id, p.get('name', '') if isinstance(p, dict) else str(p),
+                   json.dumps(p, ensure_ascii=False)) for p in data['products']])
+            conn.executemany("""
+                INSERT OR REPLACE INTO session_entities (session_id, kind, value, detail, mentions, last_message_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(session_id, e['kind'], e['value'], e['detail'], e['mentions'], id_at(e['position']))
+                  for e in data['entities']])
+            for summary in data['summary']:
+                conn.execute("""
+                    INSERT OR REPLACE INTO session_summaries (session_id, summary, covered_message_id, updated_at)
+                    VALUES (?, ?, ?, ?)
+                """, (session_id, summary['summary'], id_at(summary['covered']), datetime.now().isoformat()))
+            conn.execute("UPDATE sessions SET entity_message_id = ? WHERE session_id = ?",
+                         (message_ids[-1] if message_ids else 0, session_id))
+
+    def compact(self, vacuum_free_ratio: float = 0.25) -> Dict:
+        """
+        WAL'i ana dosyaya aktarıp sıfırla; boş sayfalar dosyanın `vacuum_free_ratio`sından fazlaysa VACUUM.
+        Dönüş: page_count, freelist_count, vacuumed
+        """
+        with self.connection() as conn:
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            vacuumed = bool(page_count) and free_count / page_count > vacuum_free_ratio
+            if vacuumed:
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {'page_count': page_count, 'freelist_count': free_count, 'vacuumed': vacuumed}
+
+    # ============== JSON göçü ==============
+
+    def migrate_json_sessions(self, sessions_dir: Path) -> int:
+        """
+        Eski sessions/<id>.json dosyalarını (meta, geçmiş, ürünler) DB'ye aktarır ve dosyayı
+        <id>.json.migrated olarak yeniden adlandırır. json_migrations manifestinde aynı boyut ve
+        mtime ile kayıtlı dosyalar (ör. bozuk olduğu için aktarılamayanlar) yeniden okunmaz.
+        Yeni/değişen dosyaların hepsi tek işlemde yazılır; her dosya kendi SAVEPOINT'inde.
+        Dönüş: aktarılan session sayısı
+        """
+        sessions_dir = Path(sessions_dir)
+        if not sessions_dir.exists():
+            return 0
+        candidates = []
+        for json_path in sorted(sessions_dir.glob("*.json")):
+            stat = json_path.stat()
+            candidates.append((json_path, stat.st_mtime_ns, stat.st_size))
+        if not candidates:
+            return 0
+
+        with self.connection() as conn:
+            manifest = {row[0]: (row[1], row[2]) for row in conn.execute(
+                "SELECT file_name, mtime_ns, size FROM json_migrations"
+            )}
+        pending = [c for c in candidates if manifest.get(c[0].name) != (c[1], c[2])]
+        if not pending:
+            return 0
+
+        # Dosyalar işlem dışında okunur; yazma kilidi yalnızca DB yazmaları boyunca tutulur
+        parsed = []
+        for json_path, mtime_ns, size in pending:
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    parsed.append((json_path, mtime_ns, size, json.load(f), None))
+            except Exception as e:
+                parsed.append((json_path, mtime_ns, size, None, e))
+
+        migrated_paths, entries = [], []
+        with self.transaction() as conn:
+            for json_path, mtime_ns, size, data, error in parsed:
+                if error is None:
+                    conn.execute("SAVEPOINT migrate_file")
+                    try:
+                        self._import_json_session(conn, data, json_path.stem)
+                        conn.execute("RELEASE migrate_file")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO migrate_file")
+                        conn.execute("RELEASE migrate_file")
+                        error = e
+                if error is None:
+                    migrated_paths.append(json_path)
+                else:
+                    print(f"[migrate] {json_path.name} aktarılamadı: {error}")
+                entries.append((json_path.name, mtime_ns, size, 'failed' if error else 'migrated',
+                                datetime.now().isoformat()))
+            conn.executemany("""
+                INSERT INTO json_migrations (file_name, mtime_ns, size, status, processed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(file_name) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns, size = excluded.size,
+                    status = excluded.status, processed_at = excluded.processed_at
+            """, entries)
+
+        for json_path in migrated_paths:
+            try:
+                json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+            except OSError as e:
+                # Manifest kaydı dosyanın tekrar aktarılmasını zaten engeller
+                print(f"[migrate] {json_path.name} yeniden adlandırılamadı: {e}")
+        return len(migrated_paths)
+
+    @staticmethod
+    def _import_json_session(conn, data: Dict, default_id: str):
+        """Tek bir eski JSON session'ını açık işlemdeki bağlantıya yaz"""
+        sid = data.get("session_id") or default_id
+        created_at = data.get("created_at") or datetime.now().isoformat()
+        last_activity = data.get("last_activity") or created_at
+        history = data.get("history", []) or []
+        products = data.get("products", []) or []
+        session_name = (data.get("metadata") or {}).get("session_name") \
+            or f"Chat {created_at[:16].replace('T', ' ')}"
+
+        conn.execute("""
+            INSERT OR IGNORE INTO sessions (session_id, session_name, created_at, last_activity)
+            VALUES (?, ?, ?, ?)
+        """, (sid, session_name, created_at, last_activity))
+        # Geçmiş DB'ye daha önce (mesaj günlüğüyle) yazıldıysa tekrar ekleme
+        has_messages = conn.execute(
+            "SELECT 1 FROM messages WHERE session_id = ? LIMIT 1", (sid,)
+        ).fetchone()
+        if history and not has_messages:
+            conn.executemany("""
+                INSERT INTO messages (session_id, sender, content, timestamp) VALUES (?, ?, ?, ?)
+            """, [(sid, m.get('sender', ''), m.get('content', ''),
+                   m.get('timestamp') or created_at) for m in history])
+        has_products = conn.execute(
+            "SELECT 1 FROM session_products WHERE session_id = ? LIMIT 1", (sid,)
+        ).fetchone()
+        if products and not has_products:
+            conn.executemany("""
+                INSERT INTO session_products (session_id, name, data) VALUES (?, ?, ?)
+            """, [(sid, p.get('name', '') if isinstance(p, dict) else str(p),
+                   json.dumps(p, ensure_ascii=False)) for p in products])
+        conn.execute("""
+            UPDATE sessions
+            SET created_at = MIN(created_at, ?),
+                last_activity = MAX(last_activity, ?),
+                message_count = (SELECT COUNT(*) FROM messages WHERE session_id = ?),
+                product_count = (SELECT COUNT(*) FROM session_products WHERE session_id = ?),
+                version = version + 1
+            WHERE session_id = ?
+        """, (created_at, last_activity, sid, sid, sid))
+
 # Global instance
 session_db = SessionDB()
@@ -0,0 +1,364 @@
+"""
+Session Retention - Boşta kalan session'ları arşive taşır, süresi dolanları siler, depoları sıkıştırır
+
+Aktif depo (vestel_sessions.db) yalnızca son SESSION_ARCHIVE_AFTER_DAYS gün içinde kullanılan
+session'ları tutar; böylece listeleme ve yükleme aylarca biriken trafikle yavaşlamaz. Daha eski
+session'lar tüm verisiyle (mesajlar, ürünler, özet, varlıklar) zlib ile sıkıştırılmış tek satır olarak
+ayrı arşiv veritabanına taşınır ve SESSION_DELETE_AFTER_DAYS sonunda silinir. Arşivdeki bir session
+tekrar açılırsa aktif depoya geri yüklenir. Arşivlenen mesajlar arşivde ayrıca tam metin indekslenir;
+search_history aktif depo ile arşivi birlikte arar (yönetici araması tüm geçmişi görür).
+
+Kullanım:
+    python -m agent_system.session_retention run
+    python -m agent_system.session_retention restore <session_id>
+    python -m agent_system.session_retention stats
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agent_system.config import SESSION_ARCHIVE_PATH
+from agent_system.session_db import SEARCH_SNIPPET_TOKENS, fts_query, session_db, snippet_html
+
+ARCHIVE_BATCH_SIZE = 200
+COMPRESSION_LEVEL = 6
+
+
+class SessionArchive:
+    """
+    Arşivlenmiş session'lar: session başına sıkıştırılmış tek JSON satırı.
+    Aramada kullanılmak üzere mesajlar archived_messages'ta da durur (aktif depodaki messages_fts ile
+    aynı kural: FTS5 içeriği tablodan okur, 'ı' indekse 'i' olarak yazılır).
+    """
+
+    def __init__(self, db_path: Path = SESSION_ARCHIVE_PATH):
+        self.db_path = db_path
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archived_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    session_name TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_activity TEXT NOT NULL,
+                    archived_at TEXT NOT NULL,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    payload BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_archived_activity ON archived_sessions(last_activity)")
+            self._init_message_search(conn)
+            conn.commit()
+
+    def _init_message_search(self, conn: sqlite3.Connection):
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archived_messages_fts'"
+        ).fetchone()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS archived_messages (
+                message_id INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                sender TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_archived_messages_session ON archived_messages(session_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS archived_messages_fts USING fts5(
+                content, content='archived_messages', content_rowid='message_id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS archived_messages_fts_insert AFTER INSERT ON archived_messages BEGIN
+                INSERT INTO archived_messages_fts(rowid, content)
+                VALUES (new.message_id, replace(new.content, 'ı', 'i'));
+            END;
+            CREATE TRIGGER IF NOT EXISTS archived_messages_fts_delete AFTER DELETE ON archived_messages BEGIN
+                INSERT INTO archived_messages_fts(archived_messages_fts, rowid, content)
+                VALUES ('delete', old.message_id, replace(old.content, 'ı', 'i'));
+            END;
+        """)
+        if exists:
+            return
+        # Arama indeksinden önce arşivlenmiş session'lar bir kez indekslenir
+        for session_id, payload in conn.execute("SELECT session_id, payload FROM archived_sessions").fetchall():
+            self._insert_messages(conn, session_id, json.loads(zlib.decompress(payload))['messages'])
+
+    @staticmethod
+    def _insert_messages(conn: sqlite3.Connection, session_id: str, messages: List[Dict]):
+        conn.execute("DELETE FROM archived_messages WHERE session_id = ?", (session_id,))
+        conn.executemany("""
+            INSERT INTO archived_messages (session_id, sender, content, timestamp) VALUES (?, ?, ?, ?)
+        """, [(session_id, m['sender'], m['content'], m['timestamp']) for m in messages])
+
+    def store(self, data: Dict):
+        session = data['session']
+        payload = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), COMPRESSION_LEVEL)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO archived_sessions
+                (session_id, session_name, created_at, last_activity, archived_at, message_count, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (session['session_id'], session['session_name'], session['created_at'],
+                  session['last_activity'], datetime.now().isoformat(), len(data['messages']), payload))
+            self._insert_messages(conn, session['session_id'], data['messages'])
+            conn.commit()
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT payload FROM archived_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def contains(self, session_id: str) -> bool:
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(
+                "SELECT 1 FROM archived_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone() is not None
+
+    def delete(self, session_id: str):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM archived_messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM archived_sessions WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+    def purge(self, before: str) -> int:
+        """last_activity'si `before`dan eski arşiv kayıtlarını sil"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                DELETE FROM archived_messages WHERE session_id IN
+                    (SELECT session_id FROM archived_sessions WHERE last_activity < ?)
+            """, (before,))
+            cursor = conn.execute("DELETE FROM archived_sessions WHERE last_activity < ?", (before,))
+            conn.commit()
+            return cursor.rowcount
+
+    def compact(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def search(self, match: str, limit: int) -> List[Dict]:
+        """
+        Arşivlenmiş mesajlarda FTS5 araması (match: session_db.fts_query çıktısı); session başına en iyi
+        eşleşme, bm25 sıralı, en fazla `limit` session. Sonuçlar search_messages ile aynı biçimdedir.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT m.session_id, MIN(f.rank) AS score, COUNT(*) AS hits
+                FROM archived_messages_fts f JOIN archived_messages m ON m.message_id = f.rowid
+                WHERE archived_messages_fts MATCH ?
+                GROUP BY m.session_id
+                ORDER BY score, m.session_id
+                LIMIT ?
+            """, (match, limit)).fetchall()
+            results = []
+            for row in rows:
+                # Session'ın en iyi eşleşen mesajı ve snippet'i
+                best = conn.execute(f"""
+                    SELECT m.sender, m.timestamp, s.session_name, s.last_activity,
+                           snippet(archived_messages_fts, 0, char(2), char(3), '…', {SEARCH_SNIPPET_TOKENS}) AS snippet
+                    FROM archived_messages_fts f
+                    JOIN archived_messages m ON m.message_id = f.rowid
+                    JOIN archived_sessions s ON s.session_id = m.session_id
+                    WHERE archived_messages_fts MATCH ? AND m.session_id = ?
+                    ORDER BY f.rank LIMIT 1
+                """, (match, row['session_id'])).fetchone()
+                results.append({
+                    'session_id': row['session_id'],
+                    'session_name': best['session_name'],
+                    'last_activity': best['last_activity'],
+                    'hits': row['hits'],
+                    'message_id': None,  # Geri yüklemede mesaj kimlikleri yeniden verilir
+                    'sender': best['sender'],
+                    'timestamp': best['timestamp'],
+                    'snippet': snippet_html(best['snippet']),
+                    'score': row['score'],
+                    'archived': True,
+                })
+        return results
+
+    def stats(self) -> Dict:
+        with sqlite3.connect(self.db_path) as conn:
+            count, messages, size = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(message_count), 0), COALESCE(SUM(LENGTH(payload)), 0)
+                FROM archived_sessions
+            """).fetchone()
+        return {'sessions': count, 'messages': messages, 'payload_bytes': size}
+
+
+def _cutoff(days: float, now: Optional[datetime] = None) -> str:
+    return ((now or datetime.now()) - timedelta(days=days)).isoformat()
+
+
+def archive_session(session_id: str, before: Optional[str] = None) -> bool:
+    """
+    Session'ı arşive taşı. Önce arşive yazılır, sonra aktif depodan silinir (arada çökerse tekrar
+    çalıştırmak güvenli). Tur sürüyorsa veya session bu arada kullanıldıysa atlanır.
+    """
+    from agent_system.state_manager import forget_conversation_manager, session_turn_lock
+
+    turn_lock = session_turn_lock(session_id)
+    if not turn_lock.acquire(blocking=False):
+        return False
+    try:
+        data = session_db.export_session(session_id)
+        if not data or (before and data['session']['last_activity'] >= before):
+            return False
+        session_archive.store(data)
+        session_db.delete_session(session_id)
+    finally:
+        turn_lock.release()
+    forget_conversation_manager(session_id)
+    return True
+
+
+def archive_idle_sessions(now: Optional[datetime] = None) -> int:
+    """SESSION_ARCHIVE_AFTER_DAYS'ten uzun süredir boşta olan session'ları arşive taşı"""
+    from agent_system.config import SESSION_ARCHIVE_AFTER_DAYS
+
+    before = _cutoff(SESSION_ARCHIVE_AFTER_DAYS, now)
+    archived = 0
+    while True:
+        batch = session_db.idle_session_ids(before, ARCHIVE_BATCH_SIZE)
+        moved = sum(1 for session_id in batch if archive_session(session_id, before))
+        archived += moved
+        if len(batch) < ARCHIVE_BATCH_SIZE or not moved:
+            return archived
+
+
+def restore_session(session_id: str) -> bool:
+    """
+    Arşivdeki session'ı aktif depoya geri yükle (aktif depoda zaten varsa dokunma).
+    Aynı session için eşzamanlı iki istek mesajları iki kez aktarmasın diye tur kilidi altında
+    yeniden kontrol edilir; arşivleme de aynı kilidi aldığından taşıma ile geri yükleme çakışmaz.
+    Kilit yalnızca session arşivdeyse alınır: tur içinden gelen (kilidi tutan) çağrı kendini beklemez.
+    """
+    from agent_system.state_manager import session_turn_lock
+
+    if session_db.get_session_info(session_id) or not session_archive.contains(session_id):
+        return False
+    with session_turn_lock(session_id):
+        if session_db.get_session_info(session_id):
+            return False
+        data = session_archive.load(session_id)
+        if not data:
+            return False
+        session_db.import_session(data)
+        # Açılan session yeniden aktif sayılır (sonraki saklama turunda hemen tekrar arşivlenmesin)
+        session_db.update_session_activity(session_id)
+        session_archive.delete(session_id)
+    print(f"🗃️ Session arşivden geri yüklendi: {session_id}")
+    return True
+
+
+def search_history(query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict], bool]:
+    """
+    Aktif depo + arşivde tam metin arama (session_db.search_messages ile aynı sonuç biçimi, 'archived'
+    bayrağıyla). İki deponun sonuçları bm25 skoruna göre birleştirilir; sayfa için her depodan
+    offset + limit + 1 session okunur. Dönüş: (sonuçlar, has_more)
+    """
+    match = fts_query(query)
+    if not match:
+        return [], False
+    window = offset + limit + 1
+    active, _ = session_db.search_messages(query, limit=window)
+    archived = session_archive.search(match, window)
+    merged, seen = [], set()
+    for row in sorted(active + archived, key=lambda r: (r['score'], r['session_id'])):
+        if row['session_id'] not in seen:  # Taşınma/geri yükleme anında iki depoda da olabilir
+            seen.add(row['session_id'])
+            merged.append(row)
+    return merged[offset:offset + limit], len(merged) > offset + limit
+
+
+def remove_migrated_files() -> int:
+    """DB'ye aktarılmış eski sessions/*.json.migrated dosyalarını sil (içerikleri zaten sqlite'ta)"""
+    from agent_system.state_manager import SESSIONS_DIR
+
+    if not SESSIONS_DIR.exists():
+        return 0
+    removed = 0
+    for path in SESSIONS_DIR.glob("*.json.migrated"):
+        path.unlink()
+        removed += 1
+    return removed
+
+
+def run_retention(now: Optional[datetime] = None) -> Dict:
+    """Arşivle, süresi dolanları sil, depoları sıkıştır. Dönüş: istatistikler"""
+    from agent_system.config import SESSION_DELETE_AFTER_DAYS
+
+    stats = {
+        'archived': archive_idle_sessions(now),
+        'purged': session_archive.purge(_cutoff(SESSION_DELETE_AFTER_DAYS, now)),
+        'legacy_files_removed': remove_migrated_files(),
+    }
+    stats['active_store'] = session_db.compact()
+    if stats['purged']:
+        session_archive.compact()
+    print(f"🗃️ Saklama: {stats['archived']} session arşivlendi, {stats['purged']} arşiv kaydı silindi, "
+          f"{stats['legacy_files_removed']} eski JSON dosyası kaldırıldı")
+    return stats
+
+
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def start_retention_scheduler() -> bool:
+    """Saklama işini SESSION_RETENTION_INTERVAL_HOURS aralıkla arka planda çalıştır (süreç başına bir kez)"""
+    global _scheduler_started
+    from agent_system.config import SESSION_RETENTION_INTERVAL_HOURS
+
+    with _scheduler_lock:
+        if _scheduler_started or SESSION_RETENTION_INTERVAL_HOURS <= 0:
+            return False
+        _scheduler_started = True
+
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            try:
+                run_retention()
+            except Exception as e:
+                print(f"⚠️ Session saklama işi başarısız: {e}")
+            stop.wait(SESSION_RETENTION_INTERVAL_HOURS * 3600)
+
+    threading.Thread(target=loop, name="session-retention", daemon=True).start()
+    return True
+
+
+# Global instance
+session_archive = SessionArchive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session saklama / arşiv")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("run", help="Arşivle, süresi dolanları sil, sıkıştır")
+    restore = sub.add_parser("restore", help="Arşivdeki bir session'ı geri yükle")
+    restore.add_argument("session_id")
+    sub.add_parser("stats", help="Arşiv istatistikleri")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        print(run_retention())
+    elif args.command == "restore":
+        print("✅ Geri yüklendi" if restore_session(args.session_id) else "❌ Arşivde bulunamadı")
+    else:
+        print(session_archive.stats())
+
+
+if __name__ == "__main__":
+    main()
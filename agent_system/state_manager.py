@@ -1,79 +1,161 @@
 """
 State Management - Konuşma geçmişi ve session yönetimi
 """
-import json
+import functools
+import threading
 import uuid
+import weakref
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from agent_system.config import PROJECT_ROOT
 from agent_system.session_db import session_db
+from agent_system.conversation_summary import build_bounded_context, conversation_summarizer
+from agent_system.product_mentions import catalog_matcher
 from agent_system.constants import GREETING_MESSAGE
 
-# Session dosyaları için klasör
+CONTEXT_MESSAGE_CHARS = 400  # Bağlamdaki her mesajın en fazla bu kadarı verilir
+
+# Eski sürümlerin session JSON dosyaları (yalnızca tek seferlik göç için okunur)
 SESSIONS_DIR = Path(PROJECT_ROOT) / "sessions"
-SESSIONS_DIR.mkdir(exist_ok=True)
+
+# Session başına kilitler - önbellekten bağımsız tutulur; yönetici çıkarılıp yeniden oluşturulsa da
+# aynı session'a yazan herkes aynı kilidi görür. Zayıf referanslı: kilidi tutan/bekleyen (with bloğu,
+# SessionTurn) varken kayıt yaşar, kimse kullanmayınca kendiliğinden silinir (kayıt sınırsız büyümez)
+_session_locks: "weakref.WeakValueDictionary[str, threading.RLock]" = weakref.WeakValueDictionary()
+_turn_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_session_locks_guard = threading.Lock()
+
+def _registry_lock(registry: Dict, session_id: str, factory):
+    with _session_locks_guard:
+        lock = registry.get(session_id)
+        if lock is None:
+            lock = registry[session_id] = factory()
+        return lock
+
+def session_lock(session_id: str) -> threading.RLock:
+    """Session'ın yazmalarını sıralayan (reentrant) kilit"""
+    return _registry_lock(_session_locks, session_id, threading.RLock)
+
+def session_turn_lock(session_id: str) -> threading.Lock:
+    """
+    Session'da aynı anda tek tur (kullanıcı mesajı → ajan → cevap).
+    Yazma kilidinden ayrıdır: ajan başka bir thread'de çalışıp yöneticiye yazabilir.
+    """
+    return _registry_lock(_turn_locks, session_id, threading.Lock)
+
+def _serialized(method):
+    """Yönetici metodunu session kilidi altında çalıştır (eşzamanlı yazmalar birbirini ezmesin)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with session_lock(self.session_id):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class ConversationManager:
     """Konuşma durumunu yönetir"""
     
     def __init__(self, session_id: str = None):
         self.session_id = session_id or str(uuid.uuid4())
-        self.sessions_dir = SESSIONS_DIR
-        self.session_file = SESSIONS_DIR / f"{self.session_id}.json"
-        self.conversation_history = []
+        self._history = None   # Mesaj günlüğünden ilk erişimde yüklenir
+        self._entities = None  # Ürün bahisleri (session_entities) - ilk erişimde yüklenir
+        self._active_turn = None      # Sürmekte olan SessionTurn (yazmalar tur sonuna ertelenir)
+        self._products_dirty = False
         self.current_products = []
-        self.load_session()
+        self.created_at = None
+        self.version = None        # Yüklenen session satırının sürümü
+        self._data_version = None  # Yükleme/son kontrol anındaki DB değişim sayacı
         
-        # DB'ye session kaydı oluştur
+        # DB'ye session kaydı oluştur (mesaj günlüğü buna bağlı)
         session_db.create_session(self.session_id)
+        self.load_session()
+    
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """Konuşma geçmişi - mesaj günlüğünden tembel (lazy) yüklenir"""
+        if self._history is None:
+            # Kilit altında: yükleme sırasında eklenen mesaj önbellekte kaybolmasın
+            with session_lock(self.session_id):
+                if self._history is None:
+                    self._history = session_db.get_messages(self.session_id)
+        return self._history
+    
+    @property
+    def mentioned_entities(self) -> List[Dict]:
+        """Session'da bahsedilen kategori/model varlıkları (en son bahsedilen en sonda)"""
+        if self._entities is None:
+            with session_lock(self.session_id):
+                if self._entities is None:
+                    self._index_unscanned_messages()
+                    self._entities = session_db.get_entities(self.session_id)
+        return self._entities
+    
+    def _index_unscanned_messages(self):
+        """Varlık taraması yapılmadan eklenmiş mesajları (ör. JSON'dan aktarılan geçmiş) bir kez tara"""
+        info = session_db.get_session_info(self.session_id)
+        if not info or not info['message_count']:
+            return
+        pending = session_db.get_messages_after(self.session_id, info['entity_message_id'] or 0)
+        if not pending:
+            return
+        indexed = [(m['message_id'], catalog_matcher.extract(m['content']))
+                   for m in pending if m['sender'] == 'user']
+        self._written(session_db.index_entities(self.session_id, indexed, pending[-1]['message_id']))
+    
+    def _note_entities(self, entities: List):
+        """Yeni mesajın varlıklarını bellekteki listeye işle (DB'ye mesajla aynı işlemde yazıldı)"""
+        if self._entities is None or not entities:
+            return
+        for kind, value, detail in entities:
+            existing = next((e for e in self._entities if e['kind'] == kind and e['value'] == value), None)
+            if existing:
+                self._entities.remove(existing)
+            mentions = existing['mentions'] + 1 if existing else 1
+            self._entities.append({'kind': kind, 'value': value, 'detail': detail, 'mentions': mentions})
     
+    @_serialized
     def load_session(self):
-        """Oturum verilerini yükle"""
-        if self.session_file.exists():
-            try:
-                with open(self.session_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.conversation_history = data.get('history', [])
-                    self.current_products = data.get('products', [])
-            except:
-                # Dosya bozuksa yeni başla
-                self.conversation_history = []
-                self.current_products = []
+        """Oturum verilerini DB'den yükle (geçmiş ilk erişimde günlükten okunur)"""
+        # Sayaç okumalardan önce alınır: arada gelen bir commit sonraki kontrolde yakalanır
+        self._data_version = session_db.data_version()
+        self._history = None
+        self._entities = None
+        self.current_products = session_db.get_products(self.session_id)
+        info = session_db.get_session_info(self.session_id)
+        self.created_at = info['created_at'] if info else None
+        self.version = info['version'] if info else None
     
+    def is_stale(self) -> bool:
+        """
+        Session DB'de bu yönetici dışında değiştirildi mi?
+        DB'ye son kontrolden beri hiç commit yapılmadıysa kontrol bellekte biter; yapıldıysa
+        yalnızca bu session'ın satır sürümü (birincil anahtar sorgusu) karşılaştırılır.
+        """
+        data_version = session_db.data_version()
+        if data_version == self._data_version:
+            return False
+        current = session_db.session_version(self.session_id)
+        self._data_version = data_version
+        return current != self.version
+    
+    def _written(self, version):
+        """Bu yöneticinin kendi yazması sonrası sürümü güncelle (kendi yazmasını bayatlık saymasın)"""
+        if version is not None:
+            self.version = version
+    
+    @_serialized
     def save_session(self):
-        """Oturum verilerini kaydet"""
-        # Eğer session dosyası mevcutsa created_at'i koru
-        created_at = datetime.now().isoformat()
-        if self.session_file.exists():
-            try:
-                with open(self.session_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    created_at = existing_data.get('created_at', created_at)
-            except:
-                pass  # Hata durumunda yeni tarih kullan
-        
-        data = {
-            'session_id': self.session_id,
-            'created_at': created_at,
-            'last_activity': datetime.now().isoformat(),
-            'history': self.conversation_history,
-            'products': self.current_products,
-            'metadata': {
-                'message_count': len(self.conversation_history),
-                'product_count': len(self.current_products)
-            }
-        }
-        with open(self.session_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        # DB'yi güncelle
-        session_db.update_session_activity(
-            self.session_id,
-            len(self.conversation_history),
-            len(self.current_products)
-        )
+        """Ürün listesini ve sayaçları tek işlemde kaydet (mesajlar ayrı günlükte)"""
+        if not self.created_at:
+            self.created_at = datetime.now().isoformat()
+        if self._active_turn is not None:
+            # Tur sürüyor - ürünler tur sonunda mesajlarla birlikte yazılır
+            self._products_dirty = True
+            return
+        self._written(session_db.replace_products(self.session_id, self.current_products))
     
     def create_session(self, session_id: str = None):
         """Yeni session oluştur"""
@@ -82,30 +164,52 @@ class ConversationManager:
         else:
             self.session_id = str(uuid.uuid4())
         
-        self.session_file = SESSIONS_DIR / f"{self.session_id}.json"
-        self.conversation_history = []
+        self._history = []
         self.current_products = []
-        self.save_session()
+        self.created_at = None
 
         # DB'ye kaydet
         session_db.create_session(self.session_id)
+        self.save_session()
 
         # İlk karşılama mesajını ekle
         self.add_message(self.session_id, 'assistant', GREETING_MESSAGE)
 
         return self.session_id
     
+    @_serialized
     def add_message(self, session_id: str, sender: str, content: str):
-        """Belirli session'a mesaj ekle"""
+        """Belirli session'a mesaj ekle - günlüğe tek satır (O(1)), geçmiş yeniden yazılmaz"""
         if session_id != self.session_id:
             # Farklı session ise yükle
             self.session_id = session_id
-            self.session_file = SESSIONS_DIR / f"{self.session_id}.json"
+            session_db.create_session(self.session_id)
             self.load_session()
         
         # Akıllı duplike mesaj kontrolü - sadece 5 saniye içinde aynı mesaj gönderilirse engelleyelim
-        if self.conversation_history:
-            last_message = self.conversation_history[-1]
+        if self._is_duplicate(sender, content):
+            return
+        
+        message = {
+            'timestamp': datetime.now().isoformat(),
+            'sender': sender,
+            'content': content
+        }
+        # Ürün bahisleri yalnızca bu mesajdan çıkarılır (kullanıcı mesajları - asistan listeleri sayılmaz)
+        entities = catalog_matcher.extract(content) if sender == 'user' else []
+        self._written(session_db.append_message(self.session_id, message, entities))
+        if self._history is not None:
+            self._history.append(message)
+        self._note_entities(entities)
+        conversation_summarizer.note_message(self.session_id)
+    
+    def _is_duplicate(self, sender: str, content: str) -> bool:
+        """Son mesajla aynı gönderen/içerik 5 saniye içinde tekrar geldiyse True"""
+        if self._history is not None:
+            last_message = self._history[-1] if self._history else None
+        else:
+            last_message = session_db.get_last_message(self.session_id)
+        if last_message:
             if (last_message['sender'] == sender and 
                 last_message['content'] == content):
                 # Son mesajın zamanını kontrol et
@@ -117,40 +221,65 @@ class ConversationManager:
                     # Sadece 5 saniye içinde aynı mesaj gönderilirse engelle
                     if time_diff < 5:
                         print(f"⚠️ Duplike mesaj tespit edildi (5sn içinde), eklenmedi: {sender}: {content[:50]}...")
-                        return
+                        return True
                 except Exception as e:
                     # Timestamp parse hatası durumunda devam et
                     print(f"⚠️ Timestamp parse hatası: {e}")
-                    pass
+        return False
+    
+    def turn(self, user_message: str) -> "SessionTurn":
+        """
+        Bir sohbet turu: kullanıcı mesajı, asistan cevabı ve tur içindeki ürün değişiklikleri bellekte
+        biriktirilir, tur sonunda tek işlemde yazılır. Aynı session'da aynı anda tek tur çalışır.
         
-        message = {
-            'timestamp': datetime.now().isoformat(),
-            'sender': sender,
-            'content': content
-        }
-        self.conversation_history.append(message)
-        self.save_session()
+            with manager.turn(user_message) as turn:
+                turn.reply(agent_cevabi)
+        """
+        return SessionTurn(self, user_message)
+    
+    @_serialized
+    def _commit_turn(self, messages: List[Dict]):
+        """Turda biriken mesajları ve (değiştiyse) ürün listesini tek işlemde kaydet"""
+        pending, entities_by_message = [], []
+        for message in messages:
+            if message['sender'] == 'user' and self._is_duplicate(message['sender'], message['content']):
+                continue
+            entities = catalog_matcher.extract(message['content']) if message['sender'] == 'user' else []
+            pending.append((message, entities))
+        products = self.current_products if self._products_dirty else None
+        self._products_dirty = False
+        if not pending and products is None:
+            return
+        
+        self._written(session_db.commit_turn(self.session_id, pending, products))
+        for message, entities in pending:
+            if self._history is not None:
+                self._history.append(message)
+            self._note_entities(entities)
+        if pending:
+            conversation_summarizer.note_message(self.session_id, len(pending))
+    
+    @_serialized
+    def clear_history(self):
+        """Session'ın mesajlarını sil"""
+        self._written(session_db.clear_messages(self.session_id))
+        self._history = []
+        self._entities = []
+        conversation_summarizer.forget(self.session_id)
     
     def get_conversation_history(self, session_id: str = None):
         """Belirli session'ın konuşma geçmişini al"""
         if session_id and session_id != self.session_id:
-            # Geçici olarak o session'ı yükle
-            temp_file = SESSIONS_DIR / f"{session_id}.json"
-            if temp_file.exists():
-                try:
-                    with open(temp_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        return data.get('history', [])
-                except:
-                    return []
-            return []
+            return session_db.get_messages(session_id)
         return self.conversation_history
     
+    @_serialized
     def add_products(self, products: list):
         """Bulunan ürünleri kaydet"""
         self.current_products.extend(products)
         self.save_session()
     
+    @_serialized
     def clear_products(self):
         """Ürün listesini temizle"""
         self.current_products = []
@@ -170,16 +299,22 @@ class ConversationManager:
         return context
     
     def get_detailed_context(self) -> str:
-        """Detaylı konuşma bağlamını al - product memory dahil"""
+        """
+        Detaylı konuşma bağlamını al - product memory dahil.
+        Boyutu session uzunluğundan bağımsızdır: kayan özet + özetin kapsamadığı son mesajlar.
+        """
         context = ""
+        bounded = build_bounded_context(self.session_id)
+        
+        if bounded['summary']:
+            context += "🧾 Konuşma Özeti:\n" + bounded['summary'] + "\n\n"
         
-        # Son 5 mesajı al
-        if self.conversation_history:
-            recent = self.conversation_history[-5:]
-            context += "📋 Konuşma Geçmişi:\n"
-            for msg in recent:
+        if bounded['messages']:
+            context += "📋 Son Mesajlar:\n"
+            for msg in bounded['messages']:
                 role = "👤" if msg['sender'] == 'user' else "🤖"
-                content = msg['content'][:150] + "..." if len(msg['content']) > 150 else msg['content']
+                content = msg['content'][:CONTEXT_MESSAGE_CHARS] + "..." \
+                    if len(msg['content']) > CONTEXT_MESSAGE_CHARS else msg['content']
                 context += f"{role} {content}\n"
             context += "\n"
         
@@ -190,10 +325,13 @@ class ConversationManager:
                 context += f"• {product.get('name', 'Bilinmeyen ürün')}\n"
             context += "\n"
         
-        # Product intent memory - Ürün seçimi detect et
+        # Product intent memory - mesaj eklenirken güncellenen varlık indeksinden
         mentioned_products = self.extract_mentioned_products()
-        if mentioned_products:
+        mentioned_models = self.get_mentioned_models()
+        if mentioned_products or mentioned_models:
             context += "🎯 Kullanıcının İlgilendiği Ürünler:\n"
+            for model in mentioned_models[-2:]:  # Son 2 model
+                context += f"• {model['value']} ({model['detail']})\n"
             for product in mentioned_products[-2:]:  # Son 2 ilgi
                 context += f"• {product}\n"
             context += "\n"
@@ -201,20 +339,14 @@ class ConversationManager:
         return context if context else "Yeni konuşma başlıyor."
     
     def extract_mentioned_products(self) -> List[str]:
-        """Konuşmalardan bahsedilen ürünleri çıkar"""
-        mentioned = []
-        keywords = ['buzdolabı', 'fırın', 'çamaşır makinesi', 'televizyon', 'tv', 'mikrodalga', 'dishwasher', 'bulaşık makinesi']
-        
-        for msg in self.conversation_history:
-            if msg['sender'] == 'user':
-                content = msg['content'].lower()
-                for keyword in keywords:
-                    if keyword in content:
-                        mentioned.append(keyword.title())
-                        break
-        
-        return list(set(mentioned))  # Unique products
+        """Konuşmada bahsedilen ürün kategorileri (en son bahsedilen en sonda) - varlık indeksinden"""
+        return [e['value'] for e in self.mentioned_entities if e['kind'] == 'category']
+    
+    def get_mentioned_models(self) -> List[Dict]:
+        """Konuşmada bahsedilen katalog modelleri (en son bahsedilen en sonda)"""
+        return [e for e in self.mentioned_entities if e['kind'] == 'model']
     
+    @_serialized
     def add_product_context(self, product_name: str, product_details: dict = None):
         """Ürün context'ini ekle - session memory için"""
         product_info = {
@@ -237,7 +369,10 @@ class ConversationManager:
         if self.current_products:
             return self.current_products[-1].get('name', '')
         
-        # History'den de bak
+        # Konuşmada bahsedilen son model, yoksa son kategori
+        models = self.get_mentioned_models()
+        if models:
+            return models[-1]['value']
         mentioned = self.extract_mentioned_products()
         return mentioned[-1] if mentioned else ''
     
@@ -250,19 +385,9 @@ class ConversationManager:
         # DB'den meta bilgileri al
         db_info = session_db.get_session_info(session_id)
         
-        # JSON dosyasından konuşma geçmişini al
         history = self.get_conversation_history(session_id)
-        
-        # Products'ları al
-        temp_file = SESSIONS_DIR / f"{session_id}.json"
-        products = []
-        if temp_file.exists():
-            try:
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    products = data.get('products', [])
-            except:
-                pass
+        products = (self.current_products if session_id == self.session_id
+                    else session_db.get_products(session_id))
         
         if db_info:
             return {
@@ -287,83 +412,117 @@ class ConversationManager:
         """Tüm oturumları listele"""
         return session_db.list_all_sessions()
 
-# Global session cache
-_session_cache = {}
+    @staticmethod
+    def list_sessions_page(limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Oturumları sayfa sayfa listele (en yeni aktivite önce). Dönüş: (oturumlar, sonraki cursor)"""
+        return session_db.list_sessions_page(limit, cursor)
 
-def get_conversation_manager(session_id: str = None):
-    """Global conversation manager'ı al veya oluştur - session cache ile"""
-    global _session_cache
+class SessionTurn:
+    """
+    Tur kapsamlı iş birimi: mesajlar bellekte biriktirilir, çıkışta (hata olsa bile - kullanıcı mesajı
+    kaybolmasın) ConversationManager._commit_turn ile tek işlemde yazılır.
+    """
+    
+    def __init__(self, manager: ConversationManager, user_message: str):
+        self.manager = manager
+        self.session_id = manager.session_id
+        self.messages = [self._message('user', user_message)]
+        self._lock = session_turn_lock(self.session_id)
+    
+    @staticmethod
+    def _message(sender: str, content: str) -> Dict:
+        return {'timestamp': datetime.now().isoformat(), 'sender': sender, 'content': content}
+    
+    @property
+    def user_message(self) -> str:
+        return self.messages[0]['content']
+    
+    def reply(self, content: str):
+        """Asistan cevabını tura ekle"""
+        self.messages.append(self._message('assistant', content))
+    
+    def __enter__(self) -> "SessionTurn":
+        self._lock.acquire()
+        self.manager._active_turn = self
+        return self
     
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.manager._active_turn = None
+            self.manager._commit_turn(self.messages)
+        finally:
+            self._lock.release()
+        return False
+
+# Global session cache - LRU (en uzun süredir kullanılmayan session çıkarılır)
+_session_cache: "OrderedDict[str, ConversationManager]" = OrderedDict()
+_session_cache_lock = threading.Lock()
+_session_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'reloads': 0}
+
+def _session_cache_size() -> int:
+    from agent_system.config import SESSION_CACHE_SIZE
+    return max(1, SESSION_CACHE_SIZE)
+
+def get_conversation_manager(session_id: str = None):
+    """
+    Global conversation manager'ı al veya oluştur - LRU session cache ile.
+    Önbellekteki yönetici yalnızca session DB'de başka yerden değiştiyse yeniden yüklenir.
+    """
     # Default session
     if session_id is None:
         session_id = "default"
     
-    # Cache'den kontrol et
-    if session_id in _session_cache:
-        manager = _session_cache[session_id]
-        # Session file'ı tekrar yükle (persistence için)
-        manager.load_session()
+    with _session_cache_lock:
+        manager = _session_cache.get(session_id)
+        if manager is not None:
+            _session_cache.move_to_end(session_id)
+            _session_cache_stats['hits'] += 1
+    
+    if manager is not None:
+        with session_lock(session_id):
+            if manager.is_stale():
+                manager.load_session()
+                _session_cache_stats['reloads'] += 1
         return manager
     
+    # Arşive taşınmış bir session tekrar açıldıysa önce aktif depoya geri yükle
+    from agent_system.session_retention import restore_session
+    restore_session(session_id)
+    
     # Yeni manager oluştur ve cache'e ekle
     manager = ConversationManager(session_id)
-    _session_cache[session_id] = manager
-    
-    # Cache boyutunu sınırla (son 10 session)
-    if len(_session_cache) > 10:
-        # En eski session'ı sil
-        oldest_session = next(iter(_session_cache))
-        del _session_cache[oldest_session]
+    with _session_cache_lock:
+        _session_cache_stats['misses'] += 1
+        # Eşzamanlı istekte önce eklenen yönetici kazanır (tek session için tek nesne)
+        manager = _session_cache.setdefault(session_id, manager)
+        _session_cache.move_to_end(session_id)
+        while len(_session_cache) > _session_cache_size():
+            _session_cache.popitem(last=False)
+            _session_cache_stats['evictions'] += 1
     
     return manager
 
+def get_session_cache_stats() -> Dict:
+    """Session cache metrikleri (hit/miss/eviction/reload, doluluk)"""
+    with _session_cache_lock:
+        stats = dict(_session_cache_stats)
+        stats['size'] = len(_session_cache)
+    stats['capacity'] = _session_cache_size()
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    return stats
+
+def forget_conversation_manager(session_id: str):
+    """Silinen session'ın yöneticisini (ve özet sayacını) önbellekten çıkar"""
+    conversation_summarizer.forget(session_id)
+    with _session_cache_lock:
+        _session_cache.pop(session_id, None)
+    # Kilitler burada çıkarılmaz: süren bir tur kilidi tutuyorsa sonraki tur aynı kilidi beklemeli
+
 def hydrate_sessions_from_disk() -> int:
     """
-    sessions/ klasöründeki JSON dosyalarını tarar,
-    DB'de kaydı olmayanları ekler ve metadata/sayaçları senkronize eder.
-    Dönüş: eklenen/güncellenen kayıt sayısı
+    Eski sürümlerden kalan sessions/*.json dosyalarını DB'ye bir kez aktarır
+    (aktarılan dosyalar .json.migrated olur; sonraki çağrılarda taranacak dosya kalmaz).
+    Dönüş: aktarılan session sayısı
     """
-    added_or_updated = 0
-    if not SESSIONS_DIR.exists():
-        return 0
-        
-    for json_path in SESSIONS_DIR.glob("*.json"):
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            sid = data.get("session_id") or json_path.stem
-            created_at = data.get("created_at") or datetime.now().isoformat()
-            last_activity = data.get("last_activity") or created_at
-            history = data.get("history", [])
-            products = data.get("products", [])
-            metadata = data.get("metadata", {})
-            session_name = metadata.get("session_name")
-
-            # DB'de var mı?
-            row = session_db.get_session_info(sid)
-            if not row:
-                # Yoksa oluştur
-                session_db.create_session(sid, session_name)
-                added_or_updated += 1
-
-            # Aktivite ve sayaçları senkronize et
-            session_db.update_session_activity(
-                sid,
-                message_count=len(history),
-                product_count=len(products),
-                last_activity=last_activity
-            )
-
-            # İsim senkronizasyonu (eğer JSON'da varsa ve DB'dekinden farklıysa)
-            if session_name and (not row or row.get('session_name') != session_name):
-                session_db.rename_session(sid, session_name)
-                if not row: # Zaten eklendi sayıldı
-                    pass
-                else:
-                    added_or_updated +=1
-
-        except Exception as e:
-            print(f"[hydrate] {json_path.name} senkronize edilemedi: {e}")
-            
-    return added_or_updated
+    return session_db.migrate_json_sessions(SESSIONS_DIR)
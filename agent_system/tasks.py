@@ -125,3 +125,28 @@ def create_product_search_task(user_query: str, product_agent) -> Task:
         expected_output=expected_output,
         agent=product_agent
     )
+
+def create_specialist_task(intent: str, user_query: str, agent, product_name: str = None,
+                           session_id: str = None, language: str = "tr") -> Task:
+    """
+    Yerel niyet yönlendiricinin doğrudan uzmana verdiği görev (LLM router adımı atlanır).
+    Router'ın delegasyonda ekleyeceği bağlam burada eklenir: konuşma bağlamı ve cevap dili.
+    """
+    if intent == "pdf_manual":
+        task = create_pdf_task(user_query, product_name, agent)
+    elif intent == "quickstart":
+        task = create_quickstart_task(product_name, agent)
+        task.description += f"\n\nKullanıcının sorusu: '{user_query}' - önce bu soruyu yanıtla."
+    elif intent == "technical_support":
+        task = create_technical_support_task(user_query, product_name or "belirtilmemiş ürün", agent)
+    elif product_name and product_name not in user_query:
+        task = create_product_search_task(f"{user_query} ({product_name})", agent)
+    else:
+        task = create_product_search_task(user_query, agent)
+
+    detailed_context = get_conversation_manager(session_id).get_detailed_context()
+    if language == "en":
+        task.description += f"\n\n{detailed_context}\n\nIMPORTANT: The user wrote in English - respond in English."
+    else:
+        task.description += f"\n\n{detailed_context}\n\nÖNEMLİ: Kullanıcı Türkçe yazdı - Türkçe yanıt ver."
+    return task
@@ -0,0 +1,40 @@
+"""
+Text Utils - Ürün adı / sorgu metni normalizasyonu
+
+Kılavuz indeksi, katalog eşleyici, niyet yönlendirici ve güvenlik filtresi aynı token kurallarını
+kullanır. Bu modül bağımlılıksızdır: session katmanı araçları (crewai, kılavuz DB'leri) yüklemeden
+içe aktarabilir.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+MAX_QUERY_SPAN = 3  # Sorguda birleştirilecek ardışık token sayısı ("so 6004 b" -> "so6004b")
+
+
+def normalize_token_text(s: str) -> str:
+    """Aksanları at, küçük harfe çevir (Türkçe ı -> i)"""
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return s.lower().replace("ı", "i")
+
+
+def tokenize(s: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", normalize_token_text(s))
+
+
+def query_tokens(product_name: str) -> List[str]:
+    """Sorgu token'ları + ardışık token birleşimleri"""
+    parts = tokenize(product_name)
+    tokens = set(parts)
+    for start in range(len(parts)):
+        for end in range(start + 2, min(start + MAX_QUERY_SPAN, len(parts)) + 1):
+            tokens.add("".join(parts[start:end]))
+    return sorted(tokens)
+
+
+def product_category(manual_keywords: str) -> str:
+    """manual_keywords içindeki "Ürün Tipi: ..." değeri (category_tool ile aynı kural)"""
+    match = re.search(r'Ürün [Tt]ipi:\s*([^,\n]+)', manual_keywords or "")
+    return " ".join(match.group(1).split()) if match else ""
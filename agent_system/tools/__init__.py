@@ -8,7 +8,11 @@ from .price_stock_tool import VestelPriceStockTool
 
 try:
     from .pdf_tool import PDFAnalysisTool
-    __all__ = ['ImprovedProductSearchTool', 'VestelCategorySearchTool', 'PDFAnalysisTool', 'VestelPriceStockTool']
+    from .error_code_tool import ErrorCodeLookupTool
+    from .troubleshooting_tool import TroubleshootingSearchTool
+    from .spec_tool import ProductSpecTool
+    __all__ = ['ImprovedProductSearchTool', 'VestelCategorySearchTool', 'PDFAnalysisTool', 'ErrorCodeLookupTool',
+               'TroubleshootingSearchTool', 'ProductSpecTool', 'VestelPriceStockTool']
 except ImportError as e:
     print(f"❌ PDFAnalysisTool import failed: {e}")
     __all__ = ['ImprovedProductSearchTool', 'VestelCategorySearchTool', 'VestelPriceStockTool']
@@ -0,0 +1,306 @@
+"""
+Kılavuz Boilerplate Tespiti - Tekrarlayan başlık/altbilgi ve ortak metin blokları
+
+- Üst/alt bilgi: aynı kılavuzun sayfalarının başında/sonunda tekrar eden satırlar
+  (sayfa numaraları normalize edilir) metin temizlenmeden önce silinir.
+- Ortak bloklar: güvenlik uyarıları, atık/geri dönüşüm notları, garanti metinleri gibi
+  onlarca kılavuzda neredeyse aynen geçen cümleler. Korpus üzerinde kelime
+  shingle'ları + MinHash/LSH ile kümelenir; en az MIN_MANUALS kılavuzda görülen
+  kümeler tek bir ortak kopya olarak saklanır ve LLM'e giden metinde referansla değiştirilir.
+  Saklanan sayfa metni ham kalır: hata tablosu, sorun giderme, özellik indeksleri ortak metni de görür
+  ve ortak blok kümesi değiştiğinde sayfaların yeniden çıkarılması gerekmez.
+
+Korpus indeksini oluşturmak için:
+    python -m agent_system.tools.boilerplate build [--manuals-dir DIR] [--min-manuals 3]
+"""
+
+import hashlib
+import random
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# MinHash/LSH ayarları: 16 band x 4 satır -> ~0.5 benzerlikten itibaren aday, 0.8 ile doğrulama
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MIN_SENTENCE_WORDS = 6
+SIMILARITY_THRESHOLD = 0.8
+MIN_MANUALS = 3
+
+# Üst/alt bilgi tespiti
+HEADER_SCAN_LINES = 3
+HEADER_MAX_CHARS = 80  # Üst/alt bilgi satırları kısadır; uzun gövde satırlarına dokunma
+HEADER_MIN_PAGES = 3
+HEADER_MIN_RATIO = 0.3
+
+_MERSENNE_61 = (1 << 61) - 1
+_rng = random.Random(1337)
+_PERMS = [(_rng.randrange(1, _MERSENNE_61), _rng.randrange(0, _MERSENNE_61)) for _ in range(NUM_PERM)]
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-ZÇĞİÖŞÜ0-9•\-\"'(])|\n{2,}")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+# ============== Üst/alt bilgi ==============
+
+def _line_key(line: str) -> str:
+    s = unicodedata.normalize("NFKC", line).strip().lower()
+    s = _DIGITS_RE.sub("#", s)
+    return _SPACE_RE.sub(" ", s)
+
+
+def _edge_indices(lines: List[str]) -> Set[int]:
+    """Üst/alt bilgi adayı satırların indeksleri: boş olmayan ilk/son satırlar (kısa sayfada sadece ilk ve son)"""
+    non_empty = [i for i, ln in enumerate(lines) if ln.strip()]
+    scan = HEADER_SCAN_LINES if len(non_empty) > HEADER_SCAN_LINES * 2 else 1
+    edge = set(non_empty[:scan] + non_empty[-scan:])
+    return {i for i in edge if len(lines[i].strip()) <= HEADER_MAX_CHARS}
+
+
+def detect_header_footer_lines(raw_pages: Iterable[str]) -> Set[str]:
+    """Sayfaların başında/sonunda tekrar eden satırların normalize anahtarları"""
+    pages = list(raw_pages)
+    if len(pages) < HEADER_MIN_PAGES:
+        return set()
+    counts = Counter()
+    for raw in pages:
+        lines = (raw or "").splitlines()
+        counts.update({_line_key(lines[i]) for i in _edge_indices(lines)})
+    min_pages = max(HEADER_MIN_PAGES, int(len(pages) * HEADER_MIN_RATIO))
+    return {key for key, n in counts.items() if n >= min_pages and key.strip("# ")}
+
+
+def strip_header_footer(raw: str, header_keys: Set[str]) -> str:
+    """Ham sayfa metninin ilk/son satırlarından tekrar eden üst/alt bilgiyi çıkarır"""
+    if not raw or not header_keys:
+        return raw
+    lines = raw.splitlines()
+    edge = _edge_indices(lines)
+    return "\n".join(ln for i, ln in enumerate(lines) if i not in edge or _line_key(ln) not in header_keys)
+
+
+# ============== MinHash ==============
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text or "") if s and s.strip()]
+
+
+def _words(sentence: str) -> List[str]:
+    return _WORD_RE.findall(unicodedata.normalize("NFKC", sentence).lower())
+
+
+def exact_key(sentence: str) -> str:
+    return hashlib.sha1(" ".join(_words(sentence)).encode("utf-8")).hexdigest()
+
+
+def minhash(sentence: str) -> Optional[Tuple[int, ...]]:
+    """Kelime 3-shingle'ları üzerinden MinHash imzası; çok kısa cümlelerde None"""
+    words = _words(sentence)
+    if len(words) < MIN_SENTENCE_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    bases = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min(((a * h + b) % _MERSENNE_61) & 0xFFFFFFFF for h in bases) for a, b in _PERMS)
+
+
+def band_keys(signature: Tuple[int, ...]) -> List[str]:
+    return [
+        f"{band}:" + ",".join(str(v) for v in signature[band * ROWS:(band + 1) * ROWS])
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+
+# ============== Çalışma zamanı indeksi ==============
+
+class BoilerplateIndex:
+    """Ortak blokları bellekte tutar; cümle -> block_id eşlemesi yapar"""
+
+    def __init__(self, blocks: Iterable[Tuple[int, str, int]] = ()):
+        self.blocks: Dict[int, Tuple[str, int]] = {}
+        self._exact: Dict[str, int] = {}
+        self._bands: Dict[str, List[int]] = defaultdict(list)
+        self._signatures: Dict[int, Tuple[int, ...]] = {}
+        for block_id, text, manual_count in blocks:
+            self.add(block_id, text, manual_count)
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def add(self, block_id: int, text: str, manual_count: int):
+        sig = minhash(text)
+        if sig is None:
+            return
+        self.blocks[block_id] = (text, manual_count)
+        self._exact[exact_key(text)] = block_id
+        self._signatures[block_id] = sig
+        for key in band_keys(sig):
+            self._bands[key].append(block_id)
+
+    def lookup(self, sentence: str) -> Optional[int]:
+        if not self.blocks:
+            return None
+        block_id = self._exact.get(exact_key(sentence))
+        if block_id is not None:
+            return block_id
+        sig = minhash(sentence)
+        if sig is None:
+            return None
+        seen = set()
+        for key in band_keys(sig):
+            for candidate in self._bands.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if similarity(sig, self._signatures[candidate]) >= SIMILARITY_THRESHOLD:
+                    return candidate
+        return None
+
+    def _reference(self, block_ids: List[int]) -> str:
+        preview, _ = self.blocks[block_ids[0]]
+        preview = preview[:70].rstrip() + ("…" if len(preview) > 70 else "")
+        manuals = max(self.blocks[b][1] for b in block_ids)
+        ids = ",".join(f"#{b}" for b in block_ids[:6]) + ("…" if len(block_ids) > 6 else "")
+        return f"[♻️ Ortak metin {ids} ({manuals} kılavuzda tekrar ediyor): \"{preview}\"]"
+
+    def dedupe(self, text: str) -> str:
+        """Sayfa metnindeki ortak cümle dizilerini tek bir referansla değiştirir (yalnızca çıktı için)"""
+        if not self.blocks or not text:
+            return text
+        sentences = split_sentences(text)
+        matches = [self.lookup(s) for s in sentences]
+
+        out: List[str] = []
+        i = 0
+        while i < len(sentences):
+            if matches[i] is None:
+                out.append(sentences[i])
+                i += 1
+                continue
+            run: List[int] = []
+            j = i
+            # Ortak bloklar arasındaki kısa cümleler (başlık, madde işareti) de diziye dahil
+            while j < len(sentences):
+                if matches[j] is not None:
+                    run.append(matches[j])
+                    j += 1
+                elif (j + 1 < len(sentences) and matches[j + 1] is not None
+                      and len(_words(sentences[j])) < MIN_SENTENCE_WORDS):
+                    j += 1
+                else:
+                    break
+            out.append(self._reference(list(dict.fromkeys(run))))
+            i = j
+        return " ".join(out)
+
+
+# ============== Korpus indeksi oluşturma ==============
+
+class _CorpusClusterer:
+    """Korpustaki cümleleri MinHash/LSH ile kümeler, her kümenin kaç kılavuzda geçtiğini sayar"""
+
+    def __init__(self):
+        self.representatives: List[str] = []
+        self.signatures: List[Tuple[int, ...]] = []
+        self.manuals: List[Set[str]] = []
+        self._exact: Dict[str, int] = {}
+        self._bands: Dict[str, List[int]] = defaultdict(list)
+
+    def _cluster_for(self, sentence: str, sig: Tuple[int, ...]) -> int:
+        key = exact_key(sentence)
+        cluster = self._exact.get(key)
+        if cluster is not None:
+            return cluster
+        keys = band_keys(sig)
+        for bkey in keys:
+            for candidate in self._bands.get(bkey, ()):
+                if similarity(sig, self.signatures[candidate]) >= SIMILARITY_THRESHOLD:
+                    self._exact[key] = candidate
+                    return candidate
+        cluster = len(self.representatives)
+        self.representatives.append(sentence)
+        self.signatures.append(sig)
+        self.manuals.append(set())
+        self._exact[key] = cluster
+        for bkey in keys:
+            self._bands[bkey].append(cluster)
+        return cluster
+
+    def add(self, manual_id: str, text: str):
+        for sentence in split_sentences(text):
+            sig = minhash(sentence)
+            if sig is not None:
+                self.manuals[self._cluster_for(sentence, sig)].add(manual_id)
+
+    def shared_blocks(self, min_manuals: int) -> List[Tuple[str, int]]:
+        return [
+            (self.representatives[i], len(m))
+            for i, m in enumerate(self.manuals) if len(m) >= min_manuals
+        ]
+
+
+def build_corpus_index(manuals_dir, min_manuals: int = MIN_MANUALS, limit: int = 0) -> int:
+    """
+    Korpustaki tüm kılavuzların metin katmanını okuyup ortak blokları çıkarır ve
+    manual_store'a yazar. Sayfa önbelleği ham metin tuttuğundan geçerli kalır.
+    Dönüş: saklanan ortak blok sayısı
+    """
+    from pathlib import Path
+    from agent_system.manual_store import manual_store
+    from agent_system.tools.lang_id import is_supported_text
+    from agent_system.tools.pdf_backends import get_backend
+    from agent_system.tools.pdf_tool import clean_text, configured_manual_languages
+
+    backend = get_backend()
+    languages = configured_manual_languages()
+    clusterer = _CorpusClusterer()
+
+    pdf_paths = sorted(Path(manuals_dir).glob("*.pdf"))
+    if limit:
+        pdf_paths = pdf_paths[:limit]
+    seen_ids = set()
+    for n, pdf_path in enumerate(pdf_paths, 1):
+        # Aynı belgenin kopyaları (farklı adla) "ortak metin" sayılmamalı
+        manual_id = manual_store.manual_id_for(pdf_path)
+        if manual_id in seen_ids:
+            continue
+        seen_ids.add(manual_id)
+        try:
+            with backend.open(pdf_path) as doc:
+                raw_pages = [doc.page_text(i) for i in range(doc.page_count)]
+        except Exception as e:
+            print(f"⚠️ {pdf_path.name} okunamadı: {e}")
+            continue
+        header_keys = detect_header_footer_lines(raw_pages)
+        for raw in raw_pages:
+            text = clean_text(strip_header_footer(raw, header_keys))
+            if is_supported_text(text, languages):
+                clusterer.add(manual_id, text)
+        if n % 10 == 0:
+            print(f"📚 [{n}/{len(pdf_paths)}] {len(clusterer.representatives)} cümle kümesi")
+
+    blocks = clusterer.shared_blocks(min_manuals)
+    manual_store.replace_boilerplate_blocks(blocks)
+    print(f"♻️ {len(blocks)} ortak blok kaydedildi ({len(pdf_paths)} kılavuz, eşik: {min_manuals} kılavuz)")
+    return len(blocks)
+
+
+if __name__ == "__main__":
+    import argparse
+    from agent_system.config import MANUALS_DIR
+
+    parser = argparse.ArgumentParser(description="Kılavuz korpusu için ortak metin (boilerplate) indeksi")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--manuals-dir", default=str(MANUALS_DIR))
+    parser.add_argument("--min-manuals", type=int, default=MIN_MANUALS)
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+    build_corpus_index(args.manuals_dir, args.min_manuals, args.limit)
@@ -0,0 +1,188 @@
+"""
+Hata Kodu Aracı - Kılavuzlardaki hata/arıza kodu tablolarını indeksler ve kod bazında sorgular
+
+Kılavuz çıkarımı tamamlandığında sayfalardan hata kodu satırları çıkarılıp manual_store'daki
+error_codes tablosuna yazılır. "E21 hatası veriyor" gibi sorular böylece tüm kılavuzu LLM'e
+göndermeden tek indeksli sorguyla yanıtlanır.
+
+Toplu (yeniden) oluşturma:
+    python -m agent_system.tools.error_code_tool build
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from crewai.tools import BaseTool
+
+from agent_system.manual_store import manual_store
+
+# "E21", "E-21", "E:21", "F 03", "Er 05", "H1", "E4A" (yalnızca büyük harf - cümle içi kelimeler eşleşmesin)
+CODE_PATTERN = re.compile(r"(?<![\w-])((?:Er|Err|[A-Z]))\s?[-:.]?\s?(\d{1,3})([A-Z]?)(?![\w-])")
+# Hata kodu tablosu olduğunu gösteren başlıklar (tek başına "arıza"/"error" geçen sayfa tablo sayılmaz)
+TABLE_HINT_PATTERN = re.compile(
+    r"(hata\s+kod|ar[ıi]za\s+kod|hata\s+mesaj|uyar[ıi]\s+kod|error\s+code|fault\s+code|error\s+message)",
+    re.IGNORECASE,
+)
+# Çözüm kısmını başlatan ifadeler
+REMEDY_CUE_PATTERN = re.compile(
+    r"\b(çözüm|yapılması gereken(?:ler)?|ne yapmalı|olası çözüm|solution|remedy|what to do|action)\s*:?\s*",
+    re.IGNORECASE,
+)
+MIN_CODES_PER_TABLE = 2  # Tabloda en az bu kadar farklı kod olmalı (tek geçen "E14" vs. sayılmaz)
+MAX_ROW_CHARS = 300      # Kod satırının en fazla bu kadarı alınır (tablo sonrası metin sızmasın)
+KNOWN_PREFIXES = {"E", "F", "H", "C", "U", "P", "L", "Er", "Err"}
+
+
+def normalize_code(prefix: str, digits: str, suffix: str = "") -> str:
+    """Kanonik kod: ayraçsız, büyük harf ("E-21" -> "E21", "Er 05" -> "ER05")"""
+    return f"{prefix.upper()}{digits}{suffix.upper()}"
+
+
+def code_variants(code: str) -> List[str]:
+    """Kullanıcının yazdığı koddan aranacak kanonik biçimler ("F3" -> F3, F03, F003)"""
+    match = CODE_PATTERN.search((code or "").strip().upper().replace("ERR", "Err").replace("ER", "Er"))
+    if not match:
+        return []
+    prefix, digits, suffix = match.groups()
+    number = int(digits)
+    variants = {normalize_code(prefix, str(number).zfill(width), suffix) for width in (1, 2, 3)}
+    return sorted(variants)
+
+
+# Ham sayfa metninde satır sonları da ayraç sayılır
+_MEANING_STRIP = " -:;|.\t\r\n"
+_REMEDY_STRIP = " -:;|\t\r\n"
+
+
+def _split_meaning_remedy(segment: str) -> Tuple[str, str]:
+    segment = segment.strip(_MEANING_STRIP)
+    cue = REMEDY_CUE_PATTERN.search(segment)
+    if cue and cue.start() > 0:
+        return segment[:cue.start()].strip(_MEANING_STRIP), segment[cue.end():].strip(_REMEDY_STRIP)
+    for sep in (" - ", ": ", " | ", ". "):
+        if sep in segment:
+            meaning, remedy = segment.split(sep, 1)
+            return meaning.strip(_MEANING_STRIP), remedy.strip(_REMEDY_STRIP)
+    return segment, ""
+
+
+def extract_error_codes(page_no: int, text: str, continued: bool = False) -> List[Tuple[str, str, str, int]]:
+    """
+    Tek sayfadan (code, meaning, remedy, page) satırları.
+    Sayfa bir hata tablosu gibi görünmüyorsa (başlık yok veya yeterince farklı kod yok) boş döner.
+    continued: önceki sayfa tabloydu - başlıksız devam sayfası da kabul edilir.
+    """
+    if not text or not (continued or TABLE_HINT_PATTERN.search(text)):
+        return []
+    matches = [m for m in CODE_PATTERN.finditer(text) if m.group(1) in KNOWN_PREFIXES]
+    if len({normalize_code(*m.groups()) for m in matches}) < MIN_CODES_PER_TABLE:
+        return []
+
+    rows = []
+    seen = set()
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        segment = text[match.end():min(end, match.end() + MAX_ROW_CHARS)]
+        meaning, remedy = _split_meaning_remedy(segment)
+        code = normalize_code(*match.groups())
+        if len(meaning) < 3 or code in seen:
+            continue  # Yalnızca kod listesi (ör. "E1, E2, E3") - anlamı olmayan geçiş
+        seen.add(code)
+        rows.append((code, meaning, remedy, page_no))
+    return rows
+
+
+def index_manual_error_codes(manual_id: str) -> int:
+    """
+    Tamamlanmış kılavuzun hata kodlarını ham sayfa metninden çıkarıp kaydet (model ailesinde ortak
+    tablolar da dahil). Dönüş: satır sayısı
+    """
+    manual = manual_store.get_manual(manual_id)
+    if not manual:
+        return 0
+    rows = []
+    continued = False
+    for page in manual['pages']:
+        if page['skipped']:
+            continued = False
+            continue
+        page_rows = extract_error_codes(page['page_no'], manual_store.page_text(page), continued)
+        rows.extend(page_rows)
+        continued = bool(page_rows)
+    manual_store.replace_error_codes(manual_id, rows)
+    return len(rows)
+
+
+class ErrorCodeLookupInput(BaseModel):
+    """Input schema for Error Code Lookup Tool"""
+    product_name: str = Field(description="Ürün adı veya model numarası (ör. 'KCMI 98142 WIFI')")
+    code: str = Field(description="Cihazın gösterdiği hata kodu (ör. 'E21', 'F03')")
+
+
+class ErrorCodeLookupTool(BaseTool):
+    name: str = "Hata Kodu Sorgulama"
+    description: str = (
+        "Ürünün kılavuzundaki hata kodu tablosundan bir kodun anlamını ve çözümünü döndürür. "
+        "Kullanıcı 'E21 hatası', 'F03 error' gibi bir kod verdiğinde PDF aracından önce bunu kullan."
+    )
+    args_schema = ErrorCodeLookupInput
+
+    def _run(self, product_name: str, code: str) -> str:
+        from agent_system.tools.manual_index import resolve_product_manual
+
+        variants = code_variants(code)
+        if not variants:
+            return f"'{code}' geçerli bir hata kodu gibi görünmüyor (ör. E21, F03)."
+
+        try:
+            entry = resolve_product_manual(product_name)
+        except Exception as e:
+            return f"Veritabanı arama hatası: {e}"
+        if not entry or not entry["manual_id"]:
+            return f"'{product_name}' için kılavuz bulunamadı; model numarasını doğrulayın."
+
+        rows = manual_store.lookup_error_codes(entry["manual_id"], variants)
+        product = f"{entry['name']} ({entry['model_number']})"
+        if rows:
+            lines = [f"🔧 {product} - hata kodu {rows[0]['code']}:"]
+            for row in rows:
+                lines.append(f"- Anlamı: {row['meaning']}")
+                if row['remedy']:
+                    lines.append(f"  Çözüm: {row['remedy']}")
+                lines.append(f"  (Kılavuz sayfa {row['page']})")
+            return "\n".join(lines)
+
+        manual = manual_store.get_manual(entry["manual_id"])
+        if not manual or not manual['complete']:
+            # Kılavuz henüz işlenmedi - arka planda başlat, bu sefer PDF aracına yönlendir
+            from pathlib import Path
+            from agent_system.tools.manual_extraction import manual_extractor
+            manual_extractor.get_manual(Path(entry["resolved_path"]), budget_seconds=0,
+                                        manual_id=entry["manual_id"])
+            return (f"{product} kılavuzu henüz indekslenmedi; '{code}' için PDF Kılavuz Analizi "
+                    f"aracını kullan.")
+
+        known = manual_store.manual_error_codes(entry["manual_id"])
+        if known:
+            return (f"{product} kılavuzunda '{code}' kodu bulunamadı. "
+                    f"Kılavuzdaki kodlar: {', '.join(known)}")
+        return f"{product} kılavuzunda hata kodu tablosu bulunamadı; PDF Kılavuz Analizi aracını kullan."
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kılavuz hata kodu indeksi")
+    parser.add_argument("command", choices=["build"], help="Tamamlanmış tüm kılavuzlar için yeniden oluştur")
+    parser.parse_args()
+
+    manuals = manual_store.list_complete()
+    total = 0
+    for manual in manuals:
+        total += index_manual_error_codes(manual['manual_id'])
+    print(f"🔧 {len(manuals)} kılavuzdan {total} hata kodu satırı indekslendi")
+
+
+if __name__ == "__main__":
+    main()
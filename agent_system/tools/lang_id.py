@@ -0,0 +1,264 @@
+"""
+Hızlı Dil Tanıma - Karakter trigram tabanlı, sayfa bazlı dil tespiti
+
+Vestel kılavuzları genelde onlarca dili tek PDF'te toplar. Bu modül metin katmanı
+okunur okunmaz sayfanın dilini tahmin eder; desteklenmeyen dillerdeki sayfalar
+OCR'a ve LLM'e gitmeden elenebilir.
+
+- Latin alfabeli diller: gömülü örnek metinlerden çıkarılan trigram profilleri
+  üzerinde naive Bayes skoru
+- Latin dışı yazılar (Kiril, Yunan, Arap, İbrani): doğrudan alfabe tespiti
+  (ISO 15924 kodları: "cyrl", "grek", "arab", "hebr")
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+UNKNOWN = "und"
+
+# Tespit için kullanılacak azami karakter - sayfanın tamamını taramaya gerek yok
+MAX_SAMPLE_CHARS = 2000
+# Bu kadar harften kısa metinlerde karar verilmez
+MIN_LETTERS = 60
+
+# Kılavuz diline yakın örnek metinler (güvenlik, kurulum, temizlik, sorun giderme)
+_SAMPLES: Dict[str, str] = {
+    "tr": (
+        "Bu kullanma kılavuzunu dikkatlice okuyunuz ve ileride başvurmak üzere saklayınız. "
+        "Ürünü kurmadan önce güvenlik talimatlarını okuyun. Cihazın fişini prizden çekiniz. "
+        "Çamaşır makinesini düz ve sağlam bir zemine yerleştirin. Temizlik yapmadan önce "
+        "cihazın elektrik bağlantısını kesin. Sorun giderme bölümünde yaygın arızalar ve "
+        "çözümleri bulunmaktadır. Yetkili servise başvurunuz. Garanti belgesi ve tüketici "
+        "hakları hakkında bilgiler. Buzdolabının kapısını açık bırakmayınız. Programı seçin "
+        "ve başlat düğmesine basın. Su hortumunun bükülmediğinden emin olunuz. Çocukların "
+        "cihazla oynamasına izin vermeyiniz. Enerji tasarrufu için öneriler ve teknik özellikler."
+    ),
+    "en": (
+        "Please read this user manual carefully and keep it for future reference. "
+        "Read the safety instructions before installing the product. Unplug the appliance "
+        "from the mains socket. Place the washing machine on a flat and stable floor. "
+        "Disconnect the power supply before cleaning. The troubleshooting section lists common "
+        "faults and their solutions. Contact the authorised service agent. Warranty and "
+        "customer information. Do not leave the refrigerator door open. Select the programme "
+        "and press the start button. Make sure the water hose is not kinked. Children should "
+        "be supervised to ensure that they do not play with the appliance. Energy saving tips."
+    ),
+    "de": (
+        "Bitte lesen Sie diese Bedienungsanleitung sorgfältig durch und bewahren Sie sie für "
+        "späteres Nachschlagen auf. Lesen Sie die Sicherheitshinweise vor der Installation des "
+        "Geräts. Ziehen Sie den Netzstecker aus der Steckdose. Stellen Sie die Waschmaschine auf "
+        "einen ebenen und stabilen Boden. Trennen Sie das Gerät vor der Reinigung vom Stromnetz. "
+        "Im Abschnitt Fehlerbehebung finden Sie häufige Störungen und deren Lösungen. Wenden Sie "
+        "sich an den Kundendienst. Lassen Sie die Kühlschranktür nicht offen. Wählen Sie das "
+        "Programm und drücken Sie die Starttaste. Kinder dürfen nicht mit dem Gerät spielen."
+    ),
+    "fr": (
+        "Veuillez lire attentivement ce manuel d'utilisation et le conserver pour toute "
+        "référence ultérieure. Lisez les consignes de sécurité avant d'installer l'appareil. "
+        "Débranchez l'appareil de la prise de courant. Placez le lave-linge sur un sol plat et "
+        "stable. Coupez l'alimentation électrique avant le nettoyage. La section de dépannage "
+        "présente les pannes courantes et leurs solutions. Contactez le service après-vente agréé. "
+        "Ne laissez pas la porte du réfrigérateur ouverte. Sélectionnez le programme et appuyez "
+        "sur la touche de démarrage. Les enfants ne doivent pas jouer avec l'appareil."
+    ),
+    "es": (
+        "Lea atentamente este manual de usuario y consérvelo para futuras consultas. Lea las "
+        "instrucciones de seguridad antes de instalar el aparato. Desenchufe el aparato de la "
+        "toma de corriente. Coloque la lavadora sobre un suelo plano y estable. Desconecte la "
+        "alimentación eléctrica antes de la limpieza. La sección de solución de problemas "
+        "contiene las averías más comunes y sus soluciones. Póngase en contacto con el servicio "
+        "técnico autorizado. No deje abierta la puerta del frigorífico. Seleccione el programa y "
+        "pulse el botón de inicio. Los niños no deben jugar con el aparato."
+    ),
+    "it": (
+        "Si prega di leggere attentamente questo manuale d'uso e di conservarlo per future "
+        "consultazioni. Leggere le istruzioni di sicurezza prima di installare l'apparecchio. "
+        "Scollegare l'apparecchio dalla presa di corrente. Posizionare la lavatrice su un "
+        "pavimento piano e stabile. Staccare l'alimentazione prima della pulizia. La sezione "
+        "risoluzione dei problemi elenca i guasti più comuni e le relative soluzioni. Rivolgersi "
+        "al centro di assistenza autorizzato. Non lasciare aperta la porta del frigorifero. "
+        "Selezionare il programma e premere il tasto di avvio. I bambini non devono giocare con "
+        "l'apparecchio."
+    ),
+    "pt": (
+        "Leia atentamente este manual de instruções e guarde-o para consultas futuras. Leia as "
+        "instruções de segurança antes de instalar o aparelho. Desligue o aparelho da tomada "
+        "elétrica. Coloque a máquina de lavar roupa num piso plano e estável. Desligue a "
+        "alimentação antes da limpeza. A secção de resolução de problemas apresenta as avarias "
+        "mais comuns e as respetivas soluções. Contacte o serviço de assistência autorizado. Não "
+        "deixe a porta do frigorífico aberta. Selecione o programa e prima o botão de início. As "
+        "crianças não devem brincar com o aparelho."
+    ),
+    "nl": (
+        "Lees deze gebruiksaanwijzing zorgvuldig door en bewaar hem om later te raadplegen. Lees "
+        "de veiligheidsinstructies voordat u het apparaat installeert. Haal de stekker uit het "
+        "stopcontact. Plaats de wasmachine op een vlakke en stevige vloer. Schakel de stroom uit "
+        "voordat u het apparaat reinigt. In het gedeelte probleemoplossing vindt u veelvoorkomende "
+        "storingen en de oplossingen. Neem contact op met de erkende klantenservice. Laat de deur "
+        "van de koelkast niet open staan. Kies het programma en druk op de startknop. Kinderen "
+        "mogen niet met het apparaat spelen."
+    ),
+    "pl": (
+        "Prosimy o uważne przeczytanie niniejszej instrukcji obsługi i zachowanie jej do "
+        "wykorzystania w przyszłości. Przed instalacją urządzenia należy przeczytać instrukcje "
+        "bezpieczeństwa. Wyjmij wtyczkę urządzenia z gniazdka sieciowego. Ustaw pralkę na płaskiej "
+        "i stabilnej podłodze. Przed czyszczeniem odłącz zasilanie. W części rozwiązywanie "
+        "problemów opisano najczęstsze usterki i sposoby ich usunięcia. Skontaktuj się z "
+        "autoryzowanym serwisem. Nie zostawiaj otwartych drzwi lodówki. Wybierz program i naciśnij "
+        "przycisk start. Dzieci nie mogą bawić się urządzeniem."
+    ),
+    "ro": (
+        "Vă rugăm să citiți cu atenție acest manual de utilizare și să îl păstrați pentru "
+        "consultări ulterioare. Citiți instrucțiunile de siguranță înainte de instalarea "
+        "aparatului. Scoateți ștecherul aparatului din priză. Așezați mașina de spălat pe o "
+        "suprafață plană și stabilă. Deconectați alimentarea înainte de curățare. Secțiunea de "
+        "depanare prezintă defecțiunile frecvente și soluțiile acestora. Contactați service-ul "
+        "autorizat. Nu lăsați ușa frigiderului deschisă. Selectați programul și apăsați butonul de "
+        "pornire. Copiii nu trebuie să se joace cu aparatul."
+    ),
+    "hu": (
+        "Kérjük, figyelmesen olvassa el ezt a használati útmutatót, és őrizze meg későbbi "
+        "felhasználás céljából. A készülék üzembe helyezése előtt olvassa el a biztonsági "
+        "utasításokat. Húzza ki a készülék csatlakozódugóját a konnektorból. Helyezze a mosógépet "
+        "sík és stabil padlóra. Tisztítás előtt válassza le a készüléket az elektromos hálózatról. "
+        "A hibaelhárítás fejezet a gyakori hibákat és azok megoldásait tartalmazza. Forduljon a "
+        "hivatalos szervizhez. Ne hagyja nyitva a hűtőszekrény ajtaját. Válassza ki a programot, "
+        "és nyomja meg az indítás gombot. Gyermekek nem játszhatnak a készülékkel."
+    ),
+    "cs": (
+        "Přečtěte si prosím pozorně tento návod k použití a uschovejte jej pro budoucí použití. "
+        "Před instalací spotřebiče si přečtěte bezpečnostní pokyny. Vytáhněte zástrčku spotřebiče "
+        "ze zásuvky. Postavte pračku na rovnou a pevnou podlahu. Před čištěním odpojte napájení. "
+        "V části odstraňování problémů najdete nejčastější závady a jejich řešení. Obraťte se na "
+        "autorizovaný servis. Nenechávejte dveře chladničky otevřené. Zvolte program a stiskněte "
+        "tlačítko start. Děti si se spotřebičem nesmějí hrát."
+    ),
+    "hr": (
+        "Molimo pažljivo pročitajte ove upute za uporabu i sačuvajte ih za buduću upotrebu. "
+        "Prije postavljanja uređaja pročitajte sigurnosne upute. Izvucite utikač uređaja iz "
+        "utičnice. Postavite perilicu rublja na ravan i stabilan pod. Prije čišćenja isključite "
+        "napajanje. U odjeljku rješavanje problema navedeni su najčešći kvarovi i njihova rješenja. "
+        "Obratite se ovlaštenom servisu. Ne ostavljajte vrata hladnjaka otvorena. Odaberite program "
+        "i pritisnite tipku za pokretanje. Djeca se ne smiju igrati s uređajem."
+    ),
+}
+
+# Latin dışı alfabeler: Unicode isim önekine göre
+_SCRIPT_PREFIXES = (
+    ("CYRILLIC", "cyrl"),
+    ("GREEK", "grek"),
+    ("ARABIC", "arab"),
+    ("HEBREW", "hebr"),
+)
+
+_NON_LETTER_RE = re.compile(r"[^\w]+|[\d_]+")
+
+
+def _tokens(text: str) -> List[str]:
+    text = unicodedata.normalize("NFC", text or "").lower()
+    # Türkçe noktalı/noktasız i ayrımı korunur; sadece harf dizileri kalır
+    return [t for t in _NON_LETTER_RE.split(text) if t]
+
+
+def _trigrams(text: str) -> Counter:
+    grams = Counter()
+    for word in _tokens(text):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams[padded[i:i + 3]] += 1
+    return grams
+
+
+def _build_profiles() -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    """Her dil için trigram log-olasılıkları (add-one smoothing) ve görülmeyen trigram tabanı"""
+    profiles, floors = {}, {}
+    for lang, sample in _SAMPLES.items():
+        grams = _trigrams(sample)
+        total = sum(grams.values())
+        vocab = len(grams) + 1
+        denom = total + vocab
+        profiles[lang] = {g: math.log((c + 1) / denom) for g, c in grams.items()}
+        floors[lang] = math.log(1 / denom)
+    return profiles, floors
+
+
+_PROFILES, _FLOORS = _build_profiles()
+
+
+def detect_script(text: str) -> str:
+    """Harflerin çoğunluğu Latin dışı bir alfabedeyse onun kodunu döndürür, yoksa 'latn'"""
+    counts = Counter()
+    letters = 0
+    for ch in text[:MAX_SAMPLE_CHARS]:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        name = unicodedata.name(ch, "")
+        for prefix, code in _SCRIPT_PREFIXES:
+            if name.startswith(prefix):
+                counts[code] += 1
+                break
+    if letters and counts:
+        code, n = counts.most_common(1)[0]
+        if n / letters > 0.5:
+            return code
+    return "latn"
+
+
+def rank_languages(text: str) -> List[Tuple[str, float]]:
+    """Latin dilleri için (dil, trigram başına ortalama log-olasılık) listesi, en iyiden kötüye"""
+    grams = _trigrams(text[:MAX_SAMPLE_CHARS])
+    total = sum(grams.values())
+    if not total:
+        return []
+    scores = []
+    for lang, profile in _PROFILES.items():
+        floor = _FLOORS[lang]
+        score = sum(c * profile.get(g, floor) for g, c in grams.items())
+        scores.append((lang, score / total))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores
+
+
+def identify_language(text: str) -> str:
+    """Metnin dil kodu; karar verilemiyorsa 'und'"""
+    if not text or sum(ch.isalpha() for ch in text[:MAX_SAMPLE_CHARS]) < MIN_LETTERS:
+        return UNKNOWN
+    script = detect_script(text)
+    if script != "latn":
+        return script
+    ranked = rank_languages(text)
+    return ranked[0][0] if ranked else UNKNOWN
+
+
+def is_supported_text(text: str, languages: Iterable[str], margin: float = 0.15) -> bool:
+    """
+    Sayfa desteklenen dillerden birinde mi?
+    Emin olunamayan (kısa, karışık) sayfalar korunur: yalnızca açıkça başka dilde
+    olan sayfalar False döner. Desteklenen en iyi dilin skoru birinciye `margin`
+    kadar yakınsa sayfa iki dilli kabul edilir ve tutulur.
+    """
+    languages = set(languages or ())
+    if not languages or not text:
+        return True
+    if sum(ch.isalpha() for ch in text[:MAX_SAMPLE_CHARS]) < MIN_LETTERS:
+        return True
+
+    script = detect_script(text)
+    if script != "latn":
+        return script in languages
+
+    ranked = rank_languages(text)
+    if not ranked:
+        return True
+    best_lang, best_score = ranked[0]
+    if best_lang in languages:
+        return True
+    supported_scores = [score for lang, score in ranked if lang in languages]
+    return bool(supported_scores) and (best_score - max(supported_scores)) < margin
+
+
+__all__ = ["identify_language", "is_supported_text", "rank_languages", "detect_script", "UNKNOWN"]
@@ -0,0 +1,153 @@
+"""
+Kademeli Kılavuz Çıkarımı - İlk yanıt kısa sürede, kalan sayfalar arka planda
+
+Önbellekte olmayan bir kılavuz ilk kez sorulduğunda çıkarım arka plan iş parçacığında
+başlar; çağıran taraf en fazla `budget_seconds` bekler ve o ana kadar hazır olan
+sayfalarla devam eder. Her sayfa çıkarılır çıkarılmaz manual_store'a yazılır, böylece:
+- aynı oturumdaki takip soruları (ve diğer oturumlar) tam kılavuzu beklemeden görür,
+- süreç çökerse çıkarım kalınan sayfadan devam eder (resume_pending).
+İşler belge kimliğine (içerik özeti) göre tutulur; aynı PDF'i paylaşan ürünler tek işi bekler.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from agent_system.manual_store import manual_store
+
+OCR_DPI = 120  # Düşük DPI - hız için
+
+
+class _ExtractionJob:
+    def __init__(self, manual_id: str, pdf_path: Path):
+        self.manual_id = manual_id
+        self.pdf_path = pdf_path
+        self.finished = threading.Event()
+
+
+class ManualExtractor:
+    """Kılavuz başına tek arka plan çıkarım işi yürütür"""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="manual-extract")
+        self._jobs: Dict[str, _ExtractionJob] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_job(self, manual_id: str, pdf_path: Path) -> _ExtractionJob:
+        with self._lock:
+            job = self._jobs.get(manual_id)
+            if job is None:
+                job = _ExtractionJob(manual_id, pdf_path)
+                self._jobs[manual_id] = job
+                self._executor.submit(self._run, job)
+            return job
+
+    def _run(self, job: _ExtractionJob):
+        from agent_system.tools.pdf_tool import iter_pdf_pages
+
+        try:
+            existing = manual_store.get_manual(job.manual_id)
+            start_page = len(existing['pages']) if existing else 0
+            if existing and start_page:
+                print(f"🔁 Kılavuz çıkarımı {start_page + 1}. sayfadan devam ediyor: {job.pdf_path.name}")
+
+            started = bool(existing)
+            total = existing['total_pages'] if existing else 0
+            for page in iter_pdf_pages(job.pdf_path, ocr_dpi=OCR_DPI, start_page=start_page):
+                if not started:
+                    total = page['total']
+                    manual_store.begin_manual(job.manual_id, total)
+                    started = True
+                manual_store.save_page(job.manual_id, page)
+                if page['page_no'] % 10 == 0 or page['ocr_used']:
+                    print(f"📄 [{page['page_no']}/{page['total']}] {'🔍' if page['ocr_used'] else '📝'} {job.pdf_path.name}")
+
+            if not started:
+                # Sayfasız PDF - yine de tamamlandı olarak işaretle
+                manual_store.begin_manual(job.manual_id, 0)
+            manual_store.mark_complete(job.manual_id)
+            print(f"✅ Kılavuz önbelleğe alındı: {job.pdf_path.name} ({total} sayfa)")
+            self._build_derived_indexes(job)
+        except Exception as e:
+            print(f"❌ Kılavuz çıkarım hatası ({job.pdf_path.name}): {e}")
+        finally:
+            job.finished.set()
+            with self._lock:
+                self._jobs.pop(job.manual_id, None)
+
+    def _build_derived_indexes(self, job: _ExtractionJob):
+        """Tamamlanan kılavuzdan türetilen indeksler (belge başına bir kez)"""
+        from agent_system.tools.error_code_tool import index_manual_error_codes
+        from agent_system.tools.spec_tool import index_manual_specs
+        from agent_system.tools.troubleshooting_tool import index_manual_troubleshooting
+
+        for label, build in (("hata kodu", index_manual_error_codes),
+                             ("sorun giderme pasajı", index_manual_troubleshooting),
+                             ("teknik özellik", index_manual_specs)):
+            try:
+                count = build(job.manual_id)
+                if count:
+                    print(f"🗂️ {job.pdf_path.name}: {count} {label} indekslendi")
+            except Exception as e:
+                print(f"⚠️ {label.capitalize()} indeksi oluşturulamadı ({job.pdf_path.name}): {e}")
+
+    def get_manual(self, pdf_path: Path, budget_seconds: Optional[float] = None,
+                   manual_id: Optional[str] = None) -> Dict:
+        """
+        Kılavuzun sayfalarını döndürür. Önbellekte tamamsa hemen; değilse arka plan
+        çıkarımını başlatır/sürdürür ve en fazla budget_seconds bekler.
+        manual_id (ör. çözümleme indeksinden) verilirse dosya yeniden özetlenmez.
+        Dönüş: manual_store.get_manual() kaydı (+ 'complete' bayrağı)
+        """
+        pdf_path = Path(pdf_path)
+        key = manual_id or manual_store.manual_id_for(pdf_path)
+        cached = manual_store.get_manual(key)
+        if cached and cached['complete']:
+            return cached
+
+        if budget_seconds is None:
+            budget_seconds = _first_answer_budget()
+        job = self._ensure_job(key, pdf_path)
+        job.finished.wait(timeout=budget_seconds)
+
+        return manual_store.get_manual(key) or {
+            'manual_id': key, 'file_name': pdf_path.name, 'total_pages': 0,
+            'complete': 0, 'used_ocr': 0, 'pages': []
+        }
+
+    def resume_pending(self) -> int:
+        """Yarım kalmış çıkarımları arka planda sürdür. Dönüş: başlatılan iş sayısı"""
+        resumed = 0
+        for row in manual_store.list_incomplete():
+            pdf_path = Path(row['file_path'] or "")
+            if not row['file_path'] or not pdf_path.exists():
+                continue
+            try:
+                if manual_store.manual_id_for(pdf_path) != row['manual_id']:
+                    continue  # Dosya değişmiş; ilk sorguda yeni kimlikle çıkarılacak
+            except OSError:
+                continue
+            self._ensure_job(row['manual_id'], pdf_path)
+            resumed += 1
+        return resumed
+
+
+def _first_answer_budget() -> float:
+    try:
+        from agent_system.config import MANUAL_FIRST_ANSWER_SECONDS
+        return MANUAL_FIRST_ANSWER_SECONDS
+    except Exception:
+        return 8.0
+
+
+def _max_workers() -> int:
+    try:
+        from agent_system.config import MANUAL_EXTRACTION_WORKERS
+        return MANUAL_EXTRACTION_WORKERS
+    except Exception:
+        return 2
+
+
+# Global instance
+manual_extractor = ManualExtractor(max_workers=_max_workers())
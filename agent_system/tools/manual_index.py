@@ -0,0 +1,199 @@
+"""
+Ürün → Kılavuz Çözümleme İndeksi
+
+Ürün adı/model numarası token'larını kılavuz kaydına eşleyen indeks bir kez (ingest sonrası)
+oluşturulur ve manual_store'da tutulur. Dosya yolları da o anda MANUALS_ROOT'a göre çözülür;
+böylece PDFAnalysisTool her çağrıda LIKE taraması, Python'da skorlama ve dosya sistemi
+yoklaması yapmadan tek indeksli sorguyla kılavuzu bulur.
+
+Kullanım:
+    python -m agent_system.tools.manual_index build
+"""
+
+import argparse
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Optional
+
+from agent_system.manual_store import manual_store
+from agent_system.text_utils import normalize_token_text, product_category, query_tokens, tokenize
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+MODEL_TOKEN_WEIGHT = 3  # Rakam içeren model numarası parçaları ve birleşik halleri (ör. "so6004")
+NAME_TOKEN_WEIGHT = 1   # Ürün adındaki diğer kelimeler ve model numarasındaki rakamsız kelimeler
+
+_ensure_lock = threading.Lock()
+_index_checked = False
+
+
+def product_tokens(name: str, model_number: str) -> Dict[str, int]:
+    """Bir ürünün indeks token'ları ve ağırlıkları"""
+    weights: Dict[str, int] = defaultdict(int)
+    for token in set(tokenize(name)):
+        if len(token) > 1:
+            weights[token] += NAME_TOKEN_WEIGHT
+
+    model_parts = tokenize(model_number)
+    model_tokens = set(model_parts)
+    # "KCMI 98142 WIFI" -> "kcmi98142", "kcmi98142wifi" (kullanıcılar modeli bitişik yazabiliyor)
+    for end in range(2, len(model_parts) + 1):
+        model_tokens.add("".join(model_parts[:end]))
+    for token in model_tokens:
+        # Rakamsız parçalar ("vestel", "wifi", "mikrodalga") model kimliği değil: ad ağırlığında kalır
+        if any(ch.isdigit() for ch in token):
+            weights[token] += MODEL_TOKEN_WEIGHT
+        elif len(token) > 1:
+            weights[token] = max(weights[token], NAME_TOKEN_WEIGHT)
+    return dict(weights)
+
+
+def _resolve_path(manual_path: str, files_by_name: Dict[str, Path]) -> str:
+    """DB'deki yolu bu makinede var olan dosyaya çöz; bulunamazsa ''"""
+    path = Path(manual_path)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    if path.exists():
+        return str(path.resolve())
+    # Başka makinenin mutlak yolu (/home/.../manuals/x.pdf) -> MANUALS_ROOT altında aynı ad
+    found = files_by_name.get(path.name)
+    return str(found.resolve()) if found else ""
+
+
+def _source_signature(products_db: Path, manuals_root: Path) -> Dict[str, str]:
+    """İndeksin güncelliğini belirleyen değerler"""
+    st = products_db.stat()
+    return {
+        "products_db": str(products_db),
+        "products_db_size": str(st.st_size),
+        "products_db_mtime": str(int(st.st_mtime)),
+        "manuals_root": str(manuals_root),
+        "schema": "5",  # product_manuals kolonları veya ayrıştırma değiştiğinde indeks yeniden oluşturulsun
+    }
+
+
+def build_manual_index(products_db: Optional[Path] = None, manuals_root: Optional[Path] = None) -> Dict[str, int]:
+    """Ürün DB'sinden çözümleme indeksini (ve katalog özelliklerini) yeniden oluştur"""
+    from agent_system.config import MANUALS_ROOT, PRODUCTS_DATABASE_PATH
+    from agent_system.tools.spec_tool import parse_keyword_specs
+
+    products_db = Path(products_db or PRODUCTS_DATABASE_PATH)
+    manuals_root = Path(manuals_root or MANUALS_ROOT)
+
+    files_by_name: Dict[str, Path] = {}
+    if manuals_root.is_dir():
+        for pdf in manuals_root.rglob("*.pdf"):
+            files_by_name.setdefault(pdf.name, pdf)
+
+    with sqlite3.connect(products_db) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("""
+            SELECT id, name, model_number, manual_path, manual_keywords FROM products
+            WHERE manual_path IS NOT NULL AND manual_path != ''
+        """).fetchall()
+
+    resolved_paths = {r["id"]: _resolve_path(r["manual_path"], files_by_name) for r in rows}
+    # Özet yalnız önbellekten: yeni/değişmiş dosyalar fill_manual_ids ile (arka planda) hesaplanır
+    known_ids = manual_store.known_manual_ids([p for p in resolved_paths.values() if p])
+
+    products, tokens, specs = [], [], []
+    for r in rows:
+        name, model = r["name"] or "", r["model_number"] or ""
+        resolved = resolved_paths[r["id"]]
+        products.append({
+            "product_id": r["id"],
+            "name": name,
+            "model_number": model,
+            "manual_path": r["manual_path"],
+            "resolved_path": resolved,
+            # Aynı içerikli kılavuzlar (renk/kapasite varyantları) tek belge kimliğini paylaşır
+            "manual_id": known_ids.get(resolved, ""),
+            # Kategori filtresi için normalize edilmiş (aksansız, küçük harf) ürün tipi
+            "category": normalize_token_text(product_category(r["manual_keywords"])),
+        })
+        tokens.extend((token, r["id"], weight) for token, weight in product_tokens(name, model).items())
+        specs.extend((r["id"], *row) for row in parse_keyword_specs(r["manual_keywords"]))
+
+    manual_store.replace_manual_index(products, tokens, _source_signature(products_db, manuals_root), specs)
+    stats = {
+        "products": len(products),
+        "resolved": sum(1 for p in products if p["resolved_path"]),
+        "unique_manuals": len({p["manual_id"] for p in products if p["manual_id"]}),
+        "pending": len({p["resolved_path"] for p in products if p["resolved_path"] and not p["manual_id"]}),
+        "tokens": len(tokens),
+        "specs": len(specs),
+    }
+    print(f"🗂️ Kılavuz indeksi: {stats['products']} ürün, {stats['resolved']} dosya çözüldü "
+          f"({stats['unique_manuals']} benzersiz belge, {stats['pending']} dosyanın özeti bekliyor), "
+          f"{stats['tokens']} token, {stats['specs']} katalog özelliği")
+    return stats
+
+
+def fill_manual_ids() -> int:
+    """Belge kimliği bekleyen kılavuz dosyalarının içerik özetini hesapla. Dönüş: işlenen dosya sayısı"""
+    filled = 0
+    for path in manual_store.pending_manual_paths():
+        try:
+            manual_store.set_product_manual_id(path, manual_store.manual_id_for(Path(path)))
+            filled += 1
+        except OSError as e:
+            print(f"⚠️ Kılavuz özeti hesaplanamadı ({path}): {e}")
+    if filled:
+        print(f"🔑 {filled} kılavuz dosyasının belge kimliği hesaplandı")
+    return filled
+
+
+def ensure_manual_index():
+    """Süreç başına bir kez: indeks yoksa veya ürün DB'si/MANUALS_ROOT değiştiyse yeniden oluştur"""
+    global _index_checked
+    if _index_checked:
+        return
+    with _ensure_lock:
+        if _index_checked:
+            return
+        from agent_system.config import MANUALS_ROOT, PRODUCTS_DATABASE_PATH
+
+        current = _source_signature(Path(PRODUCTS_DATABASE_PATH), Path(MANUALS_ROOT))
+        if manual_store.manual_index_meta() != current:
+            build_manual_index()
+        # Önbellekte olmayan dosyaların özeti istek yolunu ve kilidi bekletmeden arka planda
+        if manual_store.pending_manual_paths():
+            threading.Thread(target=fill_manual_ids, name="manual-ids", daemon=True).start()
+        _index_checked = True
+
+
+def resolve_product_manual(product_name: str) -> Optional[Dict]:
+    """
+    Ürün adı/modelinden kılavuz kaydını bulur.
+    Dönüş: product_id, name, model_number, manual_path, resolved_path ('' = dosya yok), manual_id, score; eşleşme yoksa None
+    """
+    ensure_manual_index()
+    entry = manual_store.resolve_manual_tokens(query_tokens(product_name))
+    if entry and entry["resolved_path"] and not entry["manual_id"]:
+        # Arka plan henüz bu dosyaya gelmedi: yalnız bu kılavuzun özetini şimdi hesapla
+        entry["manual_id"] = manual_store.manual_id_for(Path(entry["resolved_path"]))
+        manual_store.set_product_manual_id(entry["resolved_path"], entry["manual_id"])
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ürün → kılavuz çözümleme indeksi")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="İndeksi ürün veritabanından yeniden oluştur")
+    build.add_argument("--products-db", default="", help="Ürün veritabanı (varsayılan: PRODUCTS_DATABASE_PATH)")
+    build.add_argument("--manuals-root", default="", help="Kılavuz kökü (varsayılan: MANUALS_ROOT)")
+    lookup = sub.add_parser("lookup", help="Bir ürün adını çöz")
+    lookup.add_argument("product_name")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_manual_index(args.products_db or None, args.manuals_root or None)
+        fill_manual_ids()
+    else:
+        print(resolve_product_manual(args.product_name))
+
+
+if __name__ == "__main__":
+    main()
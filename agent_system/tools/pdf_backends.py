@@ -0,0 +1,210 @@
+"""
+PDF Metin Backend'leri - PyPDF2 / pdfplumber / pypdfium2 için ortak arayüz
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+# Backend kütüphaneleri opsiyonel - hangisi kuruluysa o kullanılabilir
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+try:
+    import pypdfium2
+    PYPDFIUM2_AVAILABLE = True
+except ImportError:
+    PYPDFIUM2_AVAILABLE = False
+
+DEFAULT_BACKEND = "pypdf2"
+
+
+class PDFDocument:
+    """Açık bir PDF belgesi - sayfa sayfa ham metin döndürür"""
+
+    def __init__(self, pdf_path: Path):
+        self.pdf_path = Path(pdf_path)
+        self.page_count = 0
+
+    def page_text(self, idx: int) -> str:
+        """0 tabanlı sayfanın ham (temizlenmemiş) metin katmanı"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PDFBackend:
+    """Backend arayüzü: open() ile PDFDocument üretir"""
+
+    name: str = ""
+
+    @staticmethod
+    def available() -> bool:
+        return False
+
+    def open(self, pdf_path: Path) -> PDFDocument:
+        raise NotImplementedError
+
+
+# ============== PyPDF2 ==============
+
+class _PyPDF2Document(PDFDocument):
+    def __init__(self, pdf_path: Path):
+        super().__init__(pdf_path)
+        self._file = open(self.pdf_path, "rb")
+        try:
+            self._reader = PyPDF2.PdfReader(self._file)
+            if getattr(self._reader, "is_encrypted", False):
+                try:
+                    self._reader.decrypt("")
+                except Exception:
+                    raise RuntimeError("PDF şifreli ve açılamadı")
+            self.page_count = len(self._reader.pages)
+        except Exception:
+            self._file.close()
+            raise
+
+    def page_text(self, idx: int) -> str:
+        try:
+            return self._reader.pages[idx].extract_text() or ""
+        except Exception:
+            return ""
+
+    def close(self):
+        self._file.close()
+
+
+class PyPDF2Backend(PDFBackend):
+    name = "pypdf2"
+
+    @staticmethod
+    def available() -> bool:
+        return PYPDF2_AVAILABLE
+
+    def open(self, pdf_path: Path) -> PDFDocument:
+        return _PyPDF2Document(pdf_path)
+
+
+# ============== pdfplumber ==============
+
+class _PdfPlumberDocument(PDFDocument):
+    def __init__(self, pdf_path: Path):
+        super().__init__(pdf_path)
+        self._pdf = pdfplumber.open(str(self.pdf_path))
+        self.page_count = len(self._pdf.pages)
+
+    def page_text(self, idx: int) -> str:
+        try:
+            page = self._pdf.pages[idx]
+            text = page.extract_text() or ""
+            # pdfplumber sayfa başına layout cache tutar - uzun belgelerde hafızayı boşalt
+            page.flush_cache()
+            return text
+        except Exception:
+            return ""
+
+    def close(self):
+        self._pdf.close()
+
+
+class PdfPlumberBackend(PDFBackend):
+    name = "pdfplumber"
+
+    @staticmethod
+    def available() -> bool:
+        return PDFPLUMBER_AVAILABLE
+
+    def open(self, pdf_path: Path) -> PDFDocument:
+        return _PdfPlumberDocument(pdf_path)
+
+
+# ============== pypdfium2 ==============
+
+class _PyPdfium2Document(PDFDocument):
+    def __init__(self, pdf_path: Path):
+        super().__init__(pdf_path)
+        self._pdf = pypdfium2.PdfDocument(str(self.pdf_path))
+        self.page_count = len(self._pdf)
+
+    def page_text(self, idx: int) -> str:
+        try:
+            page = self._pdf[idx]
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+                page.close()
+        except Exception:
+            return ""
+
+    def close(self):
+        self._pdf.close()
+
+
+class PyPdfium2Backend(PDFBackend):
+    name = "pypdfium2"
+
+    @staticmethod
+    def available() -> bool:
+        return PYPDFIUM2_AVAILABLE
+
+    def open(self, pdf_path: Path) -> PDFDocument:
+        return _PyPdfium2Document(pdf_path)
+
+
+# ============== Kayıt ==============
+
+BACKENDS: Dict[str, Type[PDFBackend]] = {
+    PyPDF2Backend.name: PyPDF2Backend,
+    PdfPlumberBackend.name: PdfPlumberBackend,
+    PyPdfium2Backend.name: PyPdfium2Backend,
+}
+
+
+def available_backends() -> List[str]:
+    """Bu ortamda kurulu olan backend isimleri"""
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+
+def get_backend(name: Optional[str] = None) -> PDFBackend:
+    """
+    İsimle backend döndürür. İsim verilmezse config'deki PDF_BACKEND kullanılır.
+    İstenen backend kurulu değilse kurulu olan ilk backend'e düşer.
+    """
+    if name is None:
+        try:
+            from agent_system.config import PDF_BACKEND
+            name = PDF_BACKEND
+        except Exception:
+            name = DEFAULT_BACKEND
+
+    name = (name or DEFAULT_BACKEND).strip().lower()
+    cls = BACKENDS.get(name)
+    if cls and cls.available():
+        return cls()
+
+    installed = available_backends()
+    if not installed:
+        raise RuntimeError("Hiçbir PDF backend'i kurulu değil (PyPDF2, pdfplumber veya pypdfium2 gerekli)")
+
+    print(f"⚠️ PDF backend '{name}' kullanılamıyor, '{installed[0]}' kullanılacak")
+    return BACKENDS[installed[0]]()
+
+
+__all__ = ["PDFDocument", "PDFBackend", "BACKENDS", "available_backends", "get_backend"]
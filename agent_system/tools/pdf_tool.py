@@ -7,11 +7,15 @@ import re
 import time
 import unicodedata
 from pathlib import Path
-import sqlite3
-from typing import List, Tuple, Iterable, Optional
-import PyPDF2
+from typing import Dict, List, Tuple, Iterable, Optional
 from crewai.tools import BaseTool
 
+from agent_system.manual_store import manual_store
+from agent_system.tools.boilerplate import detect_header_footer_lines, strip_header_footer
+from agent_system.tools.pdf_backends import PDFDocument, get_backend
+from agent_system.tools.lang_id import is_supported_text
+from agent_system.tools.manual_index import resolve_product_manual
+
 # OCR için gerekli import'lar
 try:
     import pytesseract
@@ -27,6 +31,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 # Configuration
 MAX_TEXT_LENGTH = 30000  # Çok daha büyük limit - 100K karakter
 MAX_PROCESSING_TIME = 120  # 2 dakika - daha uzun süre
+DEFAULT_MANUAL_LANGUAGES = ("tr", "en")  # Sadece bu dillerde yanıt veriyoruz
 
 
 # ============== Yardımcılar ==============
@@ -64,11 +69,13 @@ def is_text_meaningful(s: str, min_len: int = 150) -> bool:  # Daha düşük thr
     letters = sum(c.isalpha() for c in s)
     return (letters / max(len(s), 1)) > 0.20  # %20'ye düşürüldü
 
-def extract_text_pypdf2_page(reader: PyPDF2.PdfReader, idx: int) -> str:
+def needs_ocr(s: str, min_len_for_ok: int = 150) -> bool:
+    """Metin katmanı OCR'a düşmeyi gerektirecek kadar boş mu?"""
+    return not is_text_meaningful(s, min_len=min_len_for_ok) and len(s.strip()) < 50
+
+def extract_text_layer_page(doc: PDFDocument, idx: int, header_keys: Optional[set] = None) -> str:
     try:
-        page = reader.pages[idx]
-        t = page.extract_text() or ""
-        return clean_text(t)
+        return clean_text(strip_header_footer(doc.page_text(idx), header_keys))
     except Exception:
         return ""
 
@@ -87,245 +94,256 @@ def ocr_single_page(pdf_path: Path, page_no_1based: int, dpi: int = 140, lang: s
     except Exception:
         return ""
 
-def page_text_hybrid(reader: PyPDF2.PdfReader, pdf_path: Path, idx: int,
+def configured_manual_languages() -> Tuple[str, ...]:
+    """Kılavuzlardan tutulacak sayfa dilleri (config.MANUAL_LANGUAGES)"""
+    try:
+        from agent_system.config import MANUAL_LANGUAGES
+        return tuple(MANUAL_LANGUAGES)
+    except Exception:
+        return DEFAULT_MANUAL_LANGUAGES
+
+def page_text_hybrid(doc: PDFDocument, pdf_path: Path, idx: int,
                      ocr_if_needed: bool = True,
                      ocr_dpi: int = 120,
-                     min_len_for_ok: int = 150) -> Tuple[str, bool]:  # Lower threshold
+                     min_len_for_ok: int = 150,  # Lower threshold
+                     languages: Optional[Iterable[str]] = None,
+                     header_keys: Optional[set] = None) -> Tuple[str, bool, bool]:
     """
-    Single page: try PyPDF2 first, if not enough, use OCR. Returns (text, ocr_used)
+    Single page: try the text layer first, if not enough, use OCR.
+    Recurring header/footer lines (header_keys) are stripped from the text layer.
+    Pages whose text is clearly in a language outside `languages` are skipped
+    before OCR. Returns (text, ocr_used, skipped_by_language)
     """
     p1 = idx + 1
-    t = extract_text_pypdf2_page(reader, idx)
+    t = extract_text_layer_page(doc, idx, header_keys)
+    if languages and not is_supported_text(t, languages):
+        return ("", False, True)
     if is_text_meaningful(t, min_len=min_len_for_ok):
-        return (t, False)
+        return (t, False, False)
 
     # minimize unnecessary OCR usage
-    if ocr_if_needed and OCR_AVAILABLE and len(t.strip()) < 50:  # If very empty, use OCR
+    if ocr_if_needed and OCR_AVAILABLE and needs_ocr(t, min_len_for_ok):  # If very empty, use OCR
         t2 = ocr_single_page(pdf_path, p1, dpi=ocr_dpi)
         if t2 and len(t2.strip()) > 30:  # If OCR returns even a little, use it
-            return (t2, True)
-
-    # If PyPDF2 text is little still return it 
-    return (t, False)
-
-def iter_pdf_text_stream(pdf_path: Path,
-                         max_seconds: Optional[int] = None,
-                         ocr_dpi: int = 140,
-                         ocr_if_needed: bool = True,
-                         progress_cb: Optional[callable] = None) -> Iterable[str]:
+            if languages and not is_supported_text(t2, languages):
+                return ("", True, True)
+            return (t2, True, False)
+
+    # If text layer is little still return it 
+    return (t, False, False)
+
+HEADER_SAMPLE_PAGES = 8  # Üst/alt bilgi tespiti için önden okunan sayfa sayısı
+
+def detect_document_headers(doc: PDFDocument) -> set:
+    """Belgeye yayılmış örnek sayfalardan tekrar eden üst/alt bilgi satırlarını bul"""
+    total = doc.page_count
+    if total < 3:
+        return set()
+    step = max(1, total // HEADER_SAMPLE_PAGES)
+    sample = [doc.page_text(i) for i in range(0, total, step)][:HEADER_SAMPLE_PAGES]
+    return detect_header_footer_lines(sample)
+
+def iter_pdf_pages(pdf_path: Path,
+                   max_seconds: Optional[int] = None,
+                   ocr_dpi: int = 140,
+                   ocr_if_needed: bool = True,
+                   progress_cb: Optional[callable] = None,
+                   backend: Optional[str] = None,
+                   languages: Optional[Iterable[str]] = None,
+                   start_page: int = 0) -> Iterable[Dict]:
     """
-    Uzun PDF'lerde bile sayfa sayfa, hafıza-dostu metin üretir.
-    - Zaman sınırı aşılırsa durur.
-    - Her sayfada PYPDF2 -> gerekirse OCR.
-    - progress_cb(page_index_1based, total_pages, used_ocr: bool, char_count: int) çağrılır.
+    Sayfa sayfa çıkarım kaydı üretir:
+    {'page_no', 'total', 'text', 'ocr_used', 'skipped'}
+    - start_page (0 tabanlı) verilirse oradan devam eder (yarım kalan çıkarım).
+    - Zaman sınırı aşılırsa durur (üretilen kayıt sayısı < total olur).
+    - Her sayfada metin katmanı (config'deki PDF_BACKEND) -> gerekirse OCR.
+    - Tekrar eden üst/alt bilgi satırları temizlenir. Ortak metinler burada değiştirilmez: sayfa ham
+      saklanır, referans yalnızca LLM'e giden metinde kullanılır (render_page).
+    - Desteklenmeyen dildeki sayfalar (config'deki MANUAL_LANGUAGES) OCR'dan önce atlanır.
+    - progress_cb(page_index_1based, total_pages, used_ocr: bool, char_count: int, skipped: bool) çağrılır.
     """
     start = time.monotonic()
-    with open(pdf_path, "rb") as f:
-        reader = PyPDF2.PdfReader(f)
-        if getattr(reader, "is_encrypted", False):
-            try:
-                reader.decrypt("")
-            except Exception:
-                raise RuntimeError("PDF şifreli ve açılamadı")
-
-        total = len(reader.pages)
-        for i in range(total):
+    if languages is None:
+        languages = configured_manual_languages()
+
+    with get_backend(backend).open(pdf_path) as doc:
+        total = doc.page_count
+        header_keys = detect_document_headers(doc)
+        for i in range(start_page, total):
             if max_seconds and (time.monotonic() - start) > max_seconds:
-                # Kibarca kes
-                yield f"\n\n[⏱️ Zaman sınırı nedeniyle {i}/{total} sayfada duruldu.]"
                 break
 
-            txt, used_ocr = page_text_hybrid(
-                reader, pdf_path, i,
+            txt, used_ocr, skipped = page_text_hybrid(
+                doc, pdf_path, i,
                 ocr_if_needed=ocr_if_needed,
                 ocr_dpi=ocr_dpi,
-                min_len_for_ok=150  # Daha düşük threshold
+                min_len_for_ok=150,  # Daha düşük threshold
+                languages=languages,
+                header_keys=header_keys
             )
-
-            # Sayfa başlığı ekle (uzun belgede sayfa sınırları anlaşılır olsun)
-            page_banner = f"\n\n--- Sayfa {i+1}/{total} ---\n"
-            out = page_banner + (txt if txt else "[Bu sayfadan anlamlı metin elde edilemedi]")
             if progress_cb:
                 try:
-                    progress_cb(i+1, total, used_ocr, len(txt))
+                    progress_cb(i+1, total, used_ocr, len(txt), skipped)
                 except Exception:
                     pass
-            yield out
+            yield {'page_no': i + 1, 'total': total, 'text': txt, 'ocr_used': used_ocr, 'skipped': skipped}
 
+def render_page(page: Dict, total: int, boilerplate=None) -> str:
+    # Sayfa başlığı ekle (uzun belgede sayfa sınırları anlaşılır olsun)
+    page_banner = f"\n\n--- Sayfa {page['page_no']}/{total} ---\n"
+    text = page['text']
+    if boilerplate and text:
+        text = boilerplate.dedupe(text)  # Ortak metin yalnızca çıktıda kısaltılır
+    return page_banner + (text if text else "[Bu sayfadan anlamlı metin elde edilemedi]")
 
-def extract_pdf_full_text(pdf_path: Path, prefer_speed: bool = True) -> str:
+def iter_pdf_text_stream(pdf_path: Path,
+                         max_seconds: Optional[int] = None,
+                         ocr_dpi: int = 140,
+                         ocr_if_needed: bool = True,
+                         progress_cb: Optional[callable] = None,
+                         backend: Optional[str] = None,
+                         languages: Optional[Iterable[str]] = None) -> Iterable[str]:
     """
-    Uzun PDF'ler için tam metin çıkarır - TÜM SAYFALARI İŞLE
+    Uzun PDF'lerde bile sayfa sayfa, hafıza-dostu metin üretir (iter_pdf_pages üzerine).
+    Atlanan sayfalar çıktıya girmez; zaman sınırı aşılırsa not düşülür.
     """
-    # Zaman sınırı kaldırıldı, tüm sayfalar işlenecek
-    ocr_dpi = 120  # Düşük DPI
-    max_secs = 30   # Zaman sınırı yok
-    max_pages_to_process = 30  # Sayfa sınırı yok
-
-    used_any_ocr = {"flag": False}
-    processed_pages = {"count": 0}
-
-    def progress(page_i, total, used_ocr, nchar):
-        if used_ocr:
-            used_any_ocr["flag"] = True
-        processed_pages["count"] = page_i
-        if page_i % 5 == 0 or used_ocr:  # Her 5 sayfada bir log
-            print(f"📄 [{page_i}/{total}] {'🔍' if used_ocr else '📝'} {nchar}ch")
-
+    done, total = 0, 0
+    boilerplate = manual_store.boilerplate_index()
+    for page in iter_pdf_pages(pdf_path, max_seconds, ocr_dpi, ocr_if_needed,
+                               progress_cb, backend, languages):
+        done, total = page['page_no'], page['total']
+        if not page['skipped']:
+            yield render_page(page, total, boilerplate)
+    if done < total:
+        # Kibarca kes
+        yield f"\n\n[⏱️ Zaman sınırı nedeniyle {done}/{total} sayfada duruldu.]"
+
+
+def _rank_pages_for_question(pages: List[Dict], question: str) -> List[Dict]:
+    """Soru terimlerinin geçtiği sayfaları öne al (eşitlikte sayfa sırası korunur)"""
+    terms = {t for t in _normalize_text(question).split() if len(t) > 2}
+    if not terms:
+        return pages
+    def score(page):
+        text = _normalize_text(manual_store.page_text(page))
+        return sum(text.count(t) for t in terms)
+    return sorted(pages, key=score, reverse=True)
+
+
+def render_manual_text(pdf_name: str, pages: List[Dict], total: int,
+                       complete: bool = True, question: Optional[str] = None) -> str:
+    """
+    Sayfa kayıtlarından LLM'e gidecek metni oluşturur.
+    Çıkarım sürüyorsa (complete=False) hazır sayfalar verilir; soru varsa en alakalı sayfalar önce gelir.
+    Sayfa metinleri arşivden tek tek okunur; karakter sınırına gelince kalan sayfalar hiç açılmaz.
+    Saklanan ham metindeki ortak bloklar burada referansla kısaltılır.
+    """
+    boilerplate = manual_store.boilerplate_index()
     parts = []
     total_chars = 0
-    page_count = 0
-    
-    for chunk in iter_pdf_text_stream(
-        pdf_path=pdf_path,
-        max_seconds=max_secs,
-        ocr_dpi=ocr_dpi,
-        ocr_if_needed=True,
-        progress_cb=progress
-    ):
+    skipped = sum(1 for p in pages if p['skipped'])
+    kept = [p for p in pages if not p['skipped']]
+    if not complete and question:
+        kept = _rank_pages_for_question(kept, question)
+
+    for page in kept:
+        chunk = render_page({'page_no': page['page_no'], 'text': manual_store.page_text(page)}, total, boilerplate)
         parts.append(chunk)
         total_chars += len(chunk)
-        page_count += 1
-        
-        # Sayfa limiti kontrolü kaldırıldı - tüm sayfalar işlenecek
-        
+
         # Memory protection - daha büyük limit
         if total_chars > MAX_TEXT_LENGTH * 3:  # 90000 karakter limiti
             parts.append(f"\n\n[📄 Çok büyük dosya - içerik kısaltıldı.]")
             break
 
+    if not complete:
+        parts.append(
+            f"\n\n[⏳ Kılavuzun {len(pages)}/{total or '?'} sayfası hazır; kalan sayfalar arka planda "
+            f"işleniyor. Takip sorularında kılavuzun tamamı kullanılabilecek.]"
+        )
+
     body = "\n".join(parts).strip()
-    
+
     # Final truncation - daha büyük limit
     if len(body) > MAX_TEXT_LENGTH * 3:  # 90000 karakter
         body = body[:MAX_TEXT_LENGTH * 3] + "\n\n[📄 Çok büyük dosya - kısaltıldı.]"
-    
-    header = f"📄 {pdf_path.name} - Tam Analiz"
-    if used_any_ocr["flag"]:
+
+    header = f"📄 {pdf_name} - {'Tam Analiz' if complete else 'Kısmi Analiz'}"
+    if any(p['ocr_used'] for p in pages):
         header += " [🔍 OCR]"
-    header += f" ({processed_pages['count']} sayfa)"
-    
+    header += f" ({len(pages)} sayfa"
+    if skipped:
+        header += f", {skipped} sayfa desteklenmeyen dilde olduğu için atlandı"
+    header += ")"
+
     return f"{header}\n\n{body}"
 
 
+def extract_pdf_full_text(pdf_path: Path, prefer_speed: bool = True, question: Optional[str] = None,
+                          manual_id: Optional[str] = None) -> str:
+    """
+    Kılavuz metnini döndürür. Önbellekte tamamsa hemen; değilse çıkarım arka planda
+    başlar ve kısa bir bekleme bütçesi içinde hazır olan sayfalar döner
+    (bkz. manual_extraction). Sayfalar üst/alt bilgiden ayıklanmıştır; ortak metinler referansla kısaltılır.
+    """
+    from agent_system.tools.manual_extraction import manual_extractor
+
+    manual = manual_extractor.get_manual(pdf_path, manual_id=manual_id or None)
+    complete = bool(manual['complete'])
+    if complete:
+        print(f"💾 Kılavuz önbellekten okundu: {pdf_path.name}")
+    return render_manual_text(pdf_path.name, manual['pages'], manual['total_pages'],
+                              complete=complete, question=question)
+
+
 def _normalize_text(s: str) -> str:
     # Karşılaştırmalar için sade normalize (aksan/küçük harf vs.)
     s = unicodedata.normalize("NFKD", s or "")
     return "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
 
 
-def _score_match(product_text: str, terms: List[str]) -> int:
-    # Basit skor: kaç terim geçtiyse + model eşleşmelerine küçük bonus
-    score = 0
-    for t in terms:
-        if len(t) > 1 and t in product_text:
-            score += 1
-    # Model benzeri kısa tokenlar varsa ekstra puan (ör. "x600", "ad-6001" vs)
-    if any(len(t) >= 3 and t in product_text for t in terms):
-        score += 1
-    return score
-
-
 class PDFAnalysisTool(BaseTool):
     name: str = "PDF Kılavuz Analizi"
-    description: str = "Belirtilen ürünün PDF kılavuzunu bulur ve içeriğini döndürür (DB'deki manual_path'e göre)."
+    description: str = (
+        "Belirtilen ürünün PDF kılavuzunu bulur ve içeriğini döndürür (DB'deki manual_path'e göre). "
+        "İsteğe bağlı 'question' parametresiyle kullanıcının sorusunu ilet; kılavuz ilk kez işleniyorsa "
+        "en alakalı sayfalar önce gelir."
+    )
 
-    def _run(self, product_name: str) -> str:
+    def _run(self, product_name: str, question: Optional[str] = None) -> str:
         """
-        Veritabanından manual_path'i güvenli şekilde bulur,
+        Ürün → kılavuz indeksinden dosyayı tek sorguyla bulur,
         PDF'i (gerekirse ilk N sayfa) okur ve metni döndürür.
+        question verilirse, kılavuz henüz tamamen çıkarılmadıysa en alakalı sayfalar önce gelir.
         """
-        try:
-            from agent_system.config import PRODUCTS_DATABASE_PATH
-        except Exception as e:
-            return f"Yapılandırma hatası: PRODUCTS_DATABASE_PATH okunamadı ({e})"
-
-        # 1) Arama terimlerini hazırla
-        raw_terms = (
-            product_name or ""
-        ).replace("-", " ").replace("_", " ").split()
-        terms = [_normalize_text(t) for t in raw_terms if t.strip()]
-        if not terms:
+        if not (product_name or "").strip():
             return "Geçerli bir ürün adı/terimi vermelisin."
 
-        # 2) DB'den adayları çek (LIKE ile daralt, sonra skorla)
-        candidates: List[Tuple[str, str, str]] = []
+        # 1) Ürün → kılavuz indeksinden tek sorguyla çöz
         try:
-            conn = sqlite3.connect(PRODUCTS_DATABASE_PATH)
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-
-            # Dinamik LIKE koşulları
-            # name/model_number alanlarında herhangi bir terim geçen ve manual_path'i dolu olanlar
-            like_clauses = []
-            params = []
-            for t in terms:
-                like_clauses.append("(LOWER(name) LIKE ? OR LOWER(model_number) LIKE ?)")
-                like = f"%{t}%"
-                params.extend([like, like])
-
-            where_like = " OR ".join(like_clauses) if like_clauses else "1=1"
-            sql = f"""
-                SELECT name, model_number, manual_path
-                FROM products
-                WHERE manual_path IS NOT NULL
-                  AND manual_path != ''
-                  AND ({where_like})
-            """
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-            for r in rows:
-                candidates.append((r["name"] or "", r["model_number"] or "", r["manual_path"] or ""))
+            entry = resolve_product_manual(product_name)
         except Exception as e:
             return f"Veritabanı arama hatası: {e}"
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
-        if not candidates:
+        if not entry:
             return f"'{product_name}' için veritabanında manuel kaydı bulunamadı."
 
-        # 3) En iyi eşleşmeyi seç (skorla)
-        best = None
-        best_score = -1
-        for name, model, path in candidates:
-            product_text = _normalize_text(f"{name} {model}")
-            score = _score_match(product_text, terms)
-            if score > best_score:
-                best = (name, model, path)
-                best_score = score
-
-        if not best:
-            return f"'{product_name}' için uygun bir manuel bulunamadı."
-
-        name, model, manual_path = best
-
-        # 4) Yolu normalize et & varlık kontrolü
-        pdf_path = Path(manual_path)
-        if not pdf_path.is_absolute():
-            # DB göreli yol tuttuysa proje köküne göre çöz
-            pdf_path = (PROJECT_ROOT / pdf_path).resolve()
-
-        if not pdf_path.exists():
-            # Bazı kayıtlar 'manuals/xxx.pdf' gibi olabilir; alternatif kontrol
-            alt_path = (PROJECT_ROOT / "manuals" / Path(manual_path).name).resolve()
-            if alt_path.exists():
-                pdf_path = alt_path
-            else:
-                return (
-                    f"Manuel yolu bulundu ama dosya yok:\n"
-                    f"- Ürün: {name} ({model})\n"
-                    f"- Yol: {manual_path}"
-                )
+        name, model = entry["name"], entry["model_number"]
+        if not entry["resolved_path"]:
+            return (
+                f"Manuel yolu bulundu ama dosya yok:\n"
+                f"- Ürün: {name} ({model})\n"
+                f"- Yol: {entry['manual_path']}"
+            )
+        pdf_path = Path(entry["resolved_path"])
 
         matching_pdf = pdf_path.name
 
-        # 5) Yeni gelişmiş PDF okuma sistemi
+        # 2) Yeni gelişmiş PDF okuma sistemi
         try:
             print(f"🔍 PDF analiz başlıyor: {matching_pdf}")
-            full_text = extract_pdf_full_text(pdf_path, prefer_speed=True)
+            full_text = extract_pdf_full_text(pdf_path, prefer_speed=True, question=question,
+                                              manual_id=entry["manual_id"])
             
             if full_text:
                 return (
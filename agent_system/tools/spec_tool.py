@@ -0,0 +1,259 @@
+"""
+Teknik Özellik Aracı - Kılavuzlardaki özellik tablolarını ve katalog özelliklerini yapılandırılmış sorgular
+
+İki kaynak birleştirilir:
+- Katalog: products.manual_keywords içindeki "Etiket: değer" çiftleri (indeks oluşturulurken, bkz. manual_index)
+- Kılavuz: çıkarımı tamamlanan kılavuzun "Teknik Özellikler / Ürün Bilgi Formu" sayfalarındaki tablo satırları
+
+"Enerji sınıfı ne?", "ölçüleri?" gibi sorular böylece PDF'e dokunmadan yanıtlanır.
+
+Toplu (yeniden) oluşturma (çevrimdışı aşama):
+    python -m agent_system.tools.spec_tool build
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from crewai.tools import BaseTool
+
+from agent_system.manual_store import manual_store
+from agent_system.text_utils import normalize_token_text
+
+# Kanonik anahtar -> (görünen etiket, normalize edilmiş eşanlamlı etiketler)
+SPEC_SYNONYMS = {
+    "enerji_sinifi": ("Enerji sınıfı", ["enerji sinifi", "enerji verimlilik sinifi", "enerji verimliligi sinifi",
+                                        "energy class", "energy efficiency class"]),
+    "enerji_tuketimi": ("Enerji tüketimi", ["enerji tuketimi", "yillik enerji tuketimi", "energy consumption",
+                                            "annual energy consumption"]),
+    "genislik": ("Genişlik", ["genislik", "urun genisligi", "width"]),
+    "derinlik": ("Derinlik", ["derinlik", "urun derinligi", "depth"]),
+    "yukseklik": ("Yükseklik", ["yukseklik", "urun yuksekligi", "height"]),
+    "boyutlar": ("Boyutlar", ["boyutlar", "olculer", "urun boyutlari", "dimensions", "boyut"]),
+    "agirlik": ("Ağırlık", ["net agirlik", "agirlik", "weight", "net weight"]),
+    "guc": ("Güç", ["guc tuketimi", "toplam guc tuketimi", "nominal guc", "guc", "power", "rated power",
+                    "power consumption"]),
+    "voltaj": ("Voltaj", ["voltaj", "gerilim", "besleme gerilimi", "voltage", "supply voltage"]),
+    "frekans": ("Frekans", ["frekans", "frequency"]),
+    "kapasite": ("Kapasite", ["kapasite", "yikama kapasitesi", "kurutma kapasitesi", "capacity"]),
+    "hacim": ("Hacim", ["hacim", "brut hacim", "net hacim", "toplam net hacim", "volume"]),
+    "devir": ("Sıkma devri", ["sikma devri", "devir", "maksimum sikma devri", "spin speed"]),
+    "gurultu": ("Gürültü seviyesi", ["gurultu seviyesi", "ses seviyesi", "noise level", "noise"]),
+    "su_tuketimi": ("Su tüketimi", ["su tuketimi", "water consumption"]),
+    "ekran_boyutu": ("Ekran boyutu", ["ekran boyutu", "ekran ebadi", "screen size"]),
+    "cozunurluk": ("Çözünürlük", ["cozunurluk", "resolution"]),
+    "iklim_sinifi": ("İklim sınıfı", ["iklim sinifi", "climate class"]),
+    "sogutucu_gaz": ("Soğutucu gaz", ["sogutucu gaz", "sogutucu", "refrigerant"]),
+}
+_SYNONYM_TO_KEY = {syn: key for key, (_, syns) in SPEC_SYNONYMS.items() for syn in syns}
+
+# Sorudaki genel ifadeler -> ilgili anahtarlar
+ATTRIBUTE_GROUPS = {
+    "olcu": ["boyutlar", "genislik", "derinlik", "yukseklik"],
+    "boyut": ["boyutlar", "genislik", "derinlik", "yukseklik"],
+    "dimension": ["boyutlar", "genislik", "derinlik", "yukseklik"],
+    "size": ["boyutlar", "genislik", "derinlik", "yukseklik", "ekran_boyutu"],
+    "enerji": ["enerji_sinifi", "enerji_tuketimi"],
+    "energy": ["enerji_sinifi", "enerji_tuketimi"],
+    "elektrik": ["voltaj", "frekans", "guc"],
+    "agirlik": ["agirlik"],
+    "kac kg": ["kapasite", "agirlik"],
+}
+
+SPEC_HEADING_PATTERN = re.compile(
+    r"(teknik ozellik|teknik bilgi|teknik veri|urun bilgi formu|urun fisi|technical data|"
+    r"technical specification|specifications|product fiche|product information sheet)"
+)
+_UNITS = r"(?:Hz|kW|kWh|Wh|mm|cm|kg|dB|dBA|lt|Lt|V|W|A|L)\b"
+_LABEL = r"[A-ZÇĞİÖŞÜ][a-zçğıöşü]+(?:[ /-][\wçğıöşüÇĞİÖŞÜ()%]+){0,6}"
+SPEC_PAIR_PATTERN = re.compile(
+    rf"(?<![\w])({_LABEL})\s*:\s*(.{{1,60}}?)(?=\s+(?!{_UNITS}){_LABEL}\s*:|\s*[;|]|\.\s|\s*$)"
+)
+# İki noktasız tablo satırı için: "Enerji sınıfı A++" (normalize metinde, bilinen etiketlerle)
+_NUMERIC_VALUE = r"([a-g][+]{0,3}(?=\s|$)|[\d][\d.,x ×/-]*\s?(?:hz|kwh|kw|wh|mm|cm|kg|dba|db|lt|l|v|w|a|rpm|d/d|%)?)"
+
+MAX_VALUE_CHARS = 60
+
+
+def spec_key(label: str) -> str:
+    """Etiketin kanonik anahtarı; eşanlamlısı yoksa normalize edilmiş kısa ad"""
+    label = re.sub(r"\([^)]*\)", " ", label or "")  # "Ürün boyutları (Y x G x D)" -> "Ürün boyutları"
+    normalized = " ".join(re.findall(r"[a-z0-9]+", normalize_token_text(label)))
+    # Metin katmanında başlıkla birleşmiş etiketler: "Teknik Özellikler Enerji sınıfı"
+    normalized = re.sub(rf"^{SPEC_HEADING_PATTERN.pattern}[a-z]*\s+", "", normalized)
+    return _SYNONYM_TO_KEY.get(normalized, normalized.replace(" ", "_"))
+
+
+def display_label(key: str, label: str) -> str:
+    return SPEC_SYNONYMS[key][0] if key in SPEC_SYNONYMS else label.strip()
+
+
+def _split_keywords(text: str) -> List[str]:
+    """Parantez dışındaki ", " ayraçlarından böl ("Süreli kurutma (30, 60, 90 dakika)" tek madde kalır)"""
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+        elif ch == "," and depth == 0 and text[i + 1:i + 2].isspace():
+            items.append(text[start:i])
+            start = i + 1
+    items.append(text[start:])
+    return items
+
+
+def _is_value_continuation(item: str) -> bool:
+    """Madde yeni bir özellik değil, önceki değerin devamı mı: küçük harf, tek değer ("-18°C", "50Hz") veya kısa kod"""
+    return (item[0].islower()
+            or bool(re.fullmatch(r"[-+%Ø]?\s?\d[\d.,]*\s?(?:°C|%|[A-Za-z]{1,3})?", item))
+            or bool(re.match(r"[A-Z]{1,3}(?:\s*\(|$)", item)))
+
+
+def parse_keyword_specs(manual_keywords: str) -> List[Tuple[str, str, str]]:
+    """
+    manual_keywords ("Ürün Tipi: X, Voltaj: 230 V, Alev Güvenlik Cihazı, ...") -> (spec_key, label, value).
+    Değersiz maddeler (özellik adları) "Var" değeriyle tutulur.
+    """
+    rows = []
+    for item in _split_keywords(manual_keywords or ""):
+        item = item.strip()
+        if not item:
+            continue
+        if ":" in item:
+            label, value = item.split(":", 1)
+            value = value.strip()
+        elif rows and rows[-1][2] != "Var" and _is_value_continuation(item):
+            # Virgül içeren değerin devamı ("... (iki adet), ...", "-16°C, -18°C", "T, ST, N, SN")
+            key, label, value = rows.pop()
+            rows.append((key, label, f"{value}, {item}"))
+            continue
+        else:
+            label, value = item, "Var"
+        if label.strip() and value:
+            key = spec_key(label)
+            rows.append((key, display_label(key, label), value))
+    return rows
+
+
+def extract_manual_specs(pages: List[Tuple[int, str]]) -> List[Tuple[str, str, str, int]]:
+    """
+    Özellik tablosu sayfalarından (spec_key, label, value, page).
+    Yalnızca "Teknik Özellikler / Ürün Bilgi Formu" başlığı geçen sayfalar işlenir; ilk bulunan değer tutulur.
+    """
+    rows = {}
+    for page_no, text in pages:
+        normalized = normalize_token_text(text or "")
+        if not SPEC_HEADING_PATTERN.search(normalized):
+            continue
+        for match in SPEC_PAIR_PATTERN.finditer(text):
+            label, value = match.group(1), match.group(2).strip(" .,;")
+            key = spec_key(label)
+            if value and key not in rows and len(value) <= MAX_VALUE_CHARS:
+                rows[key] = (key, display_label(key, label), value, page_no)
+        for synonym, key in _SYNONYM_TO_KEY.items():
+            if key in rows:
+                continue
+            found = re.search(rf"\b{re.escape(synonym)}\s*[:]?\s*{_NUMERIC_VALUE}", normalized)
+            value = found.group(1).strip() if found else ""
+            if value:
+                if re.fullmatch(r"[a-g][+]*", value):
+                    value = value.upper()  # Enerji sınıfı: "a++" -> "A++"
+                rows[key] = (key, SPEC_SYNONYMS[key][0], value, page_no)
+    return list(rows.values())
+
+
+def index_manual_specs(manual_id: str) -> int:
+    """Tamamlanmış kılavuzun özellik tablosunu ham sayfa metninden çıkarıp kaydet. Dönüş: satır sayısı"""
+    manual = manual_store.get_manual(manual_id)
+    if not manual:
+        return 0
+    pages = [(p['page_no'], manual_store.page_text(p)) for p in manual['pages'] if not p['skipped']]
+    rows = extract_manual_specs(pages)
+    manual_store.replace_manual_specs(manual_id, rows)
+    return len(rows)
+
+
+def match_spec_keys(attribute: str, available: List[str]) -> List[str]:
+    """Sorulan özelliği mevcut anahtarlara eşle (eşanlamlı, grup ve alt dize eşleşmesi)"""
+    normalized = " ".join(re.findall(r"[a-z0-9]+", normalize_token_text(attribute)))
+    if not normalized:
+        return []
+    keys = []
+    direct = spec_key(attribute)
+    if direct in available:
+        keys.append(direct)
+    for phrase, group in ATTRIBUTE_GROUPS.items():
+        if phrase in normalized:
+            keys.extend(k for k in group if k in available and k not in keys)
+    for synonym, key in _SYNONYM_TO_KEY.items():
+        if synonym in normalized and key in available and key not in keys:
+            keys.append(key)
+    if not keys:
+        words = [w for w in normalized.split() if len(w) > 2]
+        keys = [k for k in available if any(w[:5] in k for w in words)]
+    return keys
+
+
+class ProductSpecInput(BaseModel):
+    """Input schema for Product Spec Tool"""
+    product_name: str = Field(description="Ürün adı veya model numarası")
+    attribute: Optional[str] = Field(default="", description="Sorulan özellik (ör. 'enerji sınıfı', 'ölçüler'); boşsa tümü")
+
+
+class ProductSpecTool(BaseTool):
+    name: str = "Ürün Teknik Özellikleri"
+    description: str = (
+        "Ürünün teknik özelliklerini (enerji sınıfı, ölçüler, ağırlık, güç, kapasite...) katalog ve kılavuz "
+        "özellik tablosundan yapılandırılmış olarak döndürür. Özellik sorularında PDF aracından önce kullan."
+    )
+    args_schema = ProductSpecInput
+
+    def _run(self, product_name: str, attribute: Optional[str] = "") -> str:
+        from agent_system.tools.manual_index import resolve_product_manual
+
+        try:
+            entry = resolve_product_manual(product_name)
+        except Exception as e:
+            return f"Veritabanı arama hatası: {e}"
+        if not entry:
+            return f"'{product_name}' için ürün bulunamadı; model numarasını doğrulayın."
+
+        specs: Dict[str, Dict] = {}
+        for row in manual_store.product_specs(entry["product_id"]):
+            specs.setdefault(row["spec_key"], row)  # Katalog değeri önce gelir
+        product = f"{entry['name']} ({entry['model_number']})"
+        if not specs:
+            return f"{product} için yapılandırılmış özellik bulunamadı; PDF Kılavuz Analizi aracını kullan."
+
+        keys = list(specs)
+        if attribute:
+            keys = match_spec_keys(attribute, keys)
+            if not keys:
+                return (f"{product} için '{attribute}' özelliği kayıtlı değil. Kayıtlı özellikler: "
+                        f"{', '.join(specs[k]['label'] for k in specs)}")
+
+        lines = [f"📋 {product} - teknik özellikler:"]
+        for key in keys:
+            row = specs[key]
+            source = f"kılavuz s.{row['page']}" if row["source"] == "kılavuz" else "katalog"
+            lines.append(f"- {row['label']}: {row['value']} ({source})")
+        return "\n".join(lines)
+
+
+def main():
+    import argparse
+    from agent_system.tools.manual_index import build_manual_index
+
+    parser = argparse.ArgumentParser(description="Ürün teknik özellik indeksi")
+    parser.add_argument("command", choices=["build"], help="Katalog + tamamlanmış kılavuzlar için yeniden oluştur")
+    parser.parse_args()
+
+    build_manual_index()  # Katalog (manual_keywords) özellikleri
+    manuals = manual_store.list_complete()
+    total = sum(index_manual_specs(m['manual_id']) for m in manuals)
+    print(f"📋 {len(manuals)} kılavuzdan {total} özellik satırı indekslendi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Sorun Giderme Arama Aracı - Tüm kılavuzların sorun giderme bölümlerinde kategori bazlı arama
+
+Kılavuz çıkarımı tamamlandığında "Sorun Giderme / Troubleshooting" bölümleri pasajlara bölünüp
+manual_store'daki FTS5 indeksine yazılır. Kullanıcı modelini bilmediğinde teknik destek ajanı
+belirtiyi ("su boşaltmıyor", "soğutmuyor") kategori içindeki tüm kılavuzlarda tek sorguyla arar.
+
+Toplu (yeniden) oluşturma:
+    python -m agent_system.tools.troubleshooting_tool build
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from crewai.tools import BaseTool
+
+from agent_system.manual_store import manual_store
+from agent_system.text_utils import normalize_token_text
+
+SECTION_HEADING_PATTERN = re.compile(
+    r"(sorun\s+giderme|ar[ıi]za\s+giderme|ar[ıi]zalar\s+ve\s+[çc][öo]z[üu]m|sorunlar\s+ve\s+[çc][öo]z[üu]m|"
+    r"olas[ıi]\s+neden|troubleshooting|problem\s+solving|possible\s+cause)",
+    re.IGNORECASE,
+)
+# Bölümün sonraki sayfaya taştığını gösteren ifadeler
+SECTION_CUE_PATTERN = re.compile(
+    r"(neden|[çc][öo]z[üu]m|sorun|ar[ıi]za|cause|solution|problem|remedy)", re.IGNORECASE
+)
+PASSAGE_CHARS = 500      # Pasaj uzunluğu (sonuçlar odaklı kalsın)
+STEM_CHARS = 6           # Türkçe ekler için sorgu terimleri bu uzunlukta önek olarak aranır
+MIN_TERM_CHARS = 3
+QUERY_STOPWORDS = {
+    "bir", "ve", "ile", "icin", "ama", "cok", "hic", "daha", "gibi", "neden", "niye", "nasil",
+    "the", "and", "not", "does", "doesnt", "dont", "with", "why", "how", "my", "is",
+}
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """Sayfa metnini cümle sınırlarından max_chars'lık pasajlara böl"""
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+    passages, current = [], ""
+    for sentence in sentences:
+        if current and len(current) + len(sentence) > max_chars:
+            passages.append(current.strip())
+            current = ""
+        current += sentence + " "
+    if current.strip():
+        passages.append(current.strip())
+    return passages
+
+
+def extract_troubleshooting(pages: List[Tuple[int, str]]) -> List[Tuple[int, str, str]]:
+    """
+    (page_no, text) listesinden sorun giderme pasajları: (page, text, search).
+    Başlık içeren sayfadan başlar, belirti/çözüm ifadesi olmayan ilk sayfada biter.
+    """
+    passages = []
+    in_section = False
+    for page_no, text in pages:
+        if SECTION_HEADING_PATTERN.search(text or ""):
+            in_section = True
+        elif in_section and not SECTION_CUE_PATTERN.search(text or ""):
+            in_section = False
+        if not in_section or not text:
+            continue
+        for passage in split_passages(text):
+            passages.append((page_no, passage, normalize_token_text(passage)))
+    return passages
+
+
+def index_manual_troubleshooting(manual_id: str) -> int:
+    """Tamamlanmış kılavuzun sorun giderme pasajlarını ham sayfa metninden indeksle. Dönüş: pasaj sayısı"""
+    manual = manual_store.get_manual(manual_id)
+    if not manual:
+        return 0
+    pages = [(p['page_no'], manual_store.page_text(p)) for p in manual['pages'] if not p['skipped']]
+    passages = extract_troubleshooting(pages)
+    manual_store.replace_troubleshooting(manual_id, passages)
+    return len(passages)
+
+
+def build_match_query(symptom: str) -> str:
+    """Belirtiden FTS5 sorgusu: aksansız, önek eşleşmeli terimlerin OR'u ("bosalt*" OR ...)"""
+    terms = []
+    for term in re.findall(r"[a-z0-9]+", normalize_token_text(symptom)):
+        if len(term) < MIN_TERM_CHARS or term in QUERY_STOPWORDS:
+            continue
+        stem = term[:STEM_CHARS]
+        if stem not in terms:
+            terms.append(stem)
+    return " OR ".join(f'"{t}"*' for t in terms)
+
+
+class TroubleshootingSearchInput(BaseModel):
+    """Input schema for Troubleshooting Search Tool"""
+    symptom: str = Field(description="Kullanıcının anlattığı belirti (ör. 'su boşaltmıyor', 'soğutmuyor')")
+    category: Optional[str] = Field(default="", description="Ürün tipi/kategori (ör. 'Çamaşır Makinesi', 'Buzdolabı')")
+    limit: int = Field(default=5, description="En fazla kaç sonuç döneceği")
+
+
+class TroubleshootingSearchTool(BaseTool):
+    name: str = "Sorun Giderme Arama"
+    description: str = (
+        "Belirtiyi ilgili kategorideki TÜM kılavuzların sorun giderme bölümlerinde arar ve en uygun "
+        "çözümleri döndürür. Kullanıcı tam modelini bilmediğinde kullan; model biliniyorsa PDF aracı daha kesindir."
+    )
+    args_schema = TroubleshootingSearchInput
+
+    def _run(self, symptom: str, category: Optional[str] = "", limit: int = 5) -> str:
+        match = build_match_query(symptom)
+        if not match:
+            return "Aranacak bir belirti vermelisin (ör. 'su boşaltmıyor')."
+
+        category_key = normalize_token_text(category or "").strip()
+        try:
+            results = manual_store.search_troubleshooting(match, category_key, max(1, min(limit, 10)))
+        except Exception as e:
+            return f"Sorun giderme arama hatası: {e}"
+
+        if not results:
+            if category_key and category_key not in " | ".join(manual_store.list_categories()):
+                known = ", ".join(manual_store.list_categories()[:10])
+                return f"'{category}' kategorisi bulunamadı. Mevcut kategoriler: {known}"
+            return (f"'{symptom}' için indekslenmiş sorun giderme bölümlerinde sonuç bulunamadı; "
+                    f"model biliniyorsa PDF Kılavuz Analizi aracını kullan.")
+
+        lines = [f"🛠️ '{symptom}' için sorun giderme sonuçları"
+                 + (f" ({category})" if category_key else "") + ":"]
+        for i, row in enumerate(results, 1):
+            lines.append(f"\n{i}. Modeller: {row['models'] or '-'} | Kılavuz sayfa {row['page']}")
+            lines.append(row['text'])
+        return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sorun giderme arama indeksi")
+    parser.add_argument("command", choices=["build"], help="Tamamlanmış tüm kılavuzlar için yeniden oluştur")
+    parser.parse_args()
+
+    manuals = manual_store.list_complete()
+    total = sum(index_manual_troubleshooting(m['manual_id']) for m in manuals)
+    print(f"🛠️ {len(manuals)} kılavuzdan {total} sorun giderme pasajı indekslendi")
+
+
+if __name__ == "__main__":
+    main()
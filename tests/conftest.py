@@ -0,0 +1,39 @@
+"""
+Testler depo kökünden çalışır: python -m pytest -q
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Küçük test kataloğu: (name, model_number, manual_keywords, url)
+CATALOG = [
+    ("Vestel CMI 96301 9 Kg Çamaşır Makinesi", "CMI 96301", "Ürün tipi: Çamaşır Makinesi, Kapasite: 9 kg",
+     "https://www.vestel.com.tr/cmi-96301"),
+    ("Vestel 55QA9800 Televizyon", "55QA9800", "Ürün tipi: Televizyon, Ekran boyutu: 55 inç",
+     "https://www.vestel.com.tr/55qa9800"),
+]
+
+
+@pytest.fixture(scope="session")
+def catalog_matcher(tmp_path_factory):
+    from agent_system.product_mentions import CatalogMatcher
+
+    path = tmp_path_factory.mktemp("catalog") / "products.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE products (name TEXT, model_number TEXT, manual_keywords TEXT, url TEXT)")
+        conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?)", CATALOG)
+    return CatalogMatcher(products_db=path)
+
+
+@pytest.fixture(scope="session")
+def router(catalog_matcher):
+    from agent_system.intent_router import IntentRouter
+
+    return IntentRouter(matcher=catalog_matcher)
@@ -0,0 +1,56 @@
+"""
+Hata kodu tablosu çıkarımı ve sorgudaki kodun bulunması
+"""
+
+from agent_system.intent_router import find_error_code
+from agent_system.tools.error_code_tool import code_variants, extract_error_codes, normalize_code
+
+TABLE_PAGE = (
+    "Hata Kodları\n"
+    "E01 Kapak açık - Kapağı kapatın.\n"
+    "E-02 Su gelmiyor. Çözüm: Musluğun açık olduğunu kontrol edin.\n"
+    "Er 05 Pompa arızası: Yetkili servisi arayın.\n"
+)
+
+
+def test_normalize_code():
+    assert normalize_code("E", "21") == "E21"
+    assert normalize_code("Er", "05") == "ER05"
+    assert normalize_code("e", "4", "a") == "E4A"
+
+
+def test_code_variants_zero_padding():
+    assert code_variants("F3") == ["F003", "F03", "F3"]
+    assert code_variants("e-21") == ["E021", "E21"]
+    assert code_variants("err 5") == ["ERR005", "ERR05", "ERR5"]
+    assert code_variants("hata yok") == []
+
+
+def test_extract_error_codes_table():
+    rows = {code: (meaning, remedy, page) for code, meaning, remedy, page in extract_error_codes(7, TABLE_PAGE)}
+    assert rows["E01"] == ("Kapak açık", "Kapağı kapatın", 7)
+    assert rows["E02"] == ("Su gelmiyor", "Musluğun açık olduğunu kontrol edin", 7)
+    assert rows["ER05"] == ("Pompa arızası", "Yetkili servisi arayın", 7)
+
+
+def test_extract_error_codes_needs_table_heading():
+    text = TABLE_PAGE.replace("Hata Kodları\n", "")
+    assert extract_error_codes(7, text) == []
+    assert len(extract_error_codes(8, text, continued=True)) == 3  # Başlıksız devam sayfası
+
+
+def test_extract_error_codes_single_mention_is_not_a_table():
+    assert extract_error_codes(2, "Hata kodu E14 görünürse servisi arayın.") == []
+    assert extract_error_codes(2, "") == []
+
+
+def test_extract_error_codes_skips_bare_code_lists():
+    rows = extract_error_codes(3, "Hata kodları: E1, E2, E3\nE1 Kapak açık - Kapatın.")
+    assert [code for code, *_ in rows] == ["E1"]
+
+
+def test_find_error_code_needs_fault_context():
+    assert find_error_code("e21 hatası veriyor") == "E21"
+    assert find_error_code("makine er 05 hata kodu gösteriyor") == "ER05"
+    assert find_error_code("E21 fiyatı nedir") is None
+    assert find_error_code("") is None
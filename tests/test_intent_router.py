@@ -0,0 +1,42 @@
+"""
+Yerel niyet yönlendirme: hata kodu, ürün eşleşmesi ve session bağlamı
+"""
+
+from agent_system.intent_router import detect_query_language
+
+
+def test_detect_query_language():
+    assert detect_query_language("bulaşık makinesi öner") == "tr"
+    assert detect_query_language("which washing machine is the best") == "en"
+    assert detect_query_language("") == "tr"
+
+
+def test_price_with_model_takes_fast_path(router):
+    result = router.route("CMI 96301 fiyatı nedir", min_confidence=0.75)
+    assert result['intent'] == "price_stock"
+    assert result['product']['model_number'] == "CMI 96301"
+    assert result['fast_path']
+
+
+def test_error_code_forces_technical_support(router):
+    result = router.route("makine e21 hatası veriyor", context_product="CMI 96301", min_confidence=0.75)
+    assert result['intent'] == "technical_support"
+    assert result['error_code'] == "E21"
+    assert result['product']['model_number'] == "CMI 96301"
+
+
+def test_context_product_used_when_query_has_no_category(router):
+    result = router.route("fiyatı ne kadar", context_product="CMI 96301", min_confidence=0.75)
+    assert result['product']['model_number'] == "CMI 96301"
+
+
+def test_context_product_dropped_for_other_category(router):
+    # Bağlam çamaşır makinesi, sorgu televizyon soruyor: bağlam ürünü kullanılmaz, karar LLM router'da
+    result = router.route("televizyon fiyatı ne kadar", context_product="CMI 96301", min_confidence=0.75)
+    assert result['product'] is None
+    assert not result['fast_path']
+
+
+def test_context_product_kept_for_same_category(router):
+    result = router.route("çamaşır makinesi fiyatı ne kadar", context_product="CMI 96301", min_confidence=0.75)
+    assert result['product']['model_number'] == "CMI 96301"
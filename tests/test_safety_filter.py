@@ -0,0 +1,73 @@
+"""
+Güvenlik ön filtresi: normalizasyon, kara listeler ve kararlar
+"""
+
+import pytest
+
+from agent_system.safety_filter import BLOCKED, SAFE, UNCERTAIN, SafetyFilter, normalize_for_filter
+
+
+@pytest.fixture(scope="module")
+def safety(router):
+    return SafetyFilter(router=router)
+
+
+def test_normalize_for_filter_folds_obfuscation():
+    assert normalize_for_filter("S1KT1R") == "siktir"
+    assert normalize_for_filter("fuuuuck") == "fuck"
+    assert normalize_for_filter("f u c k you") == "fuck you"
+    assert normalize_for_filter("$h!t") == "shit"
+    assert normalize_for_filter("merhaba!") == "merhaba"
+
+
+def test_normalize_for_filter_dotless_i():
+    assert normalize_for_filter("Sık sık donuyor") == "sik sik donuyor"
+    assert normalize_for_filter("Sık sık donuyor", keep_dotless_i=True) == "sık sık donuyor"
+
+
+@pytest.mark.parametrize("text, category", [
+    ("buzdolabı kapağı kapanmıyor amk", "profanity"),
+    ("s.i.k.t.i.r git", "profanity"),
+    ("porno film öner", "sexual"),
+    ("seksi kız resimleri", "sexual"),
+    ("esrar nereden bulunur", "violence"),
+    ("how do I hack the smart tv", "hacking"),
+])
+def test_hard_blocklist(safety, text, category):
+    result = safety.check(text)
+    assert result['verdict'] == BLOCKED
+    assert result['category'] == category
+
+
+@pytest.mark.parametrize("text", [
+    # ı/i katlanınca küfür köküne benzeyen kelimeler
+    "çamaşır makinesinin kapağı sıkıştı",
+    "televizyon sık sık donuyor",
+    # Sert listedeki köklerle başlayan masum kelimeler
+    "Seksen litrelik buzdolabı var mı",
+    "esrarengiz bir ses geliyor",
+    "makineden esrarlı bir tıkırtı geliyor",
+    "televizyonum hacklendi ne yapmalıyım",
+    "arka panelde çıplak kablo görünüyor",
+    "the glass door has a crack",
+])
+def test_innocent_words_are_not_blocked(safety, text):
+    result = safety.check(text)
+    assert result['verdict'] != BLOCKED
+    assert result['matched'] is None
+
+
+@pytest.mark.parametrize("text", ["LG kumandası ile çalışır mı", "gizlilik politikanız nedir"])
+def test_soft_blocklist_is_left_to_router(safety, text):
+    assert safety.check(text)['verdict'] == UNCERTAIN
+
+
+def test_vestel_question_is_safe(safety):
+    result = safety.check("bulaşık makinesi öner")
+    assert result['verdict'] == SAFE
+    assert result['language'] == "tr"
+
+
+def test_spam(safety):
+    text = "kazan kazan " * 10 + "http://a.example http://b.example"
+    assert safety.check(text)['category'] == "spam"
@@ -0,0 +1,120 @@
+"""
+Teknik özellik ayrıştırma testleri: katalog manual_keywords ve kılavuz özellik tablosu sayfaları
+"""
+
+import re
+import sqlite3
+
+import pytest
+
+from agent_system.tools.spec_tool import (
+    _split_keywords,
+    extract_manual_specs,
+    match_spec_keys,
+    parse_keyword_specs,
+    spec_key,
+)
+
+# Katalog ayrıştırma örnekleri: manual_keywords -> beklenen (etiket, değer) satırları
+KEYWORD_CHECKS = [
+    (
+        "Ürün tipi: Kurutmalı Çamaşır Makinesi, Azami yıkama kapasitesi: 9 kg, Azami kurutma kapasitesi: 6 kg, "
+        "Maksimum sıkma devri: 1400 devir/dk., Program sayısı: 15, Çalışma voltajı: 220-240 V~, "
+        "Wi-Fi bağlantı özelliği, Boyutlar (YükseklikXGenişlikXDerinlik): 845x597x582 mm, "
+        "Yarım yük algılama sistemi, Çocuk kilidi fonksiyonu, Gecikmeli başlatma ek fonksiyonu, "
+        "Süreli kurutma seçeneği (30, 60, 90, 120 dakika), "
+        "Seviyeli kurutma seçeneği (Dolap kuruluğu, Askı kuruluğu, Ütü kuruluğu), Elektronik gösterge, "
+        "Yıkama suyu sıcaklığı ve sıkma devri ayarı",  # KCMI 98142 WIFI
+        {
+            "Süreli kurutma seçeneği (30, 60, 90, 120 dakika)": "Var",
+            "Seviyeli kurutma seçeneği (Dolap kuruluğu, Askı kuruluğu, Ütü kuruluğu)": "Var",
+            "Sıkma devri": "1400 devir/dk.",
+            "Elektronik gösterge": "Var",
+        },
+    ),
+    (
+        "Ürün Tipi: No-Frost Buzdolabı, İklim Sınıfı Aralığı: T, ST, N, SN (10°C ila 43°C çalışma sıcaklığı "
+        "aralığı), Dondurucu Bölme Sıcaklık Ayarları: -16°C, -18°C, -20°C, -22°C, -24°C, "
+        "Otomatik Buz Çözme (Eritme) Sistemi, LED İç Aydınlatma",  # NFK37011
+        {
+            "İklim Sınıfı Aralığı": "T, ST, N, SN (10°C ila 43°C çalışma sıcaklığı aralığı)",
+            "Dondurucu Bölme Sıcaklık Ayarları": "-16°C, -18°C, -20°C, -22°C, -24°C",
+            "LED İç Aydınlatma": "Var",
+        },
+    ),
+]
+
+
+def _suspicious_label(label: str) -> bool:
+    """Yanlış bölünmüş madde belirtisi: dengesiz parantez ya da harfsiz etiket ("60", "120 dakika)")"""
+    return label.count("(") != label.count(")") or not re.search(r"[^\W\d_]{2}", label)
+
+
+@pytest.mark.parametrize("keywords, expected", KEYWORD_CHECKS)
+def test_parse_keyword_specs_examples(keywords, expected):
+    parsed = {label: value for _, label, value in parse_keyword_specs(keywords)}
+    for label, value in expected.items():
+        assert parsed.get(label) == value
+
+
+def test_catalog_labels_are_not_split():
+    """Tüm katalog: virgül içeren değerler yanlış bölünüp şüpheli etiket üretmemeli"""
+    from agent_system.config import PRODUCTS_DATABASE_PATH
+
+    if not PRODUCTS_DATABASE_PATH.exists():
+        pytest.skip("Ürün veritabanı yok")
+    with sqlite3.connect(PRODUCTS_DATABASE_PATH) as conn:
+        rows = conn.execute("SELECT model_number, manual_keywords FROM products").fetchall()
+    suspicious = [(model_number, label)
+                  for model_number, keywords in rows
+                  for _, label, _ in parse_keyword_specs(keywords)
+                  if _suspicious_label(label)]
+    assert suspicious == []
+
+
+def test_split_keywords_keeps_parentheses_together():
+    assert _split_keywords("A: 1, Süreli kurutma (30, 60 dakika), B") == ["A: 1", " Süreli kurutma (30, 60 dakika)", " B"]
+    assert _split_keywords("Voltaj: 220,5 V") == ["Voltaj: 220,5 V"]  # Ondalık virgül ayraç değil
+
+
+def test_parse_keyword_specs_value_continuations():
+    rows = parse_keyword_specs("Frekans: 50 Hz, 60 Hz, Alev Güvenlik Cihazı, Voltaj: 230 V")
+    assert rows == [
+        ("frekans", "Frekans", "50 Hz, 60 Hz"),
+        ("alev_guvenlik_cihazi", "Alev Güvenlik Cihazı", "Var"),
+        ("voltaj", "Voltaj", "230 V"),
+    ]
+    assert parse_keyword_specs("") == []
+    assert parse_keyword_specs(None) == []
+
+
+def test_spec_key_synonyms_and_headings():
+    assert spec_key("Enerji Verimlilik Sınıfı") == "enerji_sinifi"
+    assert spec_key("Ürün boyutları (Y x G x D)") == "boyutlar"
+    assert spec_key("Teknik Özellikler Enerji sınıfı") == "enerji_sinifi"
+    assert spec_key("Program sayısı") == "program_sayisi"
+
+
+def test_extract_manual_specs_only_from_spec_pages():
+    pages = [
+        (3, "Güvenlik uyarıları. Voltaj: 230 V olan prize takın."),
+        (40, "Teknik Özellikler\nEnerji sınıfı: A++\nNet ağırlık: 62 kg\nGerilim: 220-240 V"),
+        (41, "Ürün Bilgi Formu\nEnerji sınıfı: B"),
+    ]
+    rows = {key: (value, page) for key, _, value, page in extract_manual_specs(pages)}
+    assert rows["enerji_sinifi"] == ("A++", 40)  # İlk bulunan değer tutulur
+    assert rows["agirlik"] == ("62 kg", 40)
+    assert rows["voltaj"] == ("220-240 V", 40)
+
+
+def test_extract_manual_specs_table_without_colons():
+    rows = {key: value for key, _, value, _ in extract_manual_specs([(12, "Technical data Energy class a+ Width 600 mm")])}
+    assert rows["enerji_sinifi"] == "A+"
+    assert rows["genislik"] == "600 mm"
+
+
+def test_match_spec_keys_groups():
+    available = ["boyutlar", "genislik", "enerji_sinifi", "agirlik"]
+    assert match_spec_keys("ölçüleri nedir", available) == ["boyutlar", "genislik"]
+    assert match_spec_keys("enerji sınıfı", available) == ["enerji_sinifi"]
+    assert match_spec_keys("", available) == []
@@ -0,0 +1,45 @@
+"""
+Sorun giderme bölümü çıkarımı ve FTS5 sorgu oluşturma
+"""
+
+from agent_system.tools.troubleshooting_tool import build_match_query, extract_troubleshooting, split_passages
+
+
+def test_split_passages_on_sentence_boundaries():
+    text = "Birinci cümle. İkinci cümle! Üçüncü cümle?"
+    assert split_passages(text, max_chars=30) == ["Birinci cümle. İkinci cümle!", "Üçüncü cümle?"]
+    assert split_passages(text) == [text]
+    assert split_passages("") == []
+
+
+def test_split_passages_keeps_long_sentence_whole():
+    sentence = "x" * 80 + "."
+    assert split_passages(sentence, max_chars=20) == [sentence]
+
+
+def test_extract_troubleshooting_section_bounds():
+    pages = [
+        (1, "Güvenlik talimatları ve kurulum."),
+        (20, "Sorun Giderme\nMakine su boşaltmıyor. Olası neden: pompa filtresi tıkalı."),
+        (21, "Çözüm: filtreyi temizleyin. Sorun devam ederse servisi arayın."),
+        (22, "Garanti belgesi ve servis adresleri."),
+        (23, "Müşteri hizmetleri."),
+    ]
+    passages = extract_troubleshooting(pages)
+    assert [page for page, _, _ in passages] == [20, 21]
+    page, text, search = passages[0]
+    assert text.startswith("Sorun Giderme")
+    assert "bosaltmiyor" in search  # Aksansız arama sütunu
+
+
+def test_extract_troubleshooting_english_heading():
+    passages = extract_troubleshooting([(5, "Troubleshooting. The appliance does not start.")])
+    assert len(passages) == 1
+    assert extract_troubleshooting([(5, None), (6, "")]) == []
+
+
+def test_build_match_query_prefix_terms():
+    # "su" çok kısa; Türkçe ekler için terimler 6 harflik önek olarak aranır
+    assert build_match_query("Çamaşır makinesi su boşaltmıyor") == '"camasi"* OR "makine"* OR "bosalt"*'
+    assert build_match_query("my fridge is not cooling") == '"fridge"* OR "coolin"*'
+    assert build_match_query("neden ve niye") == ""
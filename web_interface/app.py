@@ -1,39 +1,66 @@
-from flask import Flask, render_template, request, jsonify, g
+from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 import sys
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 
 # Agent system path ekle
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from agent_system.main import VestelAgentSystem
-from agent_system.state_manager import get_conversation_manager, hydrate_sessions_from_disk
+from agent_system.state_manager import (
+    get_conversation_manager, forget_conversation_manager, get_session_cache_stats, hydrate_sessions_from_disk
+)
 from agent_system.constants import GREETING_MESSAGE
 
+SESSION_PAGE_SIZE = 50       # /api/sessions varsayılan sayfa boyutu
+SESSION_PAGE_MAX = 200       # İstemcinin isteyebileceği en büyük sayfa
+SESSION_ACTIVE_MINUTES = 30  # Yönetim panelinde "aktif" sayılan son aktivite penceresi
+SEARCH_PAGE_SIZE = 20        # /api/admin/search varsayılan sayfa boyutu
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'vestel-agent-secret-key-2025'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# UYGULAMA BAŞLANGICINDA HYDRATE ET
+# ESKİ JSON SESSION DOSYALARINI DB'YE BİR KEZ TAŞI
 try:
     hydrated_count = hydrate_sessions_from_disk()
     if hydrated_count > 0:
-        print(f"🧩 {hydrated_count} session DB'ye hydrate edildi.")
+        print(f"🧩 {hydrated_count} session JSON'dan DB'ye taşındı.")
 except Exception as e:
     print(f"⚠️ Başlangıçta hydrate işlemi başarısız: {e}")
 
+# YARIM KALAN KILAVUZ ÇIKARIMLARINI SÜRDÜR
+try:
+    from agent_system.tools.manual_extraction import manual_extractor
+    resumed_count = manual_extractor.resume_pending()
+    if resumed_count > 0:
+        print(f"📚 {resumed_count} yarım kalmış kılavuz çıkarımı arka planda sürdürülüyor.")
+except Exception as e:
+    print(f"⚠️ Kılavuz çıkarımları sürdürülemedi: {e}")
+
+# AGENT HAVUZUNU ISIT (ilk mesaj agent kurulumunu beklemesin)
+try:
+    from agent_system.agent_pool import agent_pool
+    agent_pool.warm()
+except Exception as e:
+    print(f"⚠️ Agent havuzu ısıtılamadı: {e}")
+
+# BOŞTA KALAN SESSION'LARI PERİYODİK OLARAK ARŞİVLE / SIKIŞTIR
+try:
+    from agent_system.session_retention import start_retention_scheduler
+    start_retention_scheduler()
+except Exception as e:
+    print(f"⚠️ Session saklama işi başlatılamadı: {e}")
+
 @app.route('/')
 def index():
     """Ana sayfa - Chat arayüzü"""
     try:
-        hydrate_sessions_from_disk()  # HYDRATE ET
-        sessions = get_conversation_manager().list_sessions()
-        sorted_sessions = sorted(sessions, 
-                                 key=lambda x: x.get('last_activity', '1970-01-01T00:00:00'), 
-                                 reverse=True)
+        # Yalnızca en son aktif session gerekiyor; liste chat.js tarafından sayfa sayfa yüklenir
+        sorted_sessions, _ = get_conversation_manager().list_sessions_page(limit=1)
         
         if sorted_sessions:
             # En son aktif olan session'ı seç
@@ -73,22 +100,64 @@ def index():
 @app.route('/sessions')
 @app.route('/api/sessions')
 def get_sessions():
-    """Mevcut session'ları listele - LAST_ACTIVITY'YE GÖRE SIRALI"""
+    """Session'ları sayfa sayfa listele - LAST_ACTIVITY'YE GÖRE SIRALI (?limit=&cursor=)"""
     try:
-        hydrate_sessions_from_disk()  # HYDRATE ET
-        sessions = get_conversation_manager().list_sessions()
-        # Session'ları last_activity'ye göre sırala (en yeni en başta)
-        sorted_sessions = sorted(sessions, 
-                               key=lambda x: x.get('last_activity', '1970-01-01T00:00:00'), 
-                               reverse=True)
+        limit = min(max(request.args.get('limit', SESSION_PAGE_SIZE, type=int), 1), SESSION_PAGE_MAX)
+        cursor = request.args.get('cursor') or None
+        # Keyset sayfalama: her sayfa indeksten `limit` satır okur, toplam session sayısından bağımsız
+        sessions, next_cursor = get_conversation_manager().list_sessions_page(limit=limit, cursor=cursor)
+        response = {
+            'success': True,
+            'sessions': sessions,
+            'next_cursor': next_cursor
+        }
+        if not cursor:
+            # İlk sayfada panel sayaçları (tüm session'lar üzerinden, istemcide toplanmaz)
+            from agent_system.session_db import session_db
+            active_since = (datetime.now() - timedelta(minutes=SESSION_ACTIVE_MINUTES)).isoformat()
+            response['totals'] = session_db.session_totals(active_since)
         
-        print(f"📋 {len(sorted_sessions)} session listelendi (activity sıralı)")
+        print(f"📋 {len(sessions)} session listelendi (activity sıralı, sonraki sayfa: {'var' if next_cursor else 'yok'})")
+        return jsonify(response)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Session listing error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/sessions/cache-stats')
+def get_session_cache_metrics():
+    """Session cache metrikleri (hit/miss/eviction)"""
+    return jsonify({'success': True, 'stats': get_session_cache_stats()})
+
+@app.route('/api/agents/pool-stats')
+def get_agent_pool_metrics():
+    """Agent havuzu metrikleri (kurulan set, ödünç alma, bekleme)"""
+    from agent_system.agent_pool import agent_pool
+    return jsonify({'success': True, 'stats': agent_pool.stats()})
+
+@app.route('/api/admin/search')
+def search_sessions():
+    """
+    Konuşma geçmişinde tam metin arama (?q=&limit=&offset=) - eşleşen session'lar, skor sıralı, snippet'li.
+    Arşivlenmiş session'lar da aranır (sonuçta archived: true; açıldığında aktif depoya geri yüklenir).
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'Arama metni (q) gerekli'}), 400
+    try:
+        limit = min(max(request.args.get('limit', SEARCH_PAGE_SIZE, type=int), 1), SESSION_PAGE_MAX)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        from agent_system.session_retention import search_history
+        results, has_more = search_history(query, limit=limit, offset=offset)
         return jsonify({
-            'success': True, 
-            'sessions': sorted_sessions
+            'success': True,
+            'query': query,
+            'results': results,
+            'next_offset': offset + len(results) if has_more else None
         })
     except Exception as e:
-        print(f"❌ Session listing error: {e}")
+        print(f"❌ Session search error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/session/<session_id>')
@@ -98,23 +167,19 @@ def get_session_details(session_id):
         # Session-specific manager al
         session_manager = get_conversation_manager(session_id)
 
-        # Session history al
-        history = session_manager.get_conversation_history()
-
-        # Session dosyası varsa JSON'dan oku
-        session_file = os.path.join(session_manager.sessions_dir, f"{session_id}.json")
-        session_data = {}
-        
-        if os.path.exists(session_file):
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
+        # Meta, geçmiş ve ürünler DB'den
+        session_data = session_manager.get_session_info(session_id)
         
         return jsonify({
             'success': True,
             'session_id': session_id,
-            'history': history,
-            'metadata': session_data.get('metadata', {}),
-            'products': session_data.get('products', []),
+            'history': session_data['history'],
+            'metadata': {
+                'session_name': session_data.get('session_name'),
+                'message_count': session_data.get('message_count', 0),
+                'product_count': session_data.get('product_count', 0)
+            },
+            'products': session_data['products'],
             'created_at': session_data.get('created_at', 'Bilinmiyor'),
             'last_activity': session_data.get('last_activity', 'Bilinmiyor')
         })
@@ -188,49 +253,44 @@ def handle_message(data):
         # Session-specific manager al
         session_manager = get_conversation_manager(session_id)
 
-        # Agent system'i session bazlı al
-        if not hasattr(g, 'agent_system') or g.agent_system.session_id != session_id:
-            g.agent_system = VestelAgentSystem(session_id)
-        agent_system = g.agent_system
+        # Agent system hafif (session bağlamı); agent'lar tur başına süreç havuzundan ödünç alınır
+        agent_system = VestelAgentSystem(session_id)
 
-        # Kullanıcı mesajını kaydet
-        session_manager.add_message(session_id, 'user', user_message)
-        
-        # Processing başladı - thinking bubble çalışıyor
-        emit('typing', {'status': True})
-        emit('message_status', {
-            'message_id': message_id,
-            'status': 'processing'
-        })
-        
-        print(f"🤖 Agent system'e gönderiliyor...")
+        # Tur: kullanıcı mesajı + cevap tur sonunda tek işlemde kaydedilir. Aynı session'a gelen turlar
+        # sırayla işlenir (iki sekme / art arda mesaj geçmişi karıştırmasın)
+        with session_manager.turn(user_message) as turn:
+            # Processing başladı - thinking bubble çalışıyor
+            emit('typing', {'status': True})
+            emit('message_status', {
+                'message_id': message_id,
+                'status': 'processing'
+            })
         
-        # Agent'a gönder ve cevap al (session-specific) - CLEAN TIMEOUT
-        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
-        import time
+            print(f"🤖 Agent system'e gönderiliyor...")
         
-        def run_agent_query():
-            return agent_system.process_query(user_message, session_id)
+            # Agent'a gönder ve cevap al (session-specific) - CLEAN TIMEOUT
+            from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+            import time
         
-        try:
-            # ThreadPool ile timeout kontrol et
-            with ThreadPoolExecutor() as executor:
-                future = executor.submit(run_agent_query)
-                try:
-                    response = future.result(timeout=120)  # 2 dakika timeout
-                    print(f"✅ Agent cevabı alındı: '{response[:100]}...'")
-                except FutureTimeoutError:
-                    response = "⏱️ İşlem 2 dakikadan uzun sürdü. Tool validation sorunları olabilir. Lütfen sorunuzu tekrar deneyin."
-                    print("⏱️ Agent işlemi 120s timeout'a uğradı")
-        except Exception as agent_error:
-            response = f"🚫 Sistem hatası: {str(agent_error)}. Lütfen tekrar deneyin."
-            print(f"❌ Agent hatası: {str(agent_error)}")
+            def run_agent_query():
+                return agent_system.process_query(user_message, session_id, turn=turn)
         
-        # Agent cevabını kaydet
-        session_manager.add_message(session_id, 'assistant', response)
+            try:
+                # ThreadPool ile timeout kontrol et
+                with ThreadPoolExecutor() as executor:
+                    future = executor.submit(run_agent_query)
+                    try:
+                        response = future.result(timeout=120)  # 2 dakika timeout
+                        print(f"✅ Agent cevabı alındı: '{response[:100]}...'")
+                    except FutureTimeoutError:
+                        response = "⏱️ İşlem 2 dakikadan uzun sürdü. Tool validation sorunları olabilir. Lütfen sorunuzu tekrar deneyin."
+                        print("⏱️ Agent işlemi 120s timeout'a uğradı")
+            except Exception as agent_error:
+                response = f"🚫 Sistem hatası: {str(agent_error)}. Lütfen tekrar deneyin."
+                print(f"❌ Agent hatası: {str(agent_error)}")
         
-        # Session activity'yi manuel olarak da güncelle
-        session_manager.save_session()
+            # Agent cevabı (zaman aşımı/hata mesajı dahil) tur çıkışında kaydedilir
+            turn.reply(response)
         
         # Processing bitti
         emit('typing', {'status': False})
@@ -292,15 +352,10 @@ def rename_session(session_id):
 def delete_session(session_id):
     """Session'ı sil"""
     try:
-        # JSON dosyasını sil
-        session_manager = get_conversation_manager(session_id)
-        session_file = os.path.join(session_manager.sessions_dir, f"{session_id}.json")
-        if os.path.exists(session_file):
-            os.remove(session_file)
-        
-        # DB'den sil
+        # DB'den sil (mesajlar ve ürünler dahil) ve önbellekteki yöneticiyi bırak
         from agent_system.session_db import session_db
         session_db.delete_session(session_id)
+        forget_conversation_manager(session_id)
         
         return jsonify({
             'success': True,
@@ -319,8 +374,7 @@ def clear_session(session_id):
         conv_manager = get_conversation_manager(session_id)
         
         # Mesajları temizle
-        conv_manager.conversation_history = []
-        conv_manager.save_session()
+        conv_manager.clear_history()
         
         return jsonify({
             'success': True,
@@ -2,7 +2,11 @@
 
 // Global variables
 let sessions = [];
+let sessionTotals = null;   // Sunucunun ilk sayfayla döndürdüğü tüm session'lar üzerinden sayaçlar
+let sessionCursor = null;   // Sonraki sayfanın cursor'u (null: başka sayfa yok)
+let sessionPageLoading = false;
 let refreshInterval;
+const SESSION_PAGE_SIZE = 50;
 
 // Initialize admin panel
 document.addEventListener('DOMContentLoaded', function() {
@@ -48,11 +52,13 @@ function loadSessions() {
     
     document.getElementById('sessions-table-body').innerHTML = loadingRow;
     
-    fetch('/api/sessions')
+    fetch(`/api/sessions?limit=${SESSION_PAGE_SIZE}`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
                 sessions = data.sessions;
+                sessionCursor = data.next_cursor;
+                sessionTotals = data.totals || null;
                 renderSessionsTable();
                 updateStatistics();
             } else {
@@ -65,6 +71,36 @@ function loadSessions() {
         });
 }
 
+function loadMoreSessions() {
+    // Aynı sayfanın iki kez istenmesini önle; cursor yalnızca başarılı cevapla ilerler (hata olursa tekrar denenebilir)
+    if (!sessionCursor || sessionPageLoading) return;
+    sessionPageLoading = true;
+    
+    const cursor = sessionCursor;
+    const params = new URLSearchParams({ limit: SESSION_PAGE_SIZE, cursor: cursor });
+    
+    fetch(`/api/sessions?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (sessionCursor !== cursor) return; // Bu arada liste baştan yenilendi
+            if (data.success) {
+                sessions = sessions.concat(data.sessions);
+                sessionCursor = data.next_cursor;
+                renderSessionsTable();
+            } else {
+                // Tablo yerinde kalır; "Daha fazla yükle" tekrar denenebilir
+                showNotification('Sonraki sayfa yüklenemedi: ' + data.error, 'danger');
+            }
+        })
+        .catch(error => {
+            console.error('Error loading sessions:', error);
+            showNotification('Bağlantı hatası oluştu', 'danger');
+        })
+        .finally(() => {
+            sessionPageLoading = false;
+        });
+}
+
 function renderSessionsTable() {
     const tbody = document.getElementById('sessions-table-body');
     
@@ -79,6 +115,16 @@ function renderSessionsTable() {
         return;
     }
     
+    const loadMoreRow = sessionCursor ? `
+        <tr>
+            <td colspan="7" class="text-center py-2">
+                <button class="btn btn-sm btn-outline-secondary" onclick="loadMoreSessions()">
+                    <i class="fas fa-chevron-down"></i> Daha fazla yükle
+                </button>
+            </td>
+        </tr>
+    ` : '';
+    
     tbody.innerHTML = sessions.map(session => {
         const createdAt = formatDate(session.created_at);
         const lastActivity = formatDate(session.last_activity);
@@ -129,14 +175,15 @@ function renderSessionsTable() {
                 </td>
             </tr>
         `;
-    }).join('');
+    }).join('') + loadMoreRow;
 }
 
 function updateStatistics() {
-    const totalSessions = sessions.length;
-    const activeSessions = sessions.filter(s => isSessionActive(s.last_activity)).length;
-    const totalMessages = sessions.reduce((sum, s) => sum + (s.message_count || 0), 0);
-    const totalProducts = sessions.reduce((sum, s) => sum + (s.product_count || 0), 0);
+    // Liste sayfalı olduğundan sayaçlar sunucudan gelir; eski sunucularda yüklenen sayfadan hesaplanır
+    const totalSessions = sessionTotals ? sessionTotals.sessions : sessions.length;
+    const activeSessions = sessionTotals ? sessionTotals.active : sessions.filter(s => isSessionActive(s.last_activity)).length;
+    const totalMessages = sessionTotals ? sessionTotals.messages : sessions.reduce((sum, s) => sum + (s.message_count || 0), 0);
+    const totalProducts = sessionTotals ? sessionTotals.products : sessions.reduce((sum, s) => sum + (s.product_count || 0), 0);
     
     // Update statistic cards with animation
     animateCounter('total-sessions', totalSessions);
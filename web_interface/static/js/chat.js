@@ -13,6 +13,9 @@ const socket = io({
 let currentSessionId = null;
 let messageCount = 0;
 let sessions = [];
+let sessionCursor = null;       // Sonraki session sayfasının cursor'u (null: başka sayfa yok)
+let sessionListLoading = false;
+const SESSION_PAGE_SIZE = 30;
 let isConnected = false;
 let pendingMessages = [];
 let messageTimeouts = new Map(); // Message timeout tracking
@@ -95,6 +98,15 @@ function setupEventListeners() {
         sessionDropdown.addEventListener('click', loadSessionList);
     }
     
+    // Sidebar sonuna yaklaşınca sonraki session sayfasını yükle
+    if (sessionSidebar) {
+        sessionSidebar.addEventListener('scroll', function() {
+            if (sessionSidebar.scrollTop + sessionSidebar.clientHeight >= sessionSidebar.scrollHeight - 50) {
+                loadMoreSessions();
+            }
+        });
+    }
+    
     // Session management buttons
     const newSessionBtn = document.getElementById('new-session-btn');
     const clearChatBtn = document.getElementById('clear-chat-btn');
@@ -488,13 +500,33 @@ function updateTypingIndicatorWithProgress(step, message) {
 
 // Session Management Functions
 function loadSessionList() {
+    // Listeyi baştan (ilk sayfa) yükle
+    sessionCursor = null;
+    fetchSessionPage(true);
+}
+
+function loadMoreSessions() {
+    if (sessionCursor) {
+        fetchSessionPage(false);
+    }
+}
+
+function fetchSessionPage(reset) {
+    if (sessionListLoading) return;
+    sessionListLoading = true;
+    
+    const params = new URLSearchParams({ limit: SESSION_PAGE_SIZE });
+    if (!reset && sessionCursor) {
+        params.set('cursor', sessionCursor);
+    }
     console.log('🔄 Loading session list...');
-    fetch('/api/sessions')
+    fetch(`/api/sessions?${params}`)
         .then(response => response.json())
         .then(data => {
             console.log('📋 Session list response:', data);
             if (data.success) {
-                sessions = data.sessions;
+                sessions = reset ? data.sessions : sessions.concat(data.sessions);
+                sessionCursor = data.next_cursor;
                 console.log(`✅ ${sessions.length} sessions loaded`);
                 renderSessionSidebar();
                 updateSessionDisplay();
@@ -504,6 +536,9 @@ function loadSessionList() {
         })
         .catch(error => {
             console.error('❌ Session listesi yüklenemedi:', error);
+        })
+        .finally(() => {
+            sessionListLoading = false;
         });
 }
 
@@ -575,7 +610,16 @@ function renderSessionSidebar() {
         `;
     }).join('');
 
-    sessionSidebar.innerHTML = sessionHTML;
+    // Daha fazla sayfa varsa listenin sonunda yükleme düğmesi (kaydırma da yükler)
+    const loadMoreHTML = sessionCursor ? `
+        <div class="text-center py-2">
+            <button class="btn btn-sm btn-outline-secondary" onclick="loadMoreSessions()">
+                <i class="fas fa-chevron-down me-1"></i> Daha fazla
+            </button>
+        </div>
+    ` : '';
+
+    sessionSidebar.innerHTML = sessionHTML + loadMoreHTML;
 }
 
 function renameSession(sessionId) {